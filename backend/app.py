@@ -1,12 +1,37 @@
-from flask import Flask, jsonify, request
-from flask_caching import Cache
+from flask import Flask, Response, g, jsonify, request, stream_with_context
 from flask_cors import CORS
 import requests
 import logging
+import numpy as np
 import traceback
 import os
+import json
+import math
+import time
+import hmac
+import io
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+import metrics as prometheus
+from fleet import (
+	QuotaExhausted, TokenBucket, evaluate_fleet, fetch_with_retry, fleet_aggregates, parse_sites, site_result
+)
+from nrel_client import NRELClient, UnexpectedResponseError
+from orientation_grid import grid_corners, interpolate_outputs
+from payload import ProjectionError, encode_hourly_float32, json_response, project_outputs
+from shared_cache import open_store, run_once
+from singleflight import SingleFlight
+
+# Shared simulation modules (spans) live alongside the backend
+SIMULATION_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "simulation")
+if SIMULATION_DIR not in sys.path:
+	sys.path.append(SIMULATION_DIR)
+import spans
+from rollups import RESOLUTIONS, rollup_outputs
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -17,10 +42,6 @@ app = Flask(__name__)
 
 CORS(app, resources={r"/api/*": {"origins": ["http://localhost:3000"]}})
 
-# Configure caching (in-memory cache)
-cache = Cache(config={'CACHE_TYPE': 'SimpleCache', 'CACHE_DEFAULT_TIMEOUT': 300})
-cache.init_app(app)
-
 logging.basicConfig(
 	level=logging.DEBUG,
 	format="%(asctime)s %(levelname)s %(message)s",
@@ -37,41 +58,461 @@ DEFAULT_TILT = 40
 ARRAY_TYPE = 1
 MODULE_TYPE = 1
 LOSSES = 10
-NREL_API_URL = "https://developer.nrel.gov/api/pvwatts/v6.json"
+NREL_API_URL = os.environ.get("NREL_API_URL", "https://developer.nrel.gov/api/pvwatts/v6.json")
+
+# Upper bound on simultaneous NREL requests from this process
+UPSTREAM_MAX_CONCURRENCY = int(os.environ.get("NREL_MAX_CONCURRENCY", 8))
+
+# NREL API key quota: requests per hour (0 disables the limiter), how many may go out
+# back to back, and attempts per request for throttled or failed calls
+NREL_HOURLY_QUOTA = int(os.environ.get("NREL_HOURLY_QUOTA", 1000))
+NREL_BURST = int(os.environ.get("NREL_BURST", 20))
+NREL_MAX_ATTEMPTS = int(os.environ.get("NREL_MAX_ATTEMPTS", 4))
+
+# Interactive requests wait at most this many seconds for a quota token, then get a 503 with
+# Retry-After instead of holding a worker. Fleet evaluations wait as long as the quota needs.
+NREL_QUOTA_WAIT = float(os.environ.get("NREL_QUOTA_WAIT", 2.0))
+
+# Fleet evaluation limits
+FLEET_MAX_SITES = int(os.environ.get("PVWATTS_FLEET_MAX_SITES", 1000))
+
+# Requests carrying this token (X-Profile-Token header or ?profile=) get a cProfile report
+# and their timing spans instead of the normal response. Unset disables profiling.
+PROFILE_TOKEN = os.environ.get("PVWATTS_PROFILE_TOKEN")
+PROFILE_MAX_LINES = 60
+
+# Orientations fetched in the background at startup, as tilt:azimuth pairs
+WARMUP_ORIENTATIONS = os.environ.get("PVWATTS_WARMUP", f"{DEFAULT_TILT}:{DEFAULT_AZIMUTH}")
+
+# Snap /api/pvwatts requests to an orientation grid of this many degrees (0 disables)
+ORIENTATION_GRID_STEP = float(os.environ.get("PVWATTS_GRID_STEP", 0))
+
+# Parameter sweep limits
+SWEEP_MAX_POINTS = 400
+
+# Cached responses are fresh for CACHE_TIMEOUT seconds. After that they are still served
+# (stale-while-revalidate) while a background refresh runs, until CACHE_STALE_TIMEOUT.
+CACHE_TIMEOUT = int(os.environ.get("PVWATTS_CACHE_FRESH", 300))
+CACHE_STALE_TIMEOUT = int(os.environ.get("PVWATTS_CACHE_TTL", 7 * 86400))
+CACHE_MAX_BYTES = int(os.environ.get("PVWATTS_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+# Each worker also keeps recently used responses parsed in memory, up to this many stored bytes
+CACHE_MEMORY_BYTES = int(os.environ.get("PVWATTS_CACHE_MEMORY_BYTES", 32 * 1024 * 1024))
+CACHE_PATH = os.environ.get(
+	"PVWATTS_CACHE_PATH",
+	os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "pvwatts_responses.sqlite3")
+)
+
+# Response cache shared by every worker: the SQLite file at CACHE_PATH (one host), or a
+# Redis server when PVWATTS_CACHE_URL is set. Workers also share one upstream fetch per key,
+# holding a lock in the cache for up to UPSTREAM_LOCK_TTL seconds while it runs.
+CACHE_URL = os.environ.get("PVWATTS_CACHE_URL")
+UPSTREAM_LOCK_TTL = float(os.environ.get("PVWATTS_UPSTREAM_LOCK_TTL", 60))
+
+# Persistent response cache, warm-loaded from disk so restarts don't hit NREL again. The
+# warm-up parses every preloaded response, so it runs in the background rather than at import.
+cache = open_store(
+	CACHE_URL, CACHE_PATH, ttl=CACHE_STALE_TIMEOUT, max_bytes=CACHE_MAX_BYTES, preload=False, memory_bytes=CACHE_MEMORY_BYTES
+)
+threading.Thread(target=cache.warm, name='cache-warm', daemon=True).start()
+
+# Pooled upstream client; concurrent misses for the same key share one upstream call
+nrel = NRELClient(NREL_API_URL, NREL_API_KEY, max_concurrency=UPSTREAM_MAX_CONCURRENCY)
+upstream_flights = SingleFlight()
+
+# Every upstream call takes a token, so all endpoints together stay within the key's quota
+upstream_limiter = TokenBucket.per_hour(NREL_HOURLY_QUOTA, NREL_BURST) if NREL_HOURLY_QUOTA > 0 else None
+
+# Fleet sites run here rather than on nrel.executor, which they wait on for shared fetches
+fleet_executor = ThreadPoolExecutor(max_workers=UPSTREAM_MAX_CONCURRENCY, thread_name_prefix='fleet')
+
+# Prometheus metrics, served at /metrics. Cache figures are read from the store when scraped.
+metrics = prometheus.Registry()
+REQUEST_DURATION = metrics.histogram(
+	"pvwatts_http_request_duration_seconds", "Time spent handling HTTP requests, by route.",
+	("route", "method", "status"))
+REQUESTS_IN_FLIGHT = metrics.gauge("pvwatts_http_requests_in_flight", "HTTP requests currently being handled.")
+UPSTREAM_DURATION = metrics.histogram(
+	"pvwatts_upstream_request_duration_seconds", "Latency of NREL PVWatts calls, by response status.",
+	("status",), buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0))
+UPSTREAM_REQUESTS = metrics.counter("pvwatts_upstream_requests_total", "NREL PVWatts calls, by response status.", ("status",))
+metrics.callback("pvwatts_cache_hits_total", "Cache lookups answered, by storage tier.",
+	lambda: {(tier,): count for tier, count in cache.stats()["hits"].items()}, kind="counter", labelnames=("tier",))
+metrics.callback("pvwatts_cache_misses_total", "Cache lookups that found nothing usable.", lambda: cache.stats()["misses"], kind="counter")
+metrics.callback("pvwatts_cache_expired_total", "Cache entries dropped on read for exceeding their TTL.", lambda: cache.stats()["expired"], kind="counter")
+metrics.callback("pvwatts_cache_evictions_total", "Cache entries evicted to stay within the byte budget.", lambda: cache.stats()["evictions"], kind="counter")
+metrics.callback("pvwatts_cache_entries", "Entries in the response cache.", lambda: len(cache))
+metrics.callback("pvwatts_cache_bytes", "Bytes stored in the response cache.", lambda: cache.size_bytes())
+metrics.callback("pvwatts_upstream_flights_in_flight", "Distinct upstream fetches currently running.", lambda: len(upstream_flights))
+
+def pvwatts_params(tilt, azimuth, lat=LAT, lon=LON, system_capacity=SYSTEM_CAPACITY, losses=LOSSES,
+				   array_type=ARRAY_TYPE, module_type=MODULE_TYPE):
+	"""PVWatts request parameters for an orientation (and optionally a site), without the API key."""
+	return {
+		"lat": lat,
+		"lon": lon,
+		"system_capacity": system_capacity,
+		"azimuth": round(float(azimuth), 2),
+		"tilt": round(float(tilt), 2),
+		"array_type": array_type,
+		"module_type": module_type,
+		"losses": losses
+	}
+
+def site_defaults():
+	"""Settings used for anything a fleet site does not specify."""
+	return {
+		"lat": LAT, "lon": LON, "system_capacity": SYSTEM_CAPACITY, "losses": LOSSES,
+		"tilt": DEFAULT_TILT, "azimuth": DEFAULT_AZIMUTH, "array_type": ARRAY_TYPE, "module_type": MODULE_TYPE
+	}
+
+def pvwatts_cache_key(params):
+	"""Cache key built from the normalized request parameters."""
+	return "pvwatts:" + "&".join(f"{name}={params[name]}" for name in sorted(params))
+
+def quota_timeout(wait_for_quota):
+	return None if wait_for_quota else NREL_QUOTA_WAIT
+
+def request_upstream(params, wait_for_quota=False):
+	"""
+	Call the NREL PVWatts API within the hourly quota, retrying throttled and failed calls.
+	The caller has already taken the first attempt's quota token.
+	"""
+	return fetch_with_retry(
+		timed_fetch, params, limiter=upstream_limiter, max_attempts=NREL_MAX_ATTEMPTS,
+		acquire_timeout=quota_timeout(wait_for_quota), prepaid=True
+	)
+
+def timed_fetch(params):
+	"""One NREL call, recording its latency and outcome in the upstream metrics."""
+	status = "error"
+	started = time.perf_counter()
+	try:
+		with spans.span('upstream'):
+			data = nrel.fetch(params)
+		status = "200"
+		return data
+	except requests.exceptions.HTTPError as e:
+		if e.response is not None:
+			status = str(e.response.status_code)
+		raise
+	except requests.exceptions.Timeout:
+		status = "timeout"
+		raise
+	except UnexpectedResponseError:
+		status = "unexpected"
+		raise
+	finally:
+		UPSTREAM_DURATION.observe(time.perf_counter() - started, status=status)
+		UPSTREAM_REQUESTS.inc(status=status)
+
+def cached_pvwatts(params, count=True):
+	"""
+	Cached PVWatts data for params, or None. Stale entries trigger a background refresh.
+	Re-checks of a key already looked up pass count=False, so each request counts once.
+	"""
+	key = pvwatts_cache_key(params)
+	entry = cache.get(key, count=count)
+	if entry is None:
+		return None
+	if time.time() - entry["fetched_at"] > CACHE_TIMEOUT:
+		refresh = upstream_flights.submit(key, lambda: refresh_pvwatts(key, params), nrel.executor)
+		refresh.add_done_callback(log_fetch_failure)
+	return entry["data"]
+
+def refresh_pvwatts(key, params, wait_for_quota=False):
+	"""
+	Fetch params from NREL and store the result. Only ever runs inside upstream_flights, and
+	across workers only one process fetches a key at a time; the others wait for its result.
+	Raises QuotaExhausted if no quota token is free within NREL_QUOTA_WAIT seconds, unless
+	wait_for_quota is set.
+	"""
+	def fetch():
+		data = request_upstream(params, wait_for_quota)
+		cache.set(key, {"data": data, "fetched_at": time.time()})
+		logger.info("Data fetched successfully from NREL PVWatts API.")
+		return data
+
+	def fetched_elsewhere():
+		# Read past this worker's memory tier, which cannot see other workers' writes
+		entry = cache.get(key, local=False, count=False)
+		if entry is not None and time.time() - entry["fetched_at"] <= CACHE_TIMEOUT:
+			return entry["data"]
+		return None
+
+	data = fetched_elsewhere()
+	if data is not None:
+		return data
+	# Take the quota token before the cross-worker lock, so waiting for quota never holds it
+	if upstream_limiter is not None:
+		upstream_limiter.take(quota_timeout(wait_for_quota))
+	return run_once(cache, key, fetch, fetched_elsewhere, lock_ttl=UPSTREAM_LOCK_TTL)
+
+def log_fetch_failure(future):
+	if future.exception() is not None:
+		logger.warning(f"Background fetch of PVWatts data failed: {future.exception()}")
+
+def fetch_pvwatts(tilt, azimuth):
+	"""Return PVWatts data for an orientation, from the cache when possible."""
+	return fetch_pvwatts_params(pvwatts_params(tilt, azimuth))
+
+def fetch_pvwatts_params(params, wait_for_quota=False):
+	"""Return PVWatts data for a full parameter set, from the cache when possible."""
+	data = cached_pvwatts(params)
+	if data is not None:
+		return data
+	key = pvwatts_cache_key(params)
+	return upstream_flights.do(key, lambda: cached_pvwatts(params, count=False) or refresh_pvwatts(key, params, wait_for_quota))
+
+def submit_pvwatts(params):
+	"""Start fetching an uncached orientation on the upstream pool; returns a Future."""
+	key = pvwatts_cache_key(params)
+	return upstream_flights.submit(key, lambda: cached_pvwatts(params, count=False) or refresh_pvwatts(key, params), nrel.executor)
+
+def fetch_pvwatts_many(points):
+	"""
+	PVWatts data for several (tilt, azimuth) points. Points missing from the cache are
+	fetched concurrently. Returns (results keyed by point, number of upstream fetches).
+	"""
+	results = {point: cached_pvwatts(pvwatts_params(*point)) for point in points}
+	missing = [point for point, data in results.items() if data is None]
+	if missing:
+		logger.debug(f"Fetching {len(missing)} of {len(points)} orientations from NREL")
+		futures = {point: submit_pvwatts(pvwatts_params(*point)) for point in missing}
+		for point, future in futures.items():
+			results[point] = future.result()
+	return results, len(missing)
+
+def parse_orientations(spec):
+	"""Parse 'tilt:azimuth,tilt:azimuth' into a list of (tilt, azimuth) floats."""
+	orientations = []
+	for pair in filter(None, (item.strip() for item in spec.split(','))):
+		tilt, azimuth = pair.split(':')
+		orientations.append((float(tilt), float(azimuth)))
+	return orientations
+
+def warm_cache(orientations):
+	"""Prefetch uncached orientations in the background. Returns the Futures started."""
+	futures = []
+	for tilt, azimuth in orientations:
+		params = pvwatts_params(tilt, azimuth)
+		if cached_pvwatts(params, count=False) is None:
+			future = submit_pvwatts(params)
+			future.add_done_callback(log_fetch_failure)
+			futures.append(future)
+	logger.info(f"Cache warm-up started for {len(futures)} of {len(orientations)} orientations")
+	return futures
+
+def fetch_pvwatts_interpolated(tilt, azimuth, step):
+	"""
+	PVWatts data for an orientation, bilinearly interpolated from the surrounding grid
+	points so that arbitrary slider positions share a small set of cached responses.
+	"""
+	corners = grid_corners(tilt, azimuth, step)
+	results, _ = fetch_pvwatts_many([point for point, _ in corners])
+	corner_data = [results[point] for point, _ in corners]
+	outputs, error_bound = interpolate_outputs(
+		[data["outputs"] for data in corner_data],
+		[weight for _, weight in corners]
+	)
+
+	data = dict(corner_data[0])
+	data["inputs"] = {**corner_data[0].get("inputs", {}), "tilt": tilt, "azimuth": azimuth}
+	data["outputs"] = outputs
+	data["interpolation"] = {
+		"grid_step": step,
+		"corners": [{"tilt": t, "azimuth": a, "weight": weight} for (t, a), weight in corners],
+		"error_bound": error_bound
+	}
+	return data
+
+def fetch_site_pvwatts(site):
+	# Fleet runs stream their results, so they queue for quota rather than fail
+	return fetch_pvwatts_params(pvwatts_params(
+		site.tilt, site.azimuth, lat=site.lat, lon=site.lon, system_capacity=site.system_capacity,
+		losses=site.losses, array_type=site.array_type, module_type=site.module_type
+	), wait_for_quota=True)
+
+def run_fleet(sites):
+	"""
+	Evaluate sites concurrently. Yields one result dict per site as it completes, then a
+	summary with the fleet-wide aggregates.
+	"""
+	results = []
+	for site, data, error in evaluate_fleet(sites, fetch_site_pvwatts, fleet_executor):
+		if error is None:
+			result = site_result(site, data)
+		else:
+			logger.warning(f"Fleet site '{site.id}' failed: {error}")
+			result = {"id": site.id, "status": "error", "error": str(error)}
+		results.append(result)
+		yield {"type": "site", **result}
+	yield {
+		"type": "summary",
+		"failed": sum(result["status"] != "ok" for result in results),
+		"aggregates": fleet_aggregates(results)
+	}
+
+def grid_size(start, stop, step):
+	"""Number of angles orientation_grid(start, stop, step) returns, checked before any are allocated."""
+	if not all(math.isfinite(value) for value in (start, stop, step)):
+		raise ValueError("range bounds and step sizes must be finite numbers")
+	if step <= 0:
+		raise ValueError("step sizes must be positive")
+	if stop < start:
+		raise ValueError("range maximum must not be below the minimum")
+	intervals = (stop - start) / step
+	if not math.isfinite(intervals):
+		raise ValueError("step size is too small for the range")
+	return math.floor(intervals + 1e-9) + 1  # Tolerance keeps stop itself when float division falls just short
+
+def check_orientation_bounds(tilts, azimuths):
+	"""Raise ValueError unless every tilt is within 0..90 degrees and every azimuth within 0..360 (exclusive)."""
+	if not all(math.isfinite(tilt) and 0 <= tilt <= 90 for tilt in tilts):
+		raise ValueError("tilt must be between 0 and 90 degrees")
+	if not all(math.isfinite(azimuth) and 0 <= azimuth < 360 for azimuth in azimuths):
+		raise ValueError("azimuth must be at least 0 and below 360 degrees")
+
+def orientation_grid(start, stop, step):
+	"""Inclusive range of angles from start to stop."""
+	return np.round(start + step * np.arange(grid_size(start, stop, step)), 2)
+
+@app.before_request
+def start_request_metrics():
+	g.request_started = time.perf_counter()
+	REQUESTS_IN_FLIGHT.inc()
+
+@app.after_request
+def record_response_status(response):
+	g.response_status = response.status_code
+	return response
+
+# cProfile can only run one profile at a time per process
+profile_lock = threading.Lock()
+
+def profile_requested():
+	token = request.headers.get('X-Profile-Token') or request.args.get('profile')
+	# Compared as bytes: compare_digest rejects str holding non-ASCII characters
+	return bool(PROFILE_TOKEN and token) and hmac.compare_digest(token.encode('utf-8'), PROFILE_TOKEN.encode('utf-8'))
+
+@app.before_request
+def start_profile():
+	if not profile_requested():
+		return None
+	import pstats
+	sort = request.args.get('profile_sort', pstats.SortKey.CUMULATIVE.value)
+	if sort not in {key.value for key in pstats.SortKey}:
+		return jsonify({"error": f"profile_sort must be one of {', '.join(key.value for key in pstats.SortKey)}"}), 400
+	g.profile_sort = sort
+	if not profile_lock.acquire(blocking=False):
+		return jsonify({"error": "Another request is being profiled"}), 429
+	g.span_collector = spans.collect()
+	g.spans = g.span_collector.__enter__()
+	import cProfile  # Only profiled requests pay for loading the profiler
+	g.profiler = cProfile.Profile()
+	g.profiler.enable()
+	return None
+
+@app.after_request
+def finish_profile(response):
+	profiler = g.pop('profiler', None)
+	if profiler is None:
+		return response
+	profiler.disable()
+	g.pop('span_collector').__exit__(None, None, None)
+	profile_lock.release()
+	records = g.pop('spans')
+
+	import pstats
+	report = io.StringIO()
+	report.write(f"{request.method} {request.full_path} -> {response.status_code}\n\nSpans:\n")
+	report.write((spans.format_spans(records) or "(none)") + "\n\nProfile:\n")
+	pstats.Stats(profiler, stream=report).sort_stats(g.pop('profile_sort')).print_stats(PROFILE_MAX_LINES)
+	profiled = Response(report.getvalue(), status=200, mimetype='text/plain')
+	profiled.headers['Server-Timing'] = spans.server_timing(records)
+	profiled.headers['Cache-Control'] = 'no-store'
+	return profiled
+
+@app.teardown_request
+def release_profile(error):
+	# Only reached with a profiler still set when the handler raised
+	profiler = g.pop('profiler', None)
+	if profiler is not None:
+		profiler.disable()
+		g.pop('span_collector').__exit__(None, None, None)
+		profile_lock.release()
+
+@app.teardown_request
+def finish_request_metrics(error):
+	# Runs after streamed responses finish, so their full duration is counted
+	started = g.pop('request_started', None)
+	if started is None:
+		return
+	REQUESTS_IN_FLIGHT.dec()
+	route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+	status = g.pop('response_status', 500)
+	REQUEST_DURATION.observe(time.perf_counter() - started, route=route, method=request.method, status=status)
+
+def quota_exhausted_response(error):
+	"""503 telling the client when the NREL quota should have a token again."""
+	logger.warning(str(error))
+	response = jsonify({"error": "NREL request quota exhausted; try again later"})
+	response.status_code = 503
+	response.headers['Retry-After'] = str(max(1, math.ceil(error.retry_after)))
+	return response
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+	return Response(metrics.render(), content_type=prometheus.CONTENT_TYPE)
 
 @app.route('/api/pvwatts', methods=['GET'])
-@cache.cached(timeout=300, query_string=True)
 def get_pvwatts_data():
 	try:
-		# Get tilt and azimuth from query parameters, fallback to defaults if not provided
-		tilt_param = request.args.get('tilt', DEFAULT_TILT, type=float)
-		azimuth_param = request.args.get('azimuth', DEFAULT_AZIMUTH, type=float)
-
-		params = {
-			"api_key": NREL_API_KEY,
-			"lat": LAT,
-			"lon": LON,
-			"system_capacity": SYSTEM_CAPACITY,
-			"azimuth": azimuth_param,
-			"tilt": tilt_param,
-			"array_type": ARRAY_TYPE,
-			"module_type": MODULE_TYPE,
-			"losses": LOSSES
-		}
-
-		logger.debug(f"Requesting PVWatts data from NREL with params: {params}")
-		
-		response = requests.get(NREL_API_URL, params=params, timeout=15)
-		response.raise_for_status()
-		data = response.json()
-
-		if "outputs" not in data:
-			logger.warning("Unexpected data format received from NREL API.")
-			return jsonify({"error": "Unexpected data format from NREL API"}), 502
+		with spans.span('parse'):
+			# Get tilt and azimuth from query parameters, fallback to defaults if not provided
+			tilt_param = request.args.get('tilt', DEFAULT_TILT, type=float)
+			azimuth_param = request.args.get('azimuth', DEFAULT_AZIMUTH, type=float)
+			try:
+				check_orientation_bounds([tilt_param], [azimuth_param])
+			except ValueError as e:
+				return jsonify({"error": str(e)}), 400
 
-		logger.info("Data fetched successfully from NREL PVWatts API.")
-		return jsonify(data), 200
+			grid_step = request.args.get('grid', ORIENTATION_GRID_STEP, type=float)
+			if not math.isfinite(grid_step) or not 0 <= grid_step <= 90:
+				return jsonify({"error": "grid must be between 0 and 90 degrees"}), 400
+
+			# Optional projection (fields=ac_monthly,poa_monthly) and compact hourly arrays (hourly=float32)
+			fields = [field for field in request.args.get('fields', '').split(',') if field]
+			hourly_format = request.args.get('hourly', 'json')
+			if hourly_format not in ('json', 'float32'):
+				return jsonify({"error": "hourly must be 'json' or 'float32'"}), 400
+
+			# resolution=daily|weekly|monthly replaces hourly arrays with cached rollups
+			resolution = request.args.get('resolution', 'hourly')
+			if resolution != 'hourly' and resolution not in RESOLUTIONS:
+				return jsonify({"error": f"resolution must be one of hourly, {', '.join(RESOLUTIONS)}"}), 400
 
+		with spans.span('fetch'):
+			if grid_step:
+				data = fetch_pvwatts_interpolated(tilt_param, azimuth_param, grid_step)
+			else:
+				data = fetch_pvwatts(tilt_param, azimuth_param)
+
+		with spans.span('serialize'):
+			if fields:
+				data = project_outputs(data, fields)
+			if resolution != 'hourly':
+				data = rollup_outputs(data, resolution)
+			if hourly_format == 'float32':
+				data = encode_hourly_float32(data)
+			return json_response(data)
+
+	except ProjectionError as e:
+		return jsonify({"error": str(e)}), 400
+	except QuotaExhausted as e:
+		return quota_exhausted_response(e)
+	except UnexpectedResponseError as e:
+		logger.warning(str(e))
+		return jsonify({"error": "Unexpected data format from NREL API"}), 502
 	except requests.exceptions.RequestException as e:
 		logger.error(f"Failed to fetch data from NREL PVWatts API: {e}")
 		return jsonify({"error": "Failed to fetch data from NREL PVWatts API"}), 502
@@ -79,6 +520,99 @@ def get_pvwatts_data():
 		logger.error(f"Unexpected error: {e}\n{traceback.format_exc()}")
 		return jsonify({"error": "An unexpected error occurred."}), 500
 
+@app.route('/api/pvwatts/sweep', methods=['GET'])
+def sweep_pvwatts_data():
+	"""Evaluate annual AC yield over a tilt x azimuth grid and report the best orientation."""
+	tilt_range = (
+		request.args.get('tilt_min', 0.0, type=float),
+		request.args.get('tilt_max', 90.0, type=float),
+		request.args.get('tilt_step', 10.0, type=float)
+	)
+	azimuth_range = (
+		request.args.get('azimuth_min', 90.0, type=float),
+		request.args.get('azimuth_max', 270.0, type=float),
+		request.args.get('azimuth_step', 30.0, type=float)
+	)
+	multiplier = request.args.get('multiplier', 1.0, type=float)
+	try:
+		# Size the grid before building it, so oversized requests never allocate it
+		size = grid_size(*tilt_range) * grid_size(*azimuth_range)
+		check_orientation_bounds(tilt_range[:2], azimuth_range[:2])
+	except ValueError as e:
+		return jsonify({"error": str(e)}), 400
+	if not math.isfinite(multiplier) or multiplier <= 0:
+		return jsonify({"error": "multiplier must be a positive number"}), 400
+	if size > SWEEP_MAX_POINTS:
+		return jsonify({"error": f"Sweep grid has {size} points; the limit is {SWEEP_MAX_POINTS}."}), 400
+
+	tilts = orientation_grid(*tilt_range)
+	azimuths = orientation_grid(*azimuth_range)
+	points = [(tilt, azimuth) for tilt in tilts for azimuth in azimuths]
+
+	try:
+		# Only the grid points missing from the cache go upstream, concurrently
+		results, upstream_requests = fetch_pvwatts_many(points)
+
+		monthly = np.array([results[point]["outputs"]["ac_monthly"] for point in points], dtype='float64')
+		annual = monthly.reshape(len(tilts), len(azimuths), -1).sum(axis=2) * multiplier
+		best_tilt, best_azimuth = np.unravel_index(np.nanargmax(annual), annual.shape)
+
+		return json_response({
+			"tilts": tilts.tolist(),
+			"azimuths": azimuths.tolist(),
+			"multiplier": multiplier,
+			"annual_ac": annual.tolist(),
+			"optimum": {
+				"tilt": float(tilts[best_tilt]),
+				"azimuth": float(azimuths[best_azimuth]),
+				"ac_annual": float(annual[best_tilt, best_azimuth])
+			},
+			"upstream_requests": upstream_requests
+		})
+
+	except QuotaExhausted as e:
+		return quota_exhausted_response(e)
+	except UnexpectedResponseError as e:
+		logger.warning(str(e))
+		return jsonify({"error": "Unexpected data format from NREL API"}), 502
+	except requests.exceptions.RequestException as e:
+		logger.error(f"Failed to fetch sweep data from NREL PVWatts API: {e}")
+		return jsonify({"error": "Failed to fetch data from NREL PVWatts API"}), 502
+	except Exception as e:
+		logger.error(f"Unexpected error: {e}\n{traceback.format_exc()}")
+		return jsonify({"error": "An unexpected error occurred."}), 500
+
+@app.route('/api/pvwatts/fleet', methods=['POST'])
+def fleet_pvwatts_data():
+	"""
+	Evaluate a list of sites, posted as {"sites": [{"id", "lat", "lon", "system_capacity",
+	"losses", "tilt", "azimuth", ...}]}. Streams newline-delimited JSON: one line per site
+	as it completes, then a summary line with fleet-wide aggregates.
+	"""
+	body = request.get_json(silent=True) or {}
+	records = body.get("sites")
+	if not isinstance(records, list) or not records:
+		return jsonify({"error": "sites must be a non-empty list"}), 400
+	if len(records) > FLEET_MAX_SITES:
+		return jsonify({"error": f"Fleet has {len(records)} sites; the limit is {FLEET_MAX_SITES}."}), 400
+	try:
+		sites = parse_sites(records, site_defaults())
+	except (AttributeError, ValueError) as e:
+		return jsonify({"error": str(e)}), 400
+
+	def generate():
+		for line in run_fleet(sites):
+			yield json.dumps(line) + "\n"
+
+	return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+try:
+	warmup_orientations = parse_orientations(WARMUP_ORIENTATIONS)
+except ValueError:
+	logger.error(f"Ignoring malformed PVWATTS_WARMUP '{WARMUP_ORIENTATIONS}'; expected tilt:azimuth pairs separated by commas")
+else:
+	warm_cache(warmup_orientations)
+
 if __name__ == '__main__':
 	# Make sure you run this from the directory where app.py and .env are located.
 	app.run(debug=True, host="0.0.0.0", port=5001)
\ No newline at end of file
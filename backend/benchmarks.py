@@ -0,0 +1,339 @@
+# benchmarks.py
+#
+# Reproducible benchmarks for the adjustment, ingestion and API hot paths.
+#
+#   python benchmarks.py --sizes 1e3,1e4,1e5,1e6 --output bench.json
+#   python benchmarks.py --compare bench.json --tolerance 0.25   # exits 1 on a regression
+#
+# Inputs are generated from a fixed seed, results are written as JSON, and the API
+# benchmark runs against the local NREL stub, so no network access or API key is needed.
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+SIMULATION_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "simulation")
+if SIMULATION_DIR not in sys.path:
+	sys.path.append(SIMULATION_DIR)
+
+import adjust_engine
+import data_processor
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+ALL_SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+# The per-row implementations take minutes beyond this many rows, so they are skipped there
+SLOW_MAX_ROWS = 100_000
+SEED = 20241105
+# Synthetic rows per 'Fetched At' value, i.e. per fetch run
+FETCH_BATCH_ROWS = 10_000
+
+def synthetic_forecasts(rows, seed=SEED):
+	"""A forecast frame shaped like solar_forecasts.csv, with a realistic diurnal profile."""
+	rng = np.random.default_rng(seed)
+	period_end = pd.date_range('2024-11-05 22:30', periods=rows, freq='30min', tz='UTC')
+	hour = (np.arange(rows) % 48) / 2.0
+	daylight = np.clip(np.sin((hour - 6.0) / 12.0 * np.pi), 0.0, None)
+	ghi = daylight * rng.uniform(200.0, 900.0, rows)
+	pv = (ghi / 1000.0 * 4.0).round(4)
+	pv[rng.random(rows) < 0.01] = np.nan  # Written as 'N/A', as the fetcher does
+	return pd.DataFrame({
+		'PV Estimate': pv,
+		'Period End': period_end,
+		'Period': 'PT30M',
+		'GHI': ghi.round(1),
+		'DNI': (ghi * rng.uniform(0.5, 0.9, rows)).round(1),
+		'DHI': (ghi * rng.uniform(0.1, 0.3, rows)).round(1),
+		'Temperature (C)': (8.0 + 6.0 * daylight + rng.normal(0.0, 1.0, rows)).round(1),
+		'Fetched At': period_end[np.arange(rows) // FETCH_BATCH_ROWS * FETCH_BATCH_ROWS].floor('h')
+	})
+
+def write_synthetic_csv(path, rows, seed=SEED):
+	synthetic_forecasts(rows, seed).to_csv(path, index=False, na_rep='N/A')
+	return path
+
+def measure(fn, repeat=5, min_sample=0.01):
+	"""
+	Per-call timings of fn() in seconds, one per sample. Like timeit, fast calls are
+	looped so that each sample takes at least min_sample, keeping timer noise out.
+	"""
+	number = 1
+	while True:
+		t0 = time.perf_counter()
+		for _ in range(number):
+			fn()
+		elapsed = time.perf_counter() - t0
+		if elapsed >= min_sample:
+			break
+		number = max(number * 2, int(number * min_sample / max(elapsed, 1e-9)))
+	timings = [elapsed / number]
+	for _ in range(repeat - 1):
+		t0 = time.perf_counter()
+		for _ in range(number):
+			fn()
+		timings.append((time.perf_counter() - t0) / number)
+	return timings
+
+def calibrate():
+	"""
+	Best time of a fixed mix of interpreter and NumPy work. Reports are compared relative
+	to it, so a slower or busier machine does not read as a regression.
+	"""
+	data = np.random.default_rng(SEED).random(200_000)
+
+	def workload():
+		total = 0.0
+		for value in range(20_000):
+			total += value * 0.5
+		np.sort(data * total)
+
+	return min(measure(workload, repeat=7))
+
+def record(results, name, rows, timings, **extra):
+	median = float(np.median(timings))
+	result = {
+		"name": name,
+		"rows": rows,
+		"runs": len(timings),
+		"min_s": float(min(timings)),
+		"median_s": median,
+		"rows_per_s": rows / median if rows and median else None,
+		**extra
+	}
+	results.append(result)
+	print(f"{name:<28} {rows:>10} rows  median {median * 1000:10.3f} ms", file=sys.stderr)
+	return result
+
+# Earlier per-row implementations, kept as baselines for the batch paths
+
+def scalar_adjust(value, multiplier, azimuth, tilt):
+	"""
+	The single-value model in Python. The compiled adjust_pv_estimate prints every call to
+	stdout, which would swamp the report, so the per-row baselines use this port instead.
+	"""
+	azimuth_factor = max(1.0 - adjust_engine.AZIMUTH_PENALTY * abs(azimuth - adjust_engine.OPTIMAL_AZIMUTH), adjust_engine.AZIMUTH_FLOOR)
+	tilt_factor = max(1.0 - adjust_engine.TILT_PENALTY * abs(tilt - adjust_engine.OPTIMAL_TILT), adjust_engine.TILT_FLOOR)
+	return value * multiplier * (azimuth_factor * tilt_factor)
+
+def adjust_apply(df, column, multiplier, azimuth, tilt):
+	"""Original data_processor.adjust_pv: df.apply with one model call per row."""
+	df[f'Adjusted_{column}'] = df[column].apply(lambda value: scalar_adjust(value, multiplier, azimuth, tilt))
+	return df
+
+def adjust_row_loop(df, column, multiplier, azimuth, tilt):
+	"""Original gui.adjust_pv: a Python loop formatting one log line per row."""
+	log_lines = []
+	adjusted_values = []
+	for index, value in df[column].items():
+		adjusted = scalar_adjust(value, multiplier, azimuth, tilt)
+		adjusted_values.append(adjusted)
+		log_lines.append(f"Row {index}: Original = {value}, Adjusted = {adjusted}\n")
+	df[f'Adjusted_{column}'] = adjusted_values
+	return df
+
+def bench_adjust(results, rows, repeat):
+	df = synthetic_forecasts(rows)
+	settings = (1.2, 200.0, 25.0)
+	if rows <= SLOW_MAX_ROWS:
+		record(results, "adjust.apply", rows, measure(lambda: adjust_apply(df.copy(), 'PV Estimate', *settings), min(repeat, 3), 0))
+		record(results, "adjust.row_loop", rows, measure(lambda: adjust_row_loop(df.copy(), 'PV Estimate', *settings), min(repeat, 3), 0))
+	record(results, "adjust.batch", rows, measure(lambda: data_processor.adjust_pv(df, 'PV Estimate', *settings), repeat))
+
+	values = df['PV Estimate'].to_numpy(dtype='float64', na_value=np.nan)
+	out = np.empty_like(values)
+	for backend in adjust_engine.available_backends():
+		record(results, f"adjust.backend.{backend}", rows,
+			measure(lambda: adjust_engine.adjust_pv_batch(values, *settings, out=out, backend=backend), repeat))
+
+	engine = adjust_engine.AdjustmentEngine(values)
+	engine.adjust(*settings, out=out)
+	record(results, "adjust.engine.multiplier_only", rows, measure(lambda: engine.adjust(1.3, 200.0, 25.0, out=out), repeat))
+
+	scenarios = [data_processor.Scenario(f"s{i}", 0.8 + 0.1 * i, 150.0 + 15 * i, 20.0 + 5 * i) for i in range(4)]
+	record(results, "adjust.scenarios_4x3", rows,
+		measure(lambda: data_processor.adjust_scenarios(df, ['PV Estimate', 'GHI', 'DNI'], scenarios), repeat))
+
+def bench_io(results, rows, repeat, workdir):
+	csv_path = write_synthetic_csv(os.path.join(workdir, f"forecasts_{rows}.csv"), rows)
+	record(results, "ingest.load_data", rows, measure(lambda: data_processor.load_data(csv_path), repeat),
+		bytes=os.path.getsize(csv_path))
+	record(results, "ingest.iter_data", rows, measure(lambda: sum(len(chunk) for chunk in data_processor.iter_data(csv_path)), repeat))
+
+	df = data_processor.adjust_pv(data_processor.load_data(csv_path), 'PV Estimate', 1.2)
+	output_csv = os.path.join(workdir, f"adjusted_{rows}.csv")
+	record(results, "save.csv", rows, measure(lambda: data_processor.save_adjusted_data(df, csv_path, output_csv), repeat))
+
+	try:
+		import pyarrow  # noqa: F401
+	except ImportError:
+		print("pyarrow not installed; skipping columnar benchmarks", file=sys.stderr)
+		return
+	from forecast_store import ForecastStore, _prepare
+	prepared = _prepare(df)
+	counter = iter(range(1_000_000))
+
+	def save_store():
+		ForecastStore(os.path.join(workdir, f"store_{rows}_{next(counter)}")).append(prepared)
+
+	record(results, "save.columnar", rows, measure(save_store, repeat))
+	store = ForecastStore(os.path.join(workdir, f"store_{rows}_read"))
+	store.append(prepared)
+	record(results, "ingest.columnar", rows, measure(store.read_frame, repeat))
+
+def percentiles(latencies):
+	p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+	return {"p50_ms": p50 * 1000, "p95_ms": p95 * 1000, "p99_ms": p99 * 1000}
+
+def bench_api(results, requests_total=2000, threads=8):
+	"""/api/pvwatts latency (cold and cached) and throughput, with NREL replaced by the local stub."""
+	from nrel_stub import start_stub
+	stub = start_stub()
+	os.environ["NREL_API_URL"] = stub.url
+	os.environ.setdefault("NREL_API_KEY", "benchmark")
+	os.environ["PVWATTS_CACHE_PATH"] = ":memory:"
+	os.environ["PVWATTS_WARMUP"] = ""
+	os.environ["NREL_HOURLY_QUOTA"] = "0"
+	import logging
+	import app as backend
+	logging.getLogger().setLevel(logging.WARNING)
+	client = backend.app.test_client()
+
+	try:
+		cold = []
+		for tilt in range(0, 40, 2):
+			t0 = time.perf_counter()
+			assert client.get(f'/api/pvwatts?tilt={tilt}&azimuth=180').status_code == 200
+			cold.append(time.perf_counter() - t0)
+		record(results, "api.pvwatts.cold", 0, cold, **percentiles(cold))
+
+		warm = []
+		for i in range(200):
+			t0 = time.perf_counter()
+			client.get(f'/api/pvwatts?tilt={(i % 20) * 2}&azimuth=180&fields=ac_monthly')
+			warm.append(time.perf_counter() - t0)
+		record(results, "api.pvwatts.cached", 0, warm, **percentiles(warm))
+
+		lock = threading.Lock()
+		latencies = []
+
+		def worker(count):
+			local_client = backend.app.test_client()
+			local = []
+			for i in range(count):
+				t0 = time.perf_counter()
+				local_client.get(f'/api/pvwatts?tilt={(i % 20) * 2}&azimuth=180&fields=ac_monthly')
+				local.append(time.perf_counter() - t0)
+			with lock:
+				latencies.extend(local)
+
+		started = time.perf_counter()
+		with ThreadPoolExecutor(threads) as pool:
+			list(pool.map(worker, [requests_total // threads] * threads))
+		elapsed = time.perf_counter() - started
+		record(results, "api.pvwatts.throughput", 0, [elapsed], threads=threads, requests=len(latencies),
+			requests_per_s=len(latencies) / elapsed, upstream_requests=stub.request_count, **percentiles(latencies))
+	finally:
+		stub.shutdown()
+		stub.server_close()
+
+def environment():
+	try:
+		commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+			cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+	except OSError:
+		commit = None
+	return {
+		"timestamp": time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+		"commit": commit,
+		"python": platform.python_version(),
+		"platform": platform.platform(),
+		"numpy": np.__version__,
+		"pandas": pd.__version__,
+		"backends": adjust_engine.available_backends(),
+		"seed": SEED,
+		"calibration_s": calibrate()
+	}
+
+def run(sizes=DEFAULT_SIZES, suites=('adjust', 'io', 'api'), repeat=5):
+	results = []
+	with tempfile.TemporaryDirectory() as workdir:
+		for rows in sizes:
+			if 'adjust' in suites:
+				bench_adjust(results, rows, repeat)
+			if 'io' in suites:
+				bench_io(results, rows, repeat, workdir)
+	if 'api' in suites:
+		bench_api(results)
+	return {"environment": environment(), "results": results}
+
+def compare(report, baseline, tolerance):
+	"""
+	Benchmarks whose best run got more than tolerance (a fraction) slower than the
+	baseline's. The minimum is compared because it is the least affected by other load,
+	and both are scaled by their report's calibration time when available.
+	"""
+	scale = 1.0
+	calibration = report.get("environment", {}).get("calibration_s")
+	baseline_calibration = baseline.get("environment", {}).get("calibration_s")
+	if calibration and baseline_calibration:
+		scale = calibration / baseline_calibration
+	previous = {(result["name"], result["rows"]): result for result in baseline["results"]}
+	regressions = []
+	for result in report["results"]:
+		before = previous.get((result["name"], result["rows"]))
+		if not before:
+			continue
+		slowdown = result["min_s"] / (before["min_s"] * scale)
+		if slowdown > 1 + tolerance:
+			regressions.append({
+				"name": result["name"],
+				"rows": result["rows"],
+				"baseline_s": before["min_s"],
+				"min_s": result["min_s"],
+				"machine_scale": scale,
+				"slowdown": slowdown
+			})
+	return regressions
+
+def parse_sizes(spec):
+	return [int(float(size)) for size in spec.split(',') if size.strip()]
+
+def main():
+	parser = argparse.ArgumentParser(description="Benchmark the adjustment, ingestion and API hot paths")
+	parser.add_argument('--sizes', type=parse_sizes, default=DEFAULT_SIZES,
+		help="Comma-separated row counts, e.g. 1e3,1e5,1e7 (default: 1e3..1e6)")
+	parser.add_argument('--suites', default='adjust,io,api', help="Comma-separated subset of adjust,io,api")
+	parser.add_argument('--repeat', type=int, default=5, help="Runs per benchmark for the fast paths")
+	parser.add_argument('--output', help="Write the JSON report here instead of stdout")
+	parser.add_argument('--compare', help="Baseline JSON report to check for regressions")
+	parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed slowdown before failing (0.25 = 25%%)")
+	args = parser.parse_args()
+
+	report = run(args.sizes, args.suites.split(','), args.repeat)
+	if args.compare:
+		with open(args.compare) as f:
+			report["regressions"] = compare(report, json.load(f), args.tolerance)
+
+	text = json.dumps(report, indent=2)
+	if args.output:
+		with open(args.output, 'w') as f:
+			f.write(text + "\n")
+	else:
+		print(text)
+
+	for regression in report.get("regressions", []):
+		print(f"REGRESSION {regression['name']} ({regression['rows']} rows): "
+			f"{regression['slowdown']:.2f}x slower than baseline", file=sys.stderr)
+	return 1 if report.get("regressions") else 0
+
+if __name__ == '__main__':
+	sys.exit(main())
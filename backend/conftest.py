@@ -0,0 +1,8 @@
+import os
+
+# Keep the PVWatts response cache out of backend/cache while testing
+os.environ.setdefault("PVWATTS_CACHE_PATH", ":memory:")
+# No background NREL calls when the app module is imported
+os.environ.setdefault("PVWATTS_WARMUP", "")
+# Tests replace the upstream with fakes, which need no request quota
+os.environ.setdefault("NREL_HOURLY_QUOTA", "0")
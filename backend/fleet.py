@@ -0,0 +1,271 @@
+# fleet.py
+#
+# Multi-site PVWatts evaluation: site parsing, a token-bucket limiter for the NREL
+# hourly quota, retries with backoff and Retry-After, and fleet-wide aggregates.
+#
+# Evaluate a site list (CSV or JSON) from the command line with:
+#   python fleet.py sites.csv > results.ndjson
+
+import argparse
+import csv
+import json
+import logging
+import math
+import random
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import as_completed
+from email.utils import parsedate_to_datetime
+
+import numpy as np
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying: throttling and transient upstream failures
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+SITE_FIELDS = ('id', 'lat', 'lon', 'system_capacity', 'losses', 'tilt', 'azimuth', 'array_type', 'module_type')
+Site = namedtuple('Site', SITE_FIELDS)
+
+class QuotaExhausted(Exception):
+	"""No quota token could be taken in time; retry_after is the estimated wait in seconds."""
+
+	def __init__(self, retry_after):
+		super().__init__(f"NREL request quota exhausted; retry in {retry_after:.0f}s")
+		self.retry_after = retry_after
+
+class TokenBucket:
+	"""
+	Thread-safe token bucket. Tokens refill continuously at rate per second up to
+	capacity; acquire() blocks until one is available. pause() stops all acquirers
+	until a deadline, for when upstream asks everyone to back off.
+	"""
+
+	def __init__(self, rate, capacity, clock=time.monotonic, sleep=time.sleep):
+		if rate <= 0 or capacity < 1:
+			raise ValueError("rate must be positive and capacity at least 1")
+		self.rate = rate
+		self.capacity = capacity
+		self._clock = clock
+		self._sleep = sleep
+		self._lock = threading.Lock()
+		self._tokens = float(capacity)
+		self._updated = clock()
+		self._resume_at = 0.0
+
+	@classmethod
+	def per_hour(cls, quota, burst=None, **kwargs):
+		"""A bucket that allows quota requests per hour, at most burst of them back to back."""
+		return cls(quota / 3600.0, min(burst or quota, quota), **kwargs)
+
+	def _wait_time(self):
+		"""Take a token and return 0, or return the seconds until one may be available."""
+		with self._lock:
+			now = self._clock()
+			if now < self._resume_at:
+				return self._resume_at - now
+			self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+			self._updated = now
+			if self._tokens >= 1:
+				self._tokens -= 1
+				return 0.0
+			return (1 - self._tokens) / self.rate
+
+	def wait_time(self):
+		"""Seconds until a token may be available, without taking one."""
+		with self._lock:
+			now = self._clock()
+			if now < self._resume_at:
+				return self._resume_at - now
+			tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+			return 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+
+	def acquire(self, timeout=None):
+		"""Block until a token is taken. Returns False if that would take longer than timeout."""
+		deadline = None if timeout is None else self._clock() + timeout
+		while True:
+			wait = self._wait_time()
+			if wait == 0:
+				return True
+			if deadline is not None and self._clock() + wait > deadline:
+				return False
+			self._sleep(wait)
+
+	def take(self, timeout=None):
+		"""acquire(timeout), raising QuotaExhausted instead of returning False."""
+		if not self.acquire(timeout):
+			raise QuotaExhausted(self.wait_time())
+
+	def pause(self, seconds):
+		"""Hand out no tokens for the next seconds."""
+		with self._lock:
+			self._resume_at = max(self._resume_at, self._clock() + seconds)
+
+def retry_after(response):
+	"""Seconds requested by a Retry-After header (delta seconds or HTTP date), or None."""
+	value = response.headers.get('Retry-After') if response is not None else None
+	if not value:
+		return None
+	try:
+		return max(float(value), 0.0)
+	except ValueError:
+		pass
+	try:
+		return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+	except (TypeError, ValueError):
+		return None
+
+def fetch_with_retry(fetch, params, limiter=None, max_attempts=4, backoff=1.0, max_delay=60.0, sleep=time.sleep,
+					 acquire_timeout=None, prepaid=False):
+	"""
+	fetch(params) with one limiter token per attempt. Throttled (429), 5xx, connection and
+	timeout failures are retried with jittered exponential backoff, or after Retry-After
+	when upstream sends one; a throttled Retry-After pauses the shared limiter.
+	Waiting for a token gives up with QuotaExhausted after acquire_timeout seconds (None
+	waits as long as the quota needs). With prepaid, the caller already took the first
+	attempt's token.
+	"""
+	for attempt in range(1, max_attempts + 1):
+		if limiter is not None and not (prepaid and attempt == 1):
+			limiter.take(acquire_timeout)
+		try:
+			return fetch(params)
+		except requests.exceptions.HTTPError as e:
+			status = e.response.status_code if e.response is not None else None
+			if status not in RETRY_STATUSES or attempt == max_attempts:
+				raise
+			delay = retry_after(e.response)
+			reason = f"HTTP {status}"
+		except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+			if attempt == max_attempts:
+				raise
+			status = None
+			delay = None
+			reason = type(e).__name__
+
+		if delay is None:
+			delay = backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.0)
+		delay = min(delay, max_delay)
+		logger.warning(f"PVWatts request failed ({reason}); retry {attempt}/{max_attempts - 1} in {delay:.1f}s")
+		if status == 429 and limiter is not None:
+			limiter.pause(delay)  # The next acquire() waits, for every caller sharing the quota
+		else:
+			sleep(delay)
+
+def parse_site(record, defaults, index=0):
+	"""A Site from a dict of site settings, with defaults for anything not given."""
+	site_id = str(record.get('id') or record.get('name') or f"site-{index + 1}")
+	values = {}
+	for field in SITE_FIELDS[1:]:
+		value = record.get(field)
+		if value in (None, ''):
+			value = defaults[field]
+		try:
+			values[field] = int(value) if field in ('array_type', 'module_type') else float(value)
+		except (TypeError, ValueError):
+			raise ValueError(f"Site '{site_id}': {field} must be a number, got {value!r}")
+		if not math.isfinite(values[field]):
+			raise ValueError(f"Site '{site_id}': {field} must be a finite number, got {value!r}")
+	if values['system_capacity'] <= 0:
+		raise ValueError(f"Site '{site_id}': system_capacity must be positive")
+	if not 0 <= values['tilt'] <= 90:
+		raise ValueError(f"Site '{site_id}': tilt must be between 0 and 90 degrees")
+	if not 0 <= values['azimuth'] < 360:
+		raise ValueError(f"Site '{site_id}': azimuth must be between 0 and 360 degrees")
+	if not -5 <= values['losses'] <= 99:
+		raise ValueError(f"Site '{site_id}': losses must be between -5 and 99 percent")
+	if not (-90 <= values['lat'] <= 90 and -180 <= values['lon'] <= 180):
+		raise ValueError(f"Site '{site_id}': lat/lon out of range")
+	return Site(id=site_id, **values)
+
+def parse_sites(records, defaults):
+	sites = [parse_site(record, defaults, index) for index, record in enumerate(records)]
+	ids = [site.id for site in sites]
+	if len(set(ids)) != len(ids):
+		raise ValueError("Site ids must be unique")
+	return sites
+
+def site_result(site, data):
+	"""Per-site summary streamed back to the caller."""
+	outputs = data["outputs"]
+	ac_annual = float(outputs["ac_annual"])
+	return {
+		"id": site.id,
+		"status": "ok",
+		"system_capacity": site.system_capacity,
+		"ac_annual": ac_annual,
+		"ac_monthly": [float(value) for value in outputs["ac_monthly"]],
+		"specific_yield": ac_annual / site.system_capacity,
+		"capacity_factor": outputs.get("capacity_factor")
+	}
+
+def evaluate_fleet(sites, fetch_site, executor):
+	"""
+	Run fetch_site(site) for every site on executor and yield (site, data, error) in
+	completion order. Sites not yet started are cancelled if the consumer stops early.
+	"""
+	futures = {executor.submit(fetch_site, site): site for site in sites}
+	try:
+		for future in as_completed(futures):
+			site = futures[future]
+			try:
+				yield site, future.result(), None
+			except Exception as e:
+				yield site, None, e
+	finally:
+		for future in futures:
+			future.cancel()
+
+def fleet_aggregates(results):
+	"""Fleet-wide totals and distributions, computed over the site axis in one pass."""
+	ok = [result for result in results if result["status"] == "ok"]
+	if not ok:
+		return {"sites": 0}
+	ids = np.array([result["id"] for result in ok])
+	capacity = np.array([result["system_capacity"] for result in ok], dtype='float64')
+	monthly = np.array([result["ac_monthly"] for result in ok], dtype='float64')  # (sites, months)
+	annual = monthly.sum(axis=1)
+	specific = annual / capacity
+	p10, p50, p90 = np.percentile(specific, [10, 50, 90])
+	return {
+		"sites": len(ok),
+		"system_capacity_kw": float(capacity.sum()),
+		"ac_annual_kwh": float(annual.sum()),
+		"ac_monthly_kwh": monthly.sum(axis=0).tolist(),
+		"capacity_factor": float(annual.sum() / (capacity.sum() * 8760) * 100),
+		"specific_yield": {
+			"mean": float(specific.mean()),
+			"min": float(specific.min()),
+			"max": float(specific.max()),
+			"p10": float(p10),
+			"p50": float(p50),
+			"p90": float(p90)
+		},
+		"best_site": str(ids[np.argmax(specific)]),
+		"worst_site": str(ids[np.argmin(specific)])
+	}
+
+def read_site_file(path):
+	"""Site records from a CSV file with a header row, or a JSON list (or {"sites": [...]})."""
+	with open(path, newline='') as f:
+		if path.endswith('.json'):
+			records = json.load(f)
+			return records["sites"] if isinstance(records, dict) else records
+		return list(csv.DictReader(f))
+
+def main():
+	logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s', stream=sys.stderr)
+	parser = argparse.ArgumentParser(description="Evaluate a fleet of PV sites against PVWatts")
+	parser.add_argument('sites', help="CSV (with a header row) or JSON file of sites")
+	args = parser.parse_args()
+
+	import app as backend  # Shares the backend's cache, quota limiter and retry settings
+	sites = parse_sites(read_site_file(args.sites), backend.site_defaults())
+	for line in backend.run_fleet(sites):
+		print(json.dumps(line), flush=True)
+
+if __name__ == '__main__':
+	main()
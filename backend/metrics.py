@@ -0,0 +1,169 @@
+# metrics.py
+#
+# Minimal Prometheus instrumentation: counters, gauges and histograms rendered in the
+# text exposition format. Updates are a dict lookup and an add under a lock, so they are
+# cheap enough to leave on; values that already exist elsewhere (cache sizes and hit
+# counts) are read through callbacks at scrape time instead of being tracked twice.
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value):
+	return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names, values, extra=()):
+	pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+	return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value):
+	if value == float("inf"):
+		return "+Inf"
+	return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+	kind = None
+
+	def __init__(self, name, documentation, labelnames=()):
+		self.name = name
+		self.documentation = documentation
+		self.labelnames = tuple(labelnames)
+		self._lock = threading.Lock()
+		self._values = {}
+
+	def _key(self, labels):
+		if set(labels) != set(self.labelnames):
+			raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+		return tuple(str(labels[name]) for name in self.labelnames)
+
+	def header(self):
+		return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+	def render(self):
+		with self._lock:
+			items = sorted(self._values.items())
+		return self.header() + [f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in items]
+
+class Counter(_Metric):
+	kind = "counter"
+
+	def inc(self, amount=1, **labels):
+		key = self._key(labels)
+		with self._lock:
+			self._values[key] = self._values.get(key, 0) + amount
+
+	def value(self, **labels):
+		return self._values.get(self._key(labels), 0)
+
+class Gauge(_Metric):
+	kind = "gauge"
+
+	def inc(self, amount=1, **labels):
+		key = self._key(labels)
+		with self._lock:
+			self._values[key] = self._values.get(key, 0) + amount
+
+	def dec(self, amount=1, **labels):
+		self.inc(-amount, **labels)
+
+	def set(self, value, **labels):
+		key = self._key(labels)
+		with self._lock:
+			self._values[key] = value
+
+	def value(self, **labels):
+		return self._values.get(self._key(labels), 0)
+
+class Histogram(_Metric):
+	kind = "histogram"
+
+	def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+		super().__init__(name, documentation, labelnames)
+		self.buckets = tuple(sorted(buckets))
+
+	def observe(self, value, **labels):
+		key = self._key(labels)
+		index = bisect.bisect_left(self.buckets, value)
+		with self._lock:
+			state = self._values.get(key)
+			if state is None:
+				state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+			state[0][index] += 1  # Per-bucket counts; made cumulative when rendered
+			state[1] += value
+			state[2] += 1
+
+	@contextmanager
+	def time(self, **labels):
+		started = time.perf_counter()
+		try:
+			yield
+		finally:
+			self.observe(time.perf_counter() - started, **labels)
+
+	def count(self, **labels):
+		state = self._values.get(self._key(labels))
+		return state[2] if state else 0
+
+	def render(self):
+		with self._lock:
+			items = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items())
+		lines = self.header()
+		for key, (counts, total, count) in items:
+			cumulative = 0
+			for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+				cumulative += bucket_count
+				lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, [('le', _number(float(bound)))])} {cumulative}")
+			lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+			lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+		return lines
+
+class CallbackMetric:
+	"""A gauge or counter whose samples are read from callback() at scrape time."""
+
+	def __init__(self, name, documentation, callback, kind="gauge", labelnames=()):
+		self.name = name
+		self.documentation = documentation
+		self.callback = callback
+		self.kind = kind
+		self.labelnames = tuple(labelnames)
+
+	def render(self):
+		lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+		samples = self.callback()
+		if not isinstance(samples, dict):
+			samples = {(): samples}
+		for key, value in sorted(samples.items()):
+			key = key if isinstance(key, tuple) else (key,)
+			lines.append(f"{self.name}{_labels(self.labelnames, key)} {_number(value)}")
+		return lines
+
+class Registry:
+	def __init__(self):
+		self._metrics = []
+
+	def register(self, metric):
+		self._metrics.append(metric)
+		return metric
+
+	def counter(self, name, documentation, labelnames=()):
+		return self.register(Counter(name, documentation, labelnames))
+
+	def gauge(self, name, documentation, labelnames=()):
+		return self.register(Gauge(name, documentation, labelnames))
+
+	def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+		return self.register(Histogram(name, documentation, labelnames, buckets))
+
+	def callback(self, name, documentation, callback, kind="gauge", labelnames=()):
+		return self.register(CallbackMetric(name, documentation, callback, kind, labelnames))
+
+	def render(self):
+		"""All metrics in the Prometheus text exposition format."""
+		lines = []
+		for metric in self._metrics:
+			lines.extend(metric.render())
+		return "\n".join(lines) + "\n"
@@ -0,0 +1,54 @@
+# nrel_client.py
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+class UnexpectedResponseError(Exception):
+	"""Raised when NREL returns a payload without an 'outputs' section."""
+
+class NRELClient:
+	"""
+	Pooled client for the NREL PVWatts API.
+
+	All calls share one requests.Session, so TLS connections to NREL are kept alive and
+	reused instead of being set up per cache miss. At most max_concurrency requests are
+	in flight at once; submit() runs fetches on the client's own worker pool and returns
+	a Future, so callers can start many requests without blocking a thread each.
+	"""
+
+	def __init__(self, url, api_key, max_concurrency=8, timeout=15):
+		self.url = url
+		self.api_key = api_key
+		self.timeout = timeout
+		self.max_concurrency = max_concurrency
+		self.session = requests.Session()
+		adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency, pool_block=True)
+		self.session.mount('https://', adapter)
+		self.session.mount('http://', adapter)
+		self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='nrel')
+		self._slots = threading.BoundedSemaphore(max_concurrency)
+
+	def fetch(self, params):
+		"""Call PVWatts with params (without the API key) and return the decoded JSON."""
+		logger.debug(f"Requesting PVWatts data from NREL with params: {params}")
+		with self._slots:
+			response = self.session.get(self.url, params={"api_key": self.api_key, **params}, timeout=self.timeout)
+		response.raise_for_status()
+		data = response.json()
+		if "outputs" not in data:
+			raise UnexpectedResponseError("Unexpected data format received from NREL API.")
+		return data
+
+	def submit(self, params):
+		"""Start fetch(params) on the client's pool and return its Future."""
+		return self.executor.submit(self.fetch, params)
+
+	def close(self):
+		self.executor.shutdown(wait=False)
+		self.session.close()
@@ -0,0 +1,495 @@
+# nrel_stub.py
+#
+# Local stand-in for the NREL PVWatts v6 API, for tests, load tests and offline work.
+# Run it with `python nrel_stub.py --port 8081` and point the backend at it with
+# NREL_API_URL=http://127.0.0.1:8081/api/pvwatts/v6.json
+#
+# Record real responses once (needs NREL_API_KEY), then replay them without a key:
+#   python nrel_stub.py --fixtures fixtures/pvwatts --record
+#   python nrel_stub.py --fixtures fixtures/pvwatts --latency-ms 80 --throttle-rate 0.01
+#
+# Replay answers recorded parameter sets byte for byte. Unseen orientations of a
+# recorded site are derived from the nearest recording, and anything else is synthesized.
+# Faults can be changed at runtime with POST /_stub/faults; counters are at GET /_stub/stats.
+
+import argparse
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import requests
+
+PVWATTS_PATH = "/api/pvwatts/v6.json"
+NREL_PVWATTS_URL = "https://developer.nrel.gov/api/pvwatts/v6.json"
+DAYS_PER_MONTH = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+MONTH_OF_HOUR = np.repeat(np.arange(12), [days * 24 for days in DAYS_PER_MONTH])
+SITE_DEFAULTS = (("lat", 51.20578), ("lon", 3.47789), ("system_capacity", 4), ("azimuth", 180),
+	("tilt", 40), ("losses", 10))
+# Query parameters that do not change the response
+IGNORED_PARAMS = {"api_key", "format"}
+
+@lru_cache(maxsize=256)
+def _synthesize(lat, lon, system_capacity, azimuth, tilt, losses):
+	"""Deterministic, physically plausible hourly PVWatts outputs for a typical year."""
+	hours = np.arange(8760)
+	day = hours // 24 + 1
+	solar_hour = hours % 24 + 0.5
+
+	lat_rad = np.radians(lat)
+	declination = np.radians(23.45) * np.sin(2 * np.pi * (284 + day) / 365)
+	hour_angle = np.radians(15.0 * (solar_hour - 12.0))
+	cos_zenith = np.sin(lat_rad) * np.sin(declination) + np.cos(lat_rad) * np.cos(declination) * np.cos(hour_angle)
+	cos_zenith = np.clip(cos_zenith, -1.0, 1.0)
+	sin_zenith = np.sqrt(1.0 - cos_zenith ** 2)
+	cos_solar_azimuth = (np.sin(declination) - np.sin(lat_rad) * cos_zenith) / np.maximum(np.cos(lat_rad) * sin_zenith, 1e-9)
+	solar_azimuth = np.degrees(np.arccos(np.clip(cos_solar_azimuth, -1.0, 1.0)))
+	solar_azimuth = np.where(hour_angle > 0, 360.0 - solar_azimuth, solar_azimuth)
+
+	# Repeatable day-to-day cloudiness so the year is not uniformly clear
+	clearness = 0.55 + 0.35 * np.abs(np.sin(day * 12.9898 + lon))
+	daylight = cos_zenith > 0
+	dni = np.where(daylight, 950.0 * np.exp(-0.14 / np.maximum(cos_zenith, 0.05)) * clearness, 0.0)
+	dhi = np.where(daylight, 120.0 * (1.2 - clearness) * np.sqrt(np.maximum(cos_zenith, 0.0)), 0.0)
+	ghi = dni * np.maximum(cos_zenith, 0.0) + dhi
+
+	tilt_rad = np.radians(tilt)
+	cos_aoi = cos_zenith * np.cos(tilt_rad) + sin_zenith * np.sin(tilt_rad) * np.cos(np.radians(solar_azimuth - azimuth))
+	poa = dni * np.maximum(cos_aoi, 0.0) + dhi * (1 + np.cos(tilt_rad)) / 2 + ghi * 0.2 * (1 - np.cos(tilt_rad)) / 2
+
+	tamb = 10.0 - 8.0 * np.cos(2 * np.pi * (day - 20) / 365) + 4.0 * np.sin(np.pi * (solar_hour - 8) / 12)
+	wspd = 3.0 + 1.5 * np.abs(np.cos(day * 0.7))
+	tcell = tamb + poa / 800.0 * 25.0
+	dc = poa / 1000.0 * system_capacity * 1000.0 * (1 - 0.0047 * (tcell - 25.0))
+	ac = np.maximum(dc * (1 - losses / 100.0) * 0.96, 0.0)
+
+	ac_monthly = np.bincount(MONTH_OF_HOUR, ac, 12) / 1000.0
+	dc_monthly = np.bincount(MONTH_OF_HOUR, dc, 12) / 1000.0
+	poa_monthly = np.bincount(MONTH_OF_HOUR, poa, 12) / 1000.0
+	solrad_monthly = poa_monthly / DAYS_PER_MONTH
+
+	return {
+		"ac_monthly": ac_monthly.tolist(),
+		"poa_monthly": poa_monthly.tolist(),
+		"solrad_monthly": solrad_monthly.tolist(),
+		"dc_monthly": dc_monthly.tolist(),
+		"ac_annual": float(ac_monthly.sum()),
+		"solrad_annual": float(poa_monthly.sum() / 365),
+		"capacity_factor": float(ac.sum() / (system_capacity * 1000.0 * 8760) * 100),
+		"ac": ac.round(3).tolist(),
+		"poa": poa.round(3).tolist(),
+		"dn": dni.round(3).tolist(),
+		"df": dhi.round(3).tolist(),
+		"dc": dc.round(3).tolist(),
+		"tamb": tamb.round(2).tolist(),
+		"tcell": tcell.round(2).tolist(),
+		"wspd": wspd.round(2).tolist()
+	}
+
+def site_values(params):
+	"""
+	The numeric site and orientation settings of a request, with PVWatts-like defaults.
+	Raises ValueError naming the first setting that is not a finite number.
+	"""
+	values = {}
+	for name, default in SITE_DEFAULTS:
+		try:
+			values[name] = float(params.get(name, default))
+		except (TypeError, ValueError):
+			raise ValueError(f"{name} must be a number") from None
+		if not math.isfinite(values[name]):
+			raise ValueError(f"{name} must be a finite number")
+	return values
+
+def synthesize_response(params):
+	"""A PVWatts v6 style response body for the given query parameters."""
+	values = site_values(params)
+	outputs = _synthesize(values["lat"], values["lon"], values["system_capacity"],
+		values["azimuth"] % 360, values["tilt"], values["losses"])
+	return {
+		"inputs": {name: str(value) for name, value in params.items() if name not in IGNORED_PARAMS},
+		"errors": [],
+		"warnings": [],
+		"version": "stub",
+		"ssc_info": {"build": "nrel_stub"},
+		"station_info": {"lat": values["lat"], "lon": values["lon"], "solar_resource_file": "synthetic"},
+		"outputs": outputs
+	}
+
+@lru_cache(maxsize=1024)
+def _encoded_synthetic(items):
+	return json.dumps(synthesize_response(dict(items))).encode('utf-8')
+
+def normalize_value(value):
+	try:
+		return repr(round(float(value), 6))
+	except (TypeError, ValueError):
+		return str(value)
+
+def fixture_key(params):
+	"""Stable key for a parameter set: '1' and '1.0' match, and the API key is ignored."""
+	return "&".join(f"{name}={normalize_value(params[name])}" for name in sorted(params) if name not in IGNORED_PARAMS)
+
+def derive_response(recorded, recorded_params, params):
+	"""
+	A recorded response re-oriented to params. Its hourly and monthly outputs are scaled,
+	month by month, by how much the synthetic model's output changes between the two
+	orientations, so the recorded weather is kept and only the geometry changes.
+	"""
+	old, new = site_values(recorded_params), site_values(params)
+	synthetic_old = _synthesize(old["lat"], old["lon"], old["system_capacity"], old["azimuth"] % 360, old["tilt"], old["losses"])
+	synthetic_new = _synthesize(new["lat"], new["lon"], new["system_capacity"], new["azimuth"] % 360, new["tilt"], new["losses"])
+
+	def monthly_ratio(name):
+		before = np.asarray(synthetic_old[name])
+		after = np.asarray(synthetic_new[name])
+		return np.divide(after, before, out=np.ones(12), where=before > 0)
+
+	ac_ratio = monthly_ratio("ac_monthly")
+	poa_ratio = monthly_ratio("poa_monthly")
+	outputs = dict(recorded["outputs"])
+	for name, ratio in (("ac", ac_ratio), ("dc", ac_ratio), ("poa", poa_ratio)):
+		if len(outputs.get(name) or []) == len(MONTH_OF_HOUR):
+			outputs[name] = (np.asarray(outputs[name], dtype='float64') * ratio[MONTH_OF_HOUR]).round(3).tolist()
+	for name, ratio in (("ac_monthly", ac_ratio), ("dc_monthly", ac_ratio), ("poa_monthly", poa_ratio), ("solrad_monthly", poa_ratio)):
+		if len(outputs.get(name) or []) == 12:
+			outputs[name] = (np.asarray(outputs[name], dtype='float64') * ratio).tolist()
+	if "ac_monthly" in outputs:
+		old_annual = float(outputs.get("ac_annual") or 0)
+		outputs["ac_annual"] = float(np.sum(outputs["ac_monthly"]))
+		if old_annual and outputs.get("capacity_factor") is not None:
+			outputs["capacity_factor"] = float(outputs["capacity_factor"]) * outputs["ac_annual"] / old_annual
+	if "solrad_monthly" in outputs:
+		outputs["solrad_annual"] = float(np.average(outputs["solrad_monthly"], weights=DAYS_PER_MONTH))
+
+	response = dict(recorded)
+	response["inputs"] = {name: str(value) for name, value in params.items() if name not in IGNORED_PARAMS}
+	response["warnings"] = list(recorded.get("warnings") or []) + [
+		f"nrel_stub: derived from the recording at tilt={recorded_params.get('tilt')}, azimuth={recorded_params.get('azimuth')}"
+	]
+	response["outputs"] = outputs
+	return response
+
+class FixtureStore:
+	"""
+	Recorded PVWatts responses, one JSON file per parameter set in a directory, keyed by
+	fixture_key. Encoded bodies are kept in memory so replay costs no JSON encoding.
+	"""
+
+	def __init__(self, path):
+		self.path = path
+		self._lock = threading.Lock()
+		self._params = {}
+		self._bodies = {}
+		os.makedirs(path, exist_ok=True)
+		for name in sorted(os.listdir(path)):
+			if name.endswith('.json'):
+				with open(os.path.join(path, name)) as f:
+					fixture = json.load(f)
+				key = fixture_key(fixture["params"])
+				self._params[key] = fixture["params"]
+				self._bodies[key] = json.dumps(fixture["response"]).encode('utf-8')
+
+	def __len__(self):
+		return len(self._bodies)
+
+	def get(self, params):
+		"""The recorded body for params as bytes, or None."""
+		return self._bodies.get(fixture_key(params))
+
+	def put(self, params, response):
+		params = {name: str(value) for name, value in params.items() if name not in IGNORED_PARAMS}
+		key = fixture_key(params)
+		name = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16] + '.json'
+		temp_path = os.path.join(self.path, name + '.tmp')
+		with open(temp_path, 'w') as f:
+			json.dump({"params": params, "response": response}, f)
+		os.replace(temp_path, os.path.join(self.path, name))
+		with self._lock:
+			self._params[key] = params
+			self._bodies[key] = json.dumps(response).encode('utf-8')
+
+	def nearest(self, params):
+		"""(params, response) of the recording for the same site with the closest orientation, or None."""
+		site = {name: normalize_value(value) for name, value in params.items() if name not in IGNORED_PARAMS | {"tilt", "azimuth"}}
+		wanted = site_values(params)
+		best, best_distance = None, None
+		with self._lock:
+			candidates = list(self._params.items())
+		for key, recorded in candidates:
+			recorded_site = {name: normalize_value(value) for name, value in recorded.items() if name not in {"tilt", "azimuth"}}
+			if recorded_site != site:
+				continue
+			values = site_values(recorded)
+			azimuth_difference = abs(values["azimuth"] - wanted["azimuth"]) % 360
+			distance = np.hypot(values["tilt"] - wanted["tilt"], min(azimuth_difference, 360 - azimuth_difference))
+			if best_distance is None or distance < best_distance:
+				best, best_distance = key, distance
+		if best is None:
+			return None
+		return self._params[best], json.loads(self._bodies[best])
+
+FAULT_SETTINGS = ("latency_ms", "jitter_ms", "error_rate", "throttle_rate", "retry_after")
+FAULT_RATES = ("error_rate", "throttle_rate")
+
+class Faults:
+	"""Injected latency and failures; rates are per-request probabilities."""
+
+	def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, throttle_rate=0.0, retry_after=1, seed=None):
+		self._lock = threading.Lock()
+		self._random = random.Random(seed)
+		self.update(latency_ms=latency_ms, jitter_ms=jitter_ms, error_rate=error_rate,
+			throttle_rate=throttle_rate, retry_after=retry_after)
+
+	def update(self, **settings):
+		"""Apply settings all at once, or raise ValueError and change nothing."""
+		values = {}
+		for name, value in settings.items():
+			if name not in FAULT_SETTINGS:
+				raise ValueError(f"Unknown fault setting '{name}'")
+			try:
+				values[name] = float(value)
+			except (TypeError, ValueError):
+				raise ValueError(f"{name} must be a number, got {value!r}") from None
+			if not math.isfinite(values[name]) or values[name] < 0:
+				raise ValueError(f"{name} must be a finite, non-negative number, got {value!r}")
+			if name in FAULT_RATES and values[name] > 1:
+				raise ValueError(f"{name} must be between 0 and 1, got {value!r}")
+		with self._lock:
+			rates = {name: values.get(name, getattr(self, name, 0.0)) for name in FAULT_RATES}
+			if sum(rates.values()) > 1:
+				raise ValueError("error_rate and throttle_rate must add up to at most 1")
+			for name, value in values.items():
+				setattr(self, name, value)
+
+	def as_dict(self):
+		return {name: getattr(self, name) for name in FAULT_SETTINGS}
+
+	def draw(self):
+		"""(delay in seconds, injected status or None) for one request."""
+		with self._lock:
+			delay = max(self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms), 0.0) / 1000.0
+			roll = self._random.random()
+			if roll < self.throttle_rate:
+				return delay, 429
+			if roll < self.throttle_rate + self.error_rate:
+				return delay, 500
+			return delay, None
+
+class StubHandler(BaseHTTPRequestHandler):
+	protocol_version = "HTTP/1.1"  # Keep-alive, so connection reuse is observable
+
+	def setup(self):
+		super().setup()
+		self.server.record_connection()
+
+	def do_GET(self):
+		url = urlparse(self.path)
+		if url.path == "/_stub/stats":
+			self.send_json(200, self.server.stats())
+			return
+		if url.path == "/_stub/faults":
+			self.send_json(200, self.server.faults.as_dict())
+			return
+		if url.path != PVWATTS_PATH:
+			self.send_json(404, {"errors": [f"Unknown path {url.path}"]})
+			return
+		params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+		with self.server.track_request(params):
+			status, body, headers = self.server.respond(params)
+			self.send_body(status, body, headers)
+
+	def do_POST(self):
+		if urlparse(self.path).path != "/_stub/faults":
+			self.send_json(404, {"errors": [f"Unknown path {self.path}"]})
+			return
+		try:
+			settings = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+			self.server.faults.update(**settings)
+		except (ValueError, TypeError) as e:
+			self.send_json(400, {"errors": [str(e)]})
+			return
+		self.send_json(200, self.server.faults.as_dict())
+
+	def send_json(self, status, payload, headers=None):
+		self.send_body(status, json.dumps(payload).encode('utf-8'), headers)
+
+	def send_body(self, status, body, headers=None):
+		self.send_response(status)
+		self.send_header("Content-Type", "application/json")
+		self.send_header("Content-Length", str(len(body)))
+		for name, value in (headers or {}).items():
+			self.send_header(name, value)
+		self.end_headers()
+		self.wfile.write(body)
+
+	def log_message(self, format, *args):
+		pass  # Keep test output quiet
+
+class NRELStubServer(ThreadingHTTPServer):
+	"""
+	Threaded stub server that counts connections, requests and peak concurrency. The
+	parameters of the most recent recent_requests requests are kept in requests.
+
+	With fixtures, recorded parameter sets are replayed; with record set as well, other
+	parameter sets are fetched from upstream_url once and added to the fixtures.
+	"""
+
+	daemon_threads = True
+	request_queue_size = 128
+
+	def __init__(self, address=("127.0.0.1", 0), handler=StubHandler, fixtures=None, record=False,
+				 upstream_url=NREL_PVWATTS_URL, api_key=None, faults=None, recent_requests=1000):
+		super().__init__(address, handler)
+		self._lock = threading.Lock()
+		self.connections = 0
+		self.request_count = 0
+		self.requests = deque(maxlen=recent_requests)  # Bounded, so long load tests do not grow it
+		self.in_flight = 0
+		self.max_in_flight = 0
+		self.status_counts = Counter()
+		self.sources = Counter()
+		self.fixtures = fixtures
+		self.record = record
+		self.upstream_url = upstream_url
+		self.api_key = api_key
+		self.faults = faults or Faults()
+		self._session = requests.Session() if record else None
+
+	@property
+	def url(self):
+		host, port = self.server_address[:2]
+		return f"http://{host}:{port}{PVWATTS_PATH}"
+
+	def record_connection(self):
+		with self._lock:
+			self.connections += 1
+
+	@contextmanager
+	def track_request(self, params):
+		with self._lock:
+			self.request_count += 1
+			self.requests.append(params)
+			self.in_flight += 1
+			self.max_in_flight = max(self.max_in_flight, self.in_flight)
+		try:
+			yield
+		finally:
+			with self._lock:
+				self.in_flight -= 1
+
+	def respond(self, params):
+		"""(status, body bytes, headers) for a PVWatts request, after any injected faults."""
+		delay, fault = self.faults.draw()
+		if delay:
+			time.sleep(delay)
+		if fault == 429:
+			status, body, headers = 429, json.dumps({"error": {
+				"code": "OVER_RATE_LIMIT",
+				"message": "You have exceeded your rate limit. Try again later."
+			}}).encode('utf-8'), {"Retry-After": str(int(self.faults.retry_after))}
+			source = "throttled"
+		elif fault == 500:
+			status, body, headers = 500, json.dumps({"errors": ["Injected upstream error"]}).encode('utf-8'), {}
+			source = "error"
+		else:
+			status, headers = 200, {}
+			try:
+				body, source = self._body(params)
+			except ValueError as e:
+				# Like PVWatts, invalid parameters get an error body rather than a dropped connection
+				status, body, source = 400, json.dumps({"errors": [str(e)]}).encode('utf-8'), "invalid"
+			except requests.exceptions.RequestException as e:
+				logging.warning(f"Recording from {self.upstream_url} failed: {e}")
+				status, body, source = 502, json.dumps({"errors": [f"Recording failed: {e}"]}).encode('utf-8'), "error"
+		with self._lock:
+			self.status_counts[status] += 1
+			self.sources[source] += 1
+		return status, body, headers
+
+	def _body(self, params):
+		"""Response body for params and where it came from: replay, record, derived or synthetic."""
+		if self.fixtures is not None:
+			body = self.fixtures.get(params)
+			if body is not None:
+				return body, "replay"
+			if self.record:
+				return json.dumps(self._record(params)).encode('utf-8'), "record"
+			nearest = self.fixtures.nearest(params)
+			if nearest is not None:
+				return json.dumps(derive_response(nearest[1], nearest[0], params)).encode('utf-8'), "derived"
+		items = tuple(sorted((name, value) for name, value in params.items() if name not in IGNORED_PARAMS))
+		return _encoded_synthetic(items), "synthetic"
+
+	def _record(self, params):
+		query = {name: value for name, value in params.items() if name not in IGNORED_PARAMS}
+		response = self._session.get(self.upstream_url, params={"api_key": self.api_key, **query}, timeout=30)
+		response.raise_for_status()
+		data = response.json()
+		self.fixtures.put(query, data)
+		logging.info(f"Recorded PVWatts fixture for {fixture_key(query)}")
+		return data
+
+	def stats(self):
+		with self._lock:
+			return {
+				"connections": self.connections,
+				"requests": self.request_count,
+				"in_flight": self.in_flight,
+				"max_in_flight": self.max_in_flight,
+				"status_counts": {str(status): count for status, count in self.status_counts.items()},
+				"sources": dict(self.sources),
+				"fixtures": len(self.fixtures) if self.fixtures is not None else 0
+			}
+
+def start_stub(host="127.0.0.1", port=0, **kwargs):
+	"""Start a stub server on a background thread and return it; call shutdown() when done."""
+	server = NRELStubServer((host, port), **kwargs)
+	threading.Thread(target=server.serve_forever, daemon=True).start()
+	return server
+
+def main():
+	logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+	parser = argparse.ArgumentParser(description="Local NREL PVWatts v6 stand-in")
+	parser.add_argument("--host", default="127.0.0.1")
+	parser.add_argument("--port", type=int, default=8081)
+	parser.add_argument("--fixtures", help="Directory of recorded responses to replay")
+	parser.add_argument("--record", action="store_true",
+		help="Fetch parameter sets missing from --fixtures from NREL (NREL_API_KEY) and save them")
+	parser.add_argument("--upstream-url", default=os.environ.get("NREL_UPSTREAM_URL", NREL_PVWATTS_URL))
+	parser.add_argument("--latency-ms", type=float, default=0.0, help="Added latency per request")
+	parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform +/- jitter on the latency")
+	parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500")
+	parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+	parser.add_argument("--retry-after", type=float, default=1, help="Retry-After seconds sent with 429s")
+	parser.add_argument("--seed", type=int, help="Seed for repeatable fault injection")
+	args = parser.parse_args()
+
+	if args.record and not args.fixtures:
+		parser.error("--record needs --fixtures")
+	api_key = os.environ.get("NREL_API_KEY")
+	if args.record and not api_key:
+		parser.error("--record needs NREL_API_KEY in the environment")
+	server = NRELStubServer(
+		(args.host, args.port),
+		fixtures=FixtureStore(args.fixtures) if args.fixtures else None,
+		record=args.record,
+		upstream_url=args.upstream_url,
+		api_key=api_key,
+		faults=Faults(args.latency_ms, args.jitter_ms, args.error_rate, args.throttle_rate, args.retry_after, args.seed)
+	)
+	print(f"Serving PVWatts stub at {server.url}")
+	server.serve_forever()
+
+if __name__ == "__main__":
+	main()
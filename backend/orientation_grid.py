@@ -0,0 +1,62 @@
+# orientation_grid.py
+
+import math
+
+import numpy as np
+
+MAX_TILT = 90.0
+
+def snap_down(value, step):
+	return math.floor(round(value / step, 9)) * step
+
+def grid_corners(tilt, azimuth, step):
+	"""
+	Grid points surrounding (tilt, azimuth) on a grid with the given step, with their
+	bilinear weights. Points that lie on a grid line collapse to fewer corners.
+	Returns a list of ((tilt, azimuth), weight) with azimuths wrapped into [0, 360).
+	"""
+	if not (math.isfinite(tilt) and math.isfinite(azimuth)):
+		raise ValueError("tilt and azimuth must be finite numbers")
+	tilt = min(max(tilt, 0.0), MAX_TILT)
+	azimuth = azimuth % 360.0
+
+	tilt_low = snap_down(tilt, step)
+	tilt_high = min(tilt_low + step, MAX_TILT)
+	azimuth_low = snap_down(azimuth, step)
+	tilt_frac = (tilt - tilt_low) / (tilt_high - tilt_low) if tilt_high > tilt_low else 0.0
+	azimuth_frac = (azimuth - azimuth_low) / step
+
+	tilt_points = [(tilt_low, 1.0 - tilt_frac)]
+	if tilt_frac > 1e-9:
+		tilt_points.append((tilt_high, tilt_frac))
+	azimuth_points = [(azimuth_low, 1.0 - azimuth_frac)]
+	if azimuth_frac > 1e-9:
+		azimuth_points.append(((azimuth_low + step) % 360.0, azimuth_frac))
+
+	return [
+		((round(t, 2), round(a, 2)), tilt_weight * azimuth_weight)
+		for t, tilt_weight in tilt_points
+		for a, azimuth_weight in azimuth_points
+	]
+
+def interpolate_outputs(corner_outputs, weights):
+	"""
+	Weighted blend of PVWatts 'outputs' sections (scalars and arrays alike).
+
+	Returns (outputs, error_bound). error_bound maps each field to the largest distance
+	between the interpolated value and any corner value; the true value lies inside that
+	envelope whenever the output varies monotonically across the grid cell.
+	"""
+	weights = np.asarray(weights, dtype='float64')
+	outputs = {}
+	error_bound = {}
+	for field, first in corner_outputs[0].items():
+		try:
+			stacked = np.array([corner[field] for corner in corner_outputs], dtype='float64')
+		except (KeyError, TypeError, ValueError):
+			outputs[field] = first  # Non-numeric or ragged fields are taken from the first corner
+			continue
+		blended = np.tensordot(weights, stacked, axes=1)
+		outputs[field] = blended.tolist()
+		error_bound[field] = float(np.max(np.abs(stacked - blended))) if stacked.size else 0.0
+	return outputs, error_bound
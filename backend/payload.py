@@ -0,0 +1,112 @@
+# payload.py
+
+import base64
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from flask import Response, request
+
+try:
+	import brotli  # Optional: enables Content-Encoding: br
+except ImportError:
+	brotli = None
+
+# Bodies smaller than this are sent uncompressed
+COMPRESS_MIN_BYTES = 1024
+# Number of compressed bodies kept, so repeated requests skip recompression
+COMPRESSED_CACHE_SIZE = 64
+
+ENCODING_SUFFIXES = {"br": "-br", "gzip": "-gz"}
+
+_compressed = OrderedDict()
+_compressed_lock = threading.Lock()
+
+class ProjectionError(ValueError):
+	"""Raised when fields= names an output that the response does not have."""
+
+def project_outputs(data, fields):
+	"""Copy of data whose 'outputs' only holds the requested fields."""
+	outputs = data.get("outputs", {})
+	unknown = [field for field in fields if field not in outputs]
+	if unknown:
+		raise ProjectionError(f"Unknown output fields: {', '.join(unknown)}")
+	return {**data, "outputs": {field: outputs[field] for field in fields}}
+
+def encode_float32(values):
+	"""Pack a list of numbers as base64 little-endian float32."""
+	packed = np.asarray(values, dtype='<f4')
+	return {
+		"dtype": "float32",
+		"encoding": "base64",
+		"length": int(packed.size),
+		"data": base64.b64encode(packed.tobytes()).decode('ascii')
+	}
+
+def encode_hourly_float32(data):
+	"""Copy of data with every hourly (longer than monthly) output array packed as float32."""
+	outputs = {
+		field: encode_float32(value) if isinstance(value, list) and len(value) > 12 else value
+		for field, value in data.get("outputs", {}).items()
+	}
+	return {**data, "outputs": outputs}
+
+def _matches(if_none_match, etag):
+	if if_none_match.star_tag:
+		return True
+	for tag in if_none_match.as_set():
+		for suffix in ENCODING_SUFFIXES.values():
+			if tag.endswith(suffix):
+				tag = tag[:-len(suffix)]
+				break
+		if tag == etag:
+			return True
+	return False
+
+def _compress(body, etag, encoding):
+	key = (etag, encoding)
+	with _compressed_lock:
+		if key in _compressed:
+			_compressed.move_to_end(key)
+			return _compressed[key]
+	if encoding == "br":
+		compressed = brotli.compress(body, quality=5)
+	else:
+		compressed = gzip.compress(body, compresslevel=6)
+	with _compressed_lock:
+		_compressed[key] = compressed
+		while len(_compressed) > COMPRESSED_CACHE_SIZE:
+			_compressed.popitem(last=False)
+	return compressed
+
+def json_response(payload, status=200):
+	"""
+	JSON response with a strong ETag, 304 handling for If-None-Match, and gzip/brotli
+	compression when the client accepts it. Compressed representations get their own
+	ETag suffix, and any of them satisfies a conditional request.
+	"""
+	body = json.dumps(payload, separators=(',', ':'), sort_keys=True).encode('utf-8')
+	etag = hashlib.sha256(body).hexdigest()[:32]
+
+	encoding = None
+	if len(body) >= COMPRESS_MIN_BYTES:
+		if brotli is not None and request.accept_encodings["br"]:
+			encoding = "br"
+		elif request.accept_encodings["gzip"]:
+			encoding = "gzip"
+	tag = etag + ENCODING_SUFFIXES.get(encoding, "")
+
+	if _matches(request.if_none_match, etag):
+		response = Response(status=304)
+	else:
+		if encoding:
+			body = _compress(body, etag, encoding)
+		response = Response(body, status=status, mimetype='application/json')
+		if encoding:
+			response.headers["Content-Encoding"] = encoding
+	response.set_etag(tag)
+	response.headers["Vary"] = "Accept-Encoding"
+	return response
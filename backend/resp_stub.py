@@ -0,0 +1,159 @@
+# resp_stub.py
+#
+# In-memory stand-in for a Redis server, speaking enough of RESP2 for the shared cache:
+# PING, AUTH, SELECT, GET, SET (EX/PX/NX/XX), DEL, EXISTS, KEYS, SCAN, STRLEN, DBSIZE, FLUSHDB.
+# For tests and for trying PVWATTS_CACHE_URL without installing Redis:
+#   python resp_stub.py --port 6380
+#   PVWATTS_CACHE_URL=redis://127.0.0.1:6380/0 python app.py
+
+import argparse
+import fnmatch
+import logging
+import socketserver
+import threading
+import time
+
+class RespStubHandler(socketserver.StreamRequestHandler):
+	def _read_command(self):
+		line = self.rfile.readline()
+		if not line:
+			return None
+		if not line.startswith(b"*"):
+			return line.split()  # Inline command, as typed into telnet
+		args = []
+		for _ in range(int(line[1:])):
+			length = int(self.rfile.readline()[1:])
+			args.append(self.rfile.read(length + 2)[:-2])
+		return args
+
+	def handle(self):
+		while True:
+			args = self._read_command()
+			if args is None:
+				return
+			if not args:
+				continue
+			self.wfile.write(self.server.execute(args))
+
+def _bulk(value):
+	return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+def _array(values):
+	return b"*%d\r\n" % len(values) + b"".join(_bulk(value) for value in values)
+
+class RespStubServer(socketserver.ThreadingTCPServer):
+	"""Single-database key/value store with millisecond expiry, checked lazily on access."""
+
+	daemon_threads = True
+	allow_reuse_address = True
+
+	def __init__(self, address=("127.0.0.1", 0), handler=RespStubHandler, password=None):
+		super().__init__(address, handler)
+		self.password = password
+		self._lock = threading.Lock()
+		self._data = {}  # key -> (value, expires_at or None)
+		self.commands = 0
+
+	@property
+	def url(self):
+		host, port = self.server_address[:2]
+		return f"redis://{host}:{port}/0"
+
+	def _live(self, key, now):
+		entry = self._data.get(key)
+		if entry is not None and entry[1] is not None and entry[1] <= now:
+			del self._data[key]
+			return None
+		return entry
+
+	def execute(self, args):
+		name = args[0].upper().decode("ascii", "replace")
+		try:
+			with self._lock:
+				self.commands += 1
+				return self._dispatch(name, args[1:], time.monotonic())
+		except (IndexError, ValueError):
+			return b"-ERR syntax error\r\n"
+
+	def _dispatch(self, name, args, now):
+		if name == "PING":
+			return b"+PONG\r\n"
+		if name == "AUTH":
+			return b"+OK\r\n" if self.password is None or args[0].decode() == self.password else b"-WRONGPASS invalid password\r\n"
+		if name == "SELECT":
+			return b"+OK\r\n"
+		if name == "GET":
+			entry = self._live(args[0], now)
+			return _bulk(entry[0] if entry else None)
+		if name == "SET":
+			return self._set(args, now)
+		if name == "DEL":
+			live = [key for key in args if self._live(key, now) is not None]
+			for key in live:
+				del self._data[key]
+			return b":%d\r\n" % len(live)
+		if name == "EXISTS":
+			return b":%d\r\n" % sum(self._live(key, now) is not None for key in args)
+		if name == "KEYS":
+			pattern = args[0].decode("utf-8")
+			return _array([key for key in list(self._data) if self._live(key, now) and fnmatch.fnmatchcase(key.decode("utf-8"), pattern)])
+		if name == "SCAN":
+			return self._scan(args, now)
+		if name == "STRLEN":
+			entry = self._live(args[0], now)
+			return b":%d\r\n" % (len(entry[0]) if entry else 0)
+		if name == "DBSIZE":
+			return b":%d\r\n" % sum(self._live(key, now) is not None for key in list(self._data))
+		if name == "FLUSHDB":
+			self._data.clear()
+			return b"+OK\r\n"
+		return b"-ERR unknown command '%s'\r\n" % name.encode("ascii", "replace")
+
+	def _scan(self, args, now):
+		# The cursor is the hex of the last key returned and pages walk the keys in sorted
+		# order, so keys present throughout an iteration are returned even if others are
+		# deleted between calls, as with Redis
+		cursor = args[0]
+		options = [arg.upper() for arg in args[1:]]
+		pattern = args[1 + options.index(b"MATCH") + 1].decode("utf-8") if b"MATCH" in options else "*"
+		count = int(args[1 + options.index(b"COUNT") + 1]) if b"COUNT" in options else 10
+		after = b"" if cursor == b"0" else bytes.fromhex(cursor.decode("ascii"))
+		keys = sorted(key for key in self._data if key > after)
+		page = keys[:count]
+		next_cursor = page[-1].hex().encode("ascii") if len(keys) > count else b"0"
+		matched = [key for key in page if self._live(key, now) and fnmatch.fnmatchcase(key.decode("utf-8"), pattern)]
+		return b"*2\r\n" + _bulk(next_cursor) + _array(matched)
+
+	def _set(self, args, now):
+		key, value = args[0], args[1]
+		options = [arg.upper() for arg in args[2:]]
+		expires = None
+		if b"PX" in options:
+			expires = now + int(args[2 + options.index(b"PX") + 1]) / 1000
+		elif b"EX" in options:
+			expires = now + int(args[2 + options.index(b"EX") + 1])
+		exists = self._live(key, now) is not None
+		if (b"NX" in options and exists) or (b"XX" in options and not exists):
+			return b"$-1\r\n"
+		self._data[key] = (value, expires)
+		return b"+OK\r\n"
+
+def start_stub(host="127.0.0.1", port=0, **kwargs):
+	"""Start a stub server on a background thread and return it; call shutdown() when done."""
+	server = RespStubServer((host, port), **kwargs)
+	threading.Thread(target=server.serve_forever, daemon=True).start()
+	return server
+
+def main():
+	logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+	parser = argparse.ArgumentParser(description="In-memory Redis stand-in for the shared response cache")
+	parser.add_argument("--host", default="127.0.0.1")
+	parser.add_argument("--port", type=int, default=6380)
+	parser.add_argument("--password", help="Require AUTH with this password")
+	args = parser.parse_args()
+	server = RespStubServer((args.host, args.port), password=args.password)
+	print(f"Serving Redis stand-in at {server.url}")
+	server.serve_forever()
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,267 @@
+# response_store.py
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+class ResponseStore:
+	"""
+	Disk-backed response cache for JSON-serialisable values.
+
+	Entries live in a SQLite file so they survive restarts and are shared by every process
+	on the host. Entries older than ttl seconds are expired on read; when the stored bytes
+	exceed max_bytes the least recently used entries are evicted. The most recently used
+	entries are also kept in memory, up to memory_items entries and memory_bytes of stored
+	(serialized) size, warm-loaded from disk when the store is opened (or, with preload
+	False, whenever warm() is called, e.g. on a background thread).
+	"""
+
+	# Access times are written back at most this often per key, so hot reads stay read-only
+	TOUCH_INTERVAL = 60
+
+	def __init__(self, path, ttl=7 * 86400, max_bytes=256 * 1024 * 1024, memory_items=256,
+				 memory_bytes=32 * 1024 * 1024, preload=True):
+		self.path = path
+		self.ttl = ttl
+		self.max_bytes = max_bytes
+		self.memory_items = memory_items
+		self.memory_bytes = memory_bytes
+		self._lock = threading.RLock()
+		self._memory = OrderedDict()  # key -> (value, created, size)
+		self._memory_size = 0
+		self._touched = {}
+		# Lookup and eviction counters, for metrics
+		self.memory_hits = 0
+		self.disk_hits = 0
+		self.misses = 0
+		self.expired = 0
+		self.evictions = 0
+
+		if path != ':memory:':
+			os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+		self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+		self._db.execute("PRAGMA journal_mode=WAL")
+		self._db.execute("PRAGMA synchronous=NORMAL")
+		self._db.execute(
+			"CREATE TABLE IF NOT EXISTS responses ("
+			"key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+			"created REAL NOT NULL, accessed REAL NOT NULL)"
+		)
+		self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+		self._create_totals()
+		self._db.execute("CREATE TABLE IF NOT EXISTS locks (name TEXT PRIMARY KEY, token TEXT NOT NULL, expires REAL NOT NULL)")
+		if preload:
+			self.warm()
+
+	def _create_totals(self):
+		"""
+		Keep the entry count and stored bytes in a one-row table, updated by triggers, so
+		size checks on every set() are a single-row read for every process sharing the file.
+		"""
+		self._db.execute("BEGIN IMMEDIATE")  # Another process may be creating them too
+		try:
+			exists = self._db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'totals'").fetchone()
+			if not exists:
+				self._db.execute("CREATE TABLE totals (id INTEGER PRIMARY KEY CHECK (id = 0), entries INTEGER NOT NULL, bytes INTEGER NOT NULL)")
+				self._db.execute("INSERT INTO totals SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM responses")
+				self._db.execute(
+					"CREATE TRIGGER responses_insert AFTER INSERT ON responses BEGIN "
+					"UPDATE totals SET entries = entries + 1, bytes = bytes + NEW.size; END"
+				)
+				self._db.execute(
+					"CREATE TRIGGER responses_update AFTER UPDATE OF size ON responses BEGIN "
+					"UPDATE totals SET bytes = bytes + NEW.size - OLD.size; END"
+				)
+				self._db.execute(
+					"CREATE TRIGGER responses_delete AFTER DELETE ON responses BEGIN "
+					"UPDATE totals SET entries = entries - 1, bytes = bytes - OLD.size; END"
+				)
+			self._db.execute("COMMIT")
+		except Exception:
+			self._db.execute("ROLLBACK")
+			raise
+
+	def _expired(self, created, now):
+		return self.ttl is not None and now - created > self.ttl
+
+	def _forget(self, key):
+		entry = self._memory.pop(key, None)
+		if entry is not None:
+			self._memory_size -= entry[2]
+
+	def _remember(self, key, value, created, size):
+		self._forget(key)
+		if size > self.memory_bytes:
+			return  # Would push everything else out; served from disk instead
+		self._memory[key] = (value, created, size)
+		self._memory_size += size
+		while len(self._memory) > self.memory_items or self._memory_size > self.memory_bytes:
+			self._memory_size -= self._memory.popitem(last=False)[1][2]
+
+	def warm(self):
+		"""
+		Load the most recently used, unexpired entries into memory. Returns the number loaded.
+		Entries are parsed outside the lock and only fill free slots behind anything already
+		in memory, so lookups are not held up and entries used since opening are kept.
+		"""
+		now = time.time()
+		with self._lock:
+			rows = self._db.execute(
+				"SELECT key, value, created, size FROM responses ORDER BY accessed DESC LIMIT ?",
+				(self.memory_items,)
+			).fetchall()
+		loaded = 0
+		for key, value, created, size in rows:
+			if self._expired(created, now):
+				continue
+			value = json.loads(value)
+			with self._lock:
+				if len(self._memory) >= self.memory_items:
+					break
+				if key not in self._memory and self._memory_size + size <= self.memory_bytes:
+					self._memory[key] = (value, created, size)
+					self._memory.move_to_end(key, last=False)  # Older than anything used since opening
+					self._memory_size += size
+					loaded += 1
+		logger.debug(f"Warm-loaded {loaded} cached responses from {self.path}")
+		return loaded
+
+	def get(self, key, local=True, count=True):
+		"""
+		Return the value stored under key, or None if it is missing or expired. With local
+		False the file is read even when memory holds the key, to see other processes' writes.
+		With count False the lookup is left out of the hit and miss counters, for re-checks
+		of a key the caller has already looked up.
+		"""
+		now = time.time()
+		with self._lock:
+			cached = self._memory.get(key) if local else None
+			if cached is not None:
+				value, created, _ = cached
+				if self._expired(created, now):
+					self.delete(key)
+					self.expired += 1
+					self.misses += count
+					return None
+				self._memory.move_to_end(key)
+				self._touch(key, now)
+				self.memory_hits += count
+				return value
+
+			row = self._db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+			if row is None:
+				self.misses += count
+				return None
+			if self._expired(row[1], now):
+				self.delete(key)
+				self.expired += 1
+				self.misses += count
+				return None
+			value = json.loads(row[0])
+			self._remember(key, value, row[1], len(row[0]))
+			self._touch(key, now)
+			self.disk_hits += count
+			return value
+
+	def _touch(self, key, now):
+		if now - self._touched.get(key, 0) < self.TOUCH_INTERVAL:
+			return
+		self._touched[key] = now
+		self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+
+	def set(self, key, value):
+		"""Store value under key, then evict least recently used entries over the byte budget."""
+		blob = json.dumps(value, separators=(',', ':')).encode('utf-8')
+		now = time.time()
+		with self._lock:
+			# An upsert rather than INSERT OR REPLACE, whose implicit delete skips the totals trigger
+			self._db.execute(
+				"INSERT INTO responses (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?) "
+				"ON CONFLICT (key) DO UPDATE SET value = excluded.value, size = excluded.size, "
+				"created = excluded.created, accessed = excluded.accessed",
+				(key, blob, len(blob), now, now)
+			)
+			self._touched[key] = now
+			self._remember(key, value, now, len(blob))
+			self._evict()
+
+	def _evict(self):
+		total = self.size_bytes()
+		if total <= self.max_bytes:
+			return
+		evicted = []
+		for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed ASC"):
+			if total <= self.max_bytes:
+				break
+			evicted.append(key)
+			total -= size
+		self._db.execute("BEGIN")
+		self._db.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key in evicted])
+		self._db.execute("COMMIT")
+		for key in evicted:
+			self._forget(key)
+			self._touched.pop(key, None)
+		self.evictions += len(evicted)
+		logger.debug(f"Evicted {len(evicted)} cached responses to stay within {self.max_bytes} bytes")
+
+	def delete(self, key):
+		with self._lock:
+			self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+			self._forget(key)
+			self._touched.pop(key, None)
+
+	def clear(self):
+		with self._lock:
+			self._db.execute("DELETE FROM responses")
+			self._memory.clear()
+			self._memory_size = 0
+			self._touched.clear()
+
+	def stats(self):
+		"""Lookup counters since the store was opened."""
+		with self._lock:
+			return {
+				"hits": {"memory": self.memory_hits, "disk": self.disk_hits},
+				"misses": self.misses,
+				"expired": self.expired,
+				"evictions": self.evictions,
+				"memory_entries": len(self._memory),
+				"memory_bytes": self._memory_size
+			}
+
+	def acquire_lock(self, name, ttl):
+		"""Take the lock called name for ttl seconds. Returns its token, or None if it is held."""
+		token = uuid.uuid4().hex
+		now = time.time()
+		with self._lock:
+			# One statement, so taking a free or expired lock is atomic across processes
+			cursor = self._db.execute(
+				"INSERT INTO locks (name, token, expires) VALUES (?, ?, ?) "
+				"ON CONFLICT (name) DO UPDATE SET token = excluded.token, expires = excluded.expires "
+				"WHERE locks.expires < ?",
+				(name, token, now + ttl, now)
+			)
+		return token if cursor.rowcount == 1 else None
+
+	def release_lock(self, name, token):
+		with self._lock:
+			self._db.execute("DELETE FROM locks WHERE name = ? AND token = ?", (name, token))
+
+	def size_bytes(self):
+		with self._lock:
+			return self._db.execute("SELECT bytes FROM totals").fetchone()[0]
+
+	def __len__(self):
+		with self._lock:
+			return self._db.execute("SELECT entries FROM totals").fetchone()[0]
+
+	def close(self):
+		with self._lock:
+			self._db.close()
@@ -0,0 +1,273 @@
+# shared_cache.py
+#
+# Response cache backends shared by every worker process, and a single-flight that spans
+# them. Two backends implement the ResponseStore interface plus acquire_lock/release_lock:
+#
+#   - ResponseStore (response_store.py): a SQLite file, shared by the workers on one host
+#     with no outside service. The default.
+#   - RedisResponseStore: any Redis-protocol server, for workers spread over several hosts.
+#     Selected with PVWATTS_CACHE_URL=redis://[:password@]host:port/db
+#
+# Writes are single statements (INSERT OR REPLACE / SET ... PX) and so atomic on both.
+
+import json
+import logging
+import socket
+import threading
+import time
+import uuid
+from urllib.parse import unquote, urlparse
+
+from response_store import ResponseStore
+
+logger = logging.getLogger(__name__)
+
+class RespError(Exception):
+	"""An error reply from the server."""
+
+class RespClient:
+	"""
+	Minimal Redis (RESP2) client. Each thread gets its own connection, opened on first use
+	and reopened after a connection error.
+	"""
+
+	def __init__(self, host="127.0.0.1", port=6379, db=0, password=None, timeout=2.0):
+		self.host = host
+		self.port = port
+		self.db = db
+		self.password = password
+		self.timeout = timeout
+		self._local = threading.local()
+
+	@classmethod
+	def from_url(cls, url, **kwargs):
+		parsed = urlparse(url)
+		if parsed.scheme != "redis":
+			raise ValueError(f"Unsupported cache URL scheme '{parsed.scheme}'")
+		db = int(parsed.path.lstrip("/") or 0)
+		password = unquote(parsed.password) if parsed.password else None
+		return cls(parsed.hostname or "127.0.0.1", parsed.port or 6379, db, password, **kwargs)
+
+	def _connection(self):
+		conn = getattr(self._local, "conn", None)
+		if conn is None:
+			sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+			sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+			conn = self._local.conn = (sock, sock.makefile("rb"))
+			setup = ([("AUTH", self.password)] if self.password else []) + ([("SELECT", self.db)] if self.db else [])
+			if setup:
+				self._exchange(conn, setup)
+		return conn
+
+	def close(self):
+		conn = getattr(self._local, "conn", None)
+		self._local.conn = None
+		if conn is not None:
+			conn[1].close()
+			conn[0].close()
+
+	@staticmethod
+	def _encode(args):
+		parts = [b"*%d\r\n" % len(args)]
+		for arg in args:
+			if isinstance(arg, str):
+				arg = arg.encode("utf-8")
+			elif not isinstance(arg, bytes):
+				arg = str(arg).encode("ascii")
+			parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+		return b"".join(parts)
+
+	def _read(self, reader):
+		line = reader.readline()
+		if not line.endswith(b"\r\n"):
+			raise ConnectionError("Connection closed by cache server")
+		kind, body = line[:1], line[1:-2]
+		if kind == b"+":
+			return body.decode("utf-8")
+		if kind == b"-":
+			return RespError(body.decode("utf-8"))
+		if kind == b":":
+			return int(body)
+		if kind == b"$":
+			length = int(body)
+			if length < 0:
+				return None
+			data = reader.read(length + 2)
+			if len(data) != length + 2:
+				raise ConnectionError("Connection closed by cache server")
+			return data[:-2]
+		if kind == b"*":
+			length = int(body)
+			return None if length < 0 else [self._read(reader) for _ in range(length)]
+		raise ConnectionError(f"Unexpected reply from cache server: {line!r}")
+
+	def _exchange(self, conn, commands):
+		sock, reader = conn
+		sock.sendall(b"".join(self._encode(args) for args in commands))
+		replies = [self._read(reader) for _ in commands]
+		for reply in replies:
+			if isinstance(reply, RespError):
+				raise reply
+		return replies
+
+	def pipeline(self, commands):
+		"""Send several commands in one round trip and return their replies in order."""
+		if not commands:
+			return []
+		try:
+			return self._exchange(self._connection(), commands)
+		except (OSError, ConnectionError):
+			self.close()
+			raise
+
+	def execute(self, *args):
+		return self.pipeline([args])[0]
+
+class RedisResponseStore:
+	"""
+	ResponseStore interface over a Redis-protocol server. Entries expire through the
+	server's own TTLs and eviction policy (maxmemory), so max_bytes is not enforced here.
+	Connection failures are logged and treated as misses, so the backend keeps serving
+	from NREL when the cache server is down.
+	"""
+
+	# Keys fetched per SCAN round trip, and how long a size count is reused (len() and
+	# size_bytes() are both read on every metrics scrape)
+	SCAN_COUNT = 500
+	TOTALS_MAX_AGE = 10.0
+
+	def __init__(self, client, ttl=7 * 86400, prefix="pvwatts:"):
+		self.client = client
+		self.ttl = ttl
+		self.prefix = prefix
+		self.hits = 0
+		self.misses = 0
+		self.errors = 0
+		self._totals = None  # (counted at, entries, bytes)
+
+	def _call(self, *commands, default=None):
+		try:
+			return self.client.pipeline(list(commands))
+		except (OSError, ConnectionError, RespError) as e:
+			self.errors += 1
+			logger.warning(f"Shared cache unavailable: {e}")
+			return default
+
+	def get(self, key, local=True, count=True):
+		"""Return the value stored under key, or None if it is missing or expired."""
+		replies = self._call(("GET", self.prefix + key))
+		if not replies or replies[0] is None:
+			self.misses += count
+			return None
+		self.hits += count
+		return json.loads(replies[0])
+
+	def set(self, key, value):
+		blob = json.dumps(value, separators=(',', ':'))
+		if self.ttl is None:
+			self._call(("SET", self.prefix + key, blob))
+		else:
+			self._call(("SET", self.prefix + key, blob, "PX", int(self.ttl * 1000)))
+
+	def delete(self, key):
+		self._call(("DEL", self.prefix + key))
+
+	def _key_pages(self):
+		"""
+		Cache keys (not locks) in pages, with SCAN: unlike KEYS, each call only walks
+		SCAN_COUNT keys, so a large shared cache never blocks the server for long.
+		"""
+		locks = (self.prefix + "lock:").encode("utf-8")
+		cursor = b"0"
+		while True:
+			replies = self._call(("SCAN", cursor, "MATCH", self.prefix + "*", "COUNT", self.SCAN_COUNT))
+			if not replies:
+				return
+			cursor, keys = replies[0]
+			keys = [key for key in keys if not key.startswith(locks)]
+			if keys:
+				yield keys
+			if cursor == b"0":
+				return
+
+	def clear(self):
+		for keys in self._key_pages():
+			self._call(("DEL", *keys))
+		self._totals = None
+
+	def warm(self):
+		return 0  # Nothing is kept locally
+
+	def stats(self):
+		return {"hits": {"shared": self.hits}, "misses": self.misses, "expired": 0, "evictions": 0, "errors": self.errors}
+
+	def _count(self):
+		"""(entries, bytes) in the cache, recounted at most every TOTALS_MAX_AGE seconds."""
+		now = time.monotonic()
+		if self._totals is None or now - self._totals[0] > self.TOTALS_MAX_AGE:
+			entries = size = 0
+			for keys in self._key_pages():
+				entries += len(keys)
+				size += sum(self._call(*[("STRLEN", key) for key in keys], default=[]))
+			self._totals = (now, entries, size)
+		return self._totals[1:]
+
+	def size_bytes(self):
+		return self._count()[1]
+
+	def __len__(self):
+		return self._count()[0]
+
+	def acquire_lock(self, name, ttl):
+		"""Take the lock called name for ttl seconds. Returns its token, or None if it is held."""
+		token = uuid.uuid4().hex
+		replies = self._call(("SET", self.prefix + "lock:" + name, token, "NX", "PX", int(ttl * 1000)))
+		if replies is None:
+			return token  # Server down: run unlocked rather than not at all
+		return token if replies[0] == "OK" else None
+
+	def release_lock(self, name, token):
+		# Only delete the lock if it is still ours. Not atomic without server-side scripting,
+		# but the window is one round trip and the lock expires on its own anyway.
+		key = self.prefix + "lock:" + name
+		replies = self._call(("GET", key))
+		if replies and replies[0] == token.encode("ascii"):
+			self._call(("DEL", key))
+
+	def close(self):
+		self.client.close()
+
+def open_store(url, path, ttl, max_bytes, preload=True, **memory):
+	"""
+	The cache backend for a PVWATTS_CACHE_URL: a Redis server, or the SQLite file at path
+	(memory_items/memory_bytes bound its in-process tier).
+	"""
+	if url:
+		logger.info(f"Using shared Redis cache at {urlparse(url).hostname}")
+		return RedisResponseStore(RespClient.from_url(url), ttl=ttl)
+	return ResponseStore(path, ttl=ttl, max_bytes=max_bytes, preload=preload, **memory)
+
+def run_once(store, name, compute, check, lock_ttl=30.0, wait=None, poll=0.05, sleep=time.sleep, clock=time.monotonic):
+	"""
+	Single-flight across every process sharing store. check() returns an already published
+	result or None; otherwise the caller holding the lock for name runs compute() (which
+	should publish its result) while the others poll check(). If the holder fails or its lock
+	expires, the next poller takes over. Waiters that give up after wait seconds (lock_ttl
+	by default) compute the result themselves.
+	"""
+	deadline = clock() + (lock_ttl if wait is None else wait)
+	while True:
+		value = check()
+		if value is not None:
+			return value
+		token = store.acquire_lock(name, lock_ttl)
+		if token is not None:
+			try:
+				value = check()  # The previous holder may have published just before releasing
+				return value if value is not None else compute()
+			finally:
+				store.release_lock(name, token)
+		if clock() >= deadline:
+			logger.warning(f"Gave up waiting for another worker to fetch '{name}'")
+			return compute()
+		sleep(poll)
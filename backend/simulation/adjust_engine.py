@@ -0,0 +1,189 @@
+# adjust_engine.py
+
+import importlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Same model constants as adjust_pv.cpp
+OPTIMAL_AZIMUTH = 180.0
+OPTIMAL_TILT = 30.0
+AZIMUTH_PENALTY = 0.005  # Efficiency lost per degree away from the optimal azimuth
+TILT_PENALTY = 0.003     # Efficiency lost per degree away from the optimal tilt
+AZIMUTH_FLOOR = 0.5
+TILT_FLOOR = 0.6
+
+# Environment variable that forces a specific backend (e.g. PV_ADJUST_BACKEND=numpy)
+BACKEND_ENV_VAR = 'PV_ADJUST_BACKEND'
+
+# Orientations closer than this (in degrees) share a cache entry
+ORIENTATION_QUANTUM = 0.01
+# Cached base arrays per AdjustmentEngine; each is one float64 copy of the column
+DEFAULT_MAX_BASES = 8
+
+_BACKENDS = {}
+_PREFERENCE = ['native', 'numpy']
+
+def azimuth_factor(azimuth):
+	"""Azimuth factor with the 0.5 floor, for a scalar or array of azimuths."""
+	return np.maximum(1.0 - AZIMUTH_PENALTY * np.abs(np.asarray(azimuth, dtype='float64') - OPTIMAL_AZIMUTH), AZIMUTH_FLOOR)
+
+def tilt_factor(tilt):
+	"""Tilt factor with the 0.6 floor, for a scalar or array of tilts."""
+	return np.maximum(1.0 - TILT_PENALTY * np.abs(np.asarray(tilt, dtype='float64') - OPTIMAL_TILT), TILT_FLOOR)
+
+def orientation_factor(azimuth, tilt):
+	"""Combined azimuth * tilt factor."""
+	return azimuth_factor(azimuth) * tilt_factor(tilt)
+
+class OrientationCache:
+	"""
+	Thread-safe LRU of values computed from an orientation, keyed by (azimuth, tilt)
+	quantized to ORIENTATION_QUANTUM degrees. Values are computed at the quantized
+	orientation, so equal keys always give identical results.
+	"""
+
+	def __init__(self, maxsize=256, quantum=ORIENTATION_QUANTUM):
+		self.maxsize = maxsize
+		self.quantum = quantum
+		self.hits = 0
+		self.misses = 0
+		self._entries = OrderedDict()
+		self._lock = threading.Lock()
+
+	def key(self, azimuth, tilt):
+		return (round(float(azimuth) / self.quantum), round(float(tilt) / self.quantum))
+
+	def get(self, azimuth, tilt, compute):
+		"""compute(azimuth, tilt) at the quantized orientation, from the cache when present."""
+		key = self.key(azimuth, tilt)
+		with self._lock:
+			if key in self._entries:
+				self._entries.move_to_end(key)
+				self.hits += 1
+				return self._entries[key]
+			self.misses += 1
+		value = compute(key[0] * self.quantum, key[1] * self.quantum)
+		with self._lock:
+			self._entries[key] = value
+			self._entries.move_to_end(key)
+			while len(self._entries) > self.maxsize:
+				self._entries.popitem(last=False)
+		return value
+
+	def stats(self):
+		with self._lock:
+			return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize}
+
+	def clear(self):
+		with self._lock:
+			self._entries.clear()
+			self.hits = 0
+			self.misses = 0
+
+_factor_cache = OrientationCache(maxsize=1024)
+
+def cached_orientation_factor(azimuth, tilt):
+	"""orientation_factor for a scalar orientation, memoized by quantized (azimuth, tilt)."""
+	return _factor_cache.get(azimuth, tilt, lambda az, t: float(orientation_factor(az, t)))
+
+def orientation_cache_stats():
+	"""Hit/miss counters of the shared orientation-factor cache."""
+	return _factor_cache.stats()
+
+class AdjustmentEngine:
+	"""
+	Repeated adjustments of one column. The orientation-scaled base array
+	(values * orientation factor) is cached per quantized orientation, so a change of
+	multiplier alone is a single vectorized scale of a cached array.
+
+	Results equal adjust_pv_batch at the quantized orientation up to rounding: the base
+	is scaled by the multiplier last, where the C++ code applies it first.
+	"""
+
+	def __init__(self, values, max_bases=DEFAULT_MAX_BASES):
+		self.values = np.array(values, dtype='float64')
+		self.values.flags.writeable = False
+		self.bases = OrientationCache(maxsize=max_bases)
+
+	def _compute_base(self, azimuth, tilt):
+		base = self.values * cached_orientation_factor(azimuth, tilt)
+		base.flags.writeable = False  # Shared between calls, so never handed out writeable
+		return base
+
+	def base(self, azimuth, tilt):
+		return self.bases.get(azimuth, tilt, self._compute_base)
+
+	def adjust(self, multiplier, azimuth, tilt, out=None):
+		"""Adjusted values for scalar settings, into out when given."""
+		return np.multiply(self.base(azimuth, tilt), multiplier, out=out)
+
+	def stats(self):
+		return {"bases": self.bases.stats(), "factors": orientation_cache_stats()}
+
+def adjust_pv_numpy(values, multiplier, azimuth, tilt, out=None, verbose=False):
+	"""
+	NumPy implementation of adjust_pv_module.adjust_pv_batch.
+	multiplier, azimuth and tilt may be scalars or arrays with one value per row.
+	"""
+	values = np.asarray(values, dtype='float64')
+	if out is None:
+		out = np.empty_like(values)
+	elif out.dtype != np.float64 or out.size != values.size:
+		raise ValueError("out must be a float64 array with the same number of elements as input")
+	# Same evaluation order as the C++ code: (input * multiplier) * (azimuth_factor * tilt_factor)
+	np.multiply(values, multiplier, out=out)
+	np.multiply(out, orientation_factor(azimuth, tilt), out=out)
+	if verbose:
+		for value, adjusted in zip(values.ravel(), out.ravel()):
+			logging.debug(f"Adjusting PV estimate: Input = {value}, Adjusted Value = {adjusted}")
+	return out
+
+def register_backend(name, func):
+	"""Register a batch adjustment function with the adjust_pv_batch signature."""
+	_BACKENDS[name] = func
+
+def available_backends():
+	"""Names of the registered backends, in order of preference."""
+	return [name for name in _PREFERENCE if name in _BACKENDS] + sorted(name for name in _BACKENDS if name not in _PREFERENCE)
+
+def get_backend(name=None):
+	"""
+	Return the batch adjustment function for the named backend.
+	Without a name, the PV_ADJUST_BACKEND environment variable is used, and failing that
+	the compiled module when it could be imported, else the NumPy implementation.
+	"""
+	name = name or os.environ.get(BACKEND_ENV_VAR)
+	if name:
+		if name not in _BACKENDS:
+			raise ValueError(f"Unknown adjustment backend '{name}'. Available: {', '.join(available_backends())}")
+		return _BACKENDS[name]
+	return _BACKENDS[available_backends()[0]]
+
+def adjust_pv_batch(values, multiplier, azimuth, tilt, out=None, verbose=False, backend=None):
+	"""Adjust an array of PV estimates with the selected backend."""
+	return get_backend(backend)(values, multiplier, azimuth, tilt, out=out, verbose=verbose)
+
+register_backend('numpy', adjust_pv_numpy)
+
+def _register_native(module_name='adjust_pv_module'):
+	"""Register the compiled C++ module's batch function, if it has been built. Returns whether it was."""
+	# Module logger: a root logging call at import time would configure logging before the app does
+	logger = logging.getLogger(__name__)
+	try:
+		module = importlib.import_module(module_name)
+	except ImportError:
+		logger.debug(f"{module_name} not available; using the NumPy adjustment backend.")
+		return False
+	batch = getattr(module, 'adjust_pv_batch', None)
+	if batch is None:
+		# A build from before the batch binding only has adjust_pv_estimate
+		logger.warning(f"{module_name} predates adjust_pv_batch; rebuild it. Using the NumPy adjustment backend.")
+		return False
+	register_backend('native', batch)
+	return True
+
+_register_native()
@@ -10,10 +10,7 @@ const double OPTIMAL_AZIMUTH = 180.0; // Degrees
 // Define the optimal tilt angle (you can adjust this based on your requirements)
 const double OPTIMAL_TILT = 30.0; // Degrees
 
-double adjust_pv_estimate(double input, double multiplier, double azimuth, double tilt) {
-    // Apply multiplier
-    double adjusted_value = input * multiplier;
-
+static double azimuth_factor_for(double azimuth) {
     // Calculate azimuth factor
     double angle_difference_azimuth = std::abs(azimuth - OPTIMAL_AZIMUTH);
     // Simple model: PV efficiency decreases by 0.5% for each degree away from optimal
@@ -22,7 +19,10 @@ double adjust_pv_estimate(double input, double multiplier, double azimuth, doubl
     if (azimuth_factor < 0.5) {
         azimuth_factor = 0.5;
     }
+    return azimuth_factor;
+}
 
+static double tilt_factor_for(double tilt) {
     // Calculate tilt factor
     double angle_difference_tilt = std::abs(tilt - OPTIMAL_TILT);
     // Simple model: PV efficiency decreases by 0.3% for each degree away from optimal
@@ -31,10 +31,11 @@ double adjust_pv_estimate(double input, double multiplier, double azimuth, doubl
     if (tilt_factor < 0.6) {
         tilt_factor = 0.6;
     }
+    return tilt_factor;
+}
 
-    // Apply azimuth and tilt factors
-    adjusted_value *= azimuth_factor * tilt_factor;
-
+static void log_adjustment(double input, double multiplier, double azimuth, double azimuth_factor,
+                           double tilt, double tilt_factor, double adjusted_value) {
     std::cout << "Adjusting PV estimate: Input = " << input 
               << ", Multiplier = " << multiplier 
               << ", Azimuth = " << azimuth 
@@ -42,6 +43,45 @@ double adjust_pv_estimate(double input, double multiplier, double azimuth, doubl
               << ", Tilt = " << tilt 
               << ", Tilt Factor = " << tilt_factor 
               << ", Adjusted Value = " << adjusted_value << std::endl;
+}
+
+double orientation_factor(double azimuth, double tilt) {
+    return azimuth_factor_for(azimuth) * tilt_factor_for(tilt);
+}
+
+double adjust_pv_estimate(double input, double multiplier, double azimuth, double tilt) {
+    // Apply multiplier
+    double adjusted_value = input * multiplier;
+
+    double azimuth_factor = azimuth_factor_for(azimuth);
+    double tilt_factor = tilt_factor_for(tilt);
+
+    // Apply azimuth and tilt factors
+    adjusted_value *= azimuth_factor * tilt_factor;
+
+    log_adjustment(input, multiplier, azimuth, azimuth_factor, tilt, tilt_factor, adjusted_value);
 
     return adjusted_value;
-}
\ No newline at end of file
+}
+
+void adjust_pv_batch(const double* input, double* output, std::size_t n,
+                     const double* multiplier, std::size_t multiplier_stride,
+                     const double* azimuth, std::size_t azimuth_stride,
+                     const double* tilt, std::size_t tilt_stride,
+                     bool verbose) {
+    // With a fixed orientation the factor is the same for every row, so compute it once
+    const bool fixed_orientation = (azimuth_stride == 0 && tilt_stride == 0);
+    const double fixed_factor = fixed_orientation ? orientation_factor(azimuth[0], tilt[0]) : 0.0;
+
+    for (std::size_t i = 0; i < n; ++i) {
+        const double m = multiplier[i * multiplier_stride];
+        const double a = azimuth[i * azimuth_stride];
+        const double t = tilt[i * tilt_stride];
+        const double factor = fixed_orientation ? fixed_factor : orientation_factor(a, t);
+        output[i] = input[i] * m * factor;
+
+        if (verbose) {
+            log_adjustment(input[i], m, a, azimuth_factor_for(a), t, tilt_factor_for(t), output[i]);
+        }
+    }
+}
@@ -3,7 +3,21 @@
 #ifndef ADJUST_PV_H
 #define ADJUST_PV_H
 
+#include <cstddef>
+
 // Declaration of adjust_pv_estimate with multiplier, azimuth, and tilt parameters
 double adjust_pv_estimate(double input, double multiplier, double azimuth, double tilt);
 
-#endif // ADJUST_PV_H
\ No newline at end of file
+// Combined azimuth * tilt factor for a given orientation (no console output)
+double orientation_factor(double azimuth, double tilt);
+
+// Batch version of adjust_pv_estimate over contiguous buffers.
+// multiplier, azimuth and tilt either hold one value (stride 0) or one value per row (stride 1).
+// Results are written to output, which must hold n values. Prints one line per row only when verbose is set.
+void adjust_pv_batch(const double* input, double* output, std::size_t n,
+                     const double* multiplier, std::size_t multiplier_stride,
+                     const double* azimuth, std::size_t azimuth_stride,
+                     const double* tilt, std::size_t tilt_stride,
+                     bool verbose);
+
+#endif // ADJUST_PV_H
@@ -2,9 +2,12 @@
 
 #include "adjust_pv.h"
 #include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
 
 namespace py = pybind11;
 
+using DoubleArray = py::array_t<double, py::array::c_style | py::array::forcecast>;
+
 // Binding function for adjust_pv_estimate with multiplier, azimuth, and tilt
 void bind_adjust_pv_estimate(py::module &m) {
     m.def("adjust_pv_estimate", &adjust_pv_estimate, 
@@ -12,8 +15,74 @@ void bind_adjust_pv_estimate(py::module &m) {
           py::arg("input"), py::arg("multiplier"), py::arg("azimuth"), py::arg("tilt"));
 }
 
+// Stride for a parameter that is either a single value or one value per row
+static std::size_t parameter_stride(const DoubleArray &param, std::size_t n, const char *name) {
+    if (param.size() == 1) {
+        return 0;
+    }
+    if (static_cast<std::size_t>(param.size()) == n) {
+        return 1;
+    }
+    throw py::value_error(std::string(name) + " must be a scalar or have one value per input row");
+}
+
+// Validate a caller supplied output buffer; it is written in place so it must not be converted
+static py::array_t<double> checked_output(py::object out, const DoubleArray &input) {
+    if (out.is_none()) {
+        return py::array_t<double>(std::vector<py::ssize_t>(input.shape(), input.shape() + input.ndim()));
+    }
+    if (!py::isinstance<py::array>(out)) {
+        throw py::type_error("out must be a NumPy array");
+    }
+    py::array arr = py::reinterpret_borrow<py::array>(out);
+    if (!arr.dtype().is(py::dtype::of<double>())) {
+        throw py::type_error("out must have dtype float64");
+    }
+    if (!(arr.flags() & py::array::c_style) || !arr.writeable()) {
+        throw py::value_error("out must be a writeable C-contiguous array");
+    }
+    if (arr.size() != input.size()) {
+        throw py::value_error("out must have the same number of elements as input");
+    }
+    return py::reinterpret_borrow<py::array_t<double>>(arr);
+}
+
+// Binding function for the vectorized adjust_pv_batch
+void bind_adjust_pv_batch(py::module &m) {
+    m.def("adjust_pv_batch",
+          [](DoubleArray input, DoubleArray multiplier, DoubleArray azimuth, DoubleArray tilt,
+             py::object out, bool verbose) {
+              const std::size_t n = static_cast<std::size_t>(input.size());
+              const std::size_t multiplier_stride = parameter_stride(multiplier, n, "multiplier");
+              const std::size_t azimuth_stride = parameter_stride(azimuth, n, "azimuth");
+              const std::size_t tilt_stride = parameter_stride(tilt, n, "tilt");
+              py::array_t<double> output = checked_output(out, input);
+
+              const double *in_ptr = input.data();
+              const double *multiplier_ptr = multiplier.data();
+              const double *azimuth_ptr = azimuth.data();
+              const double *tilt_ptr = tilt.data();
+              double *out_ptr = output.mutable_data();
+              {
+                  py::gil_scoped_release release;
+                  adjust_pv_batch(in_ptr, out_ptr, n,
+                                  multiplier_ptr, multiplier_stride,
+                                  azimuth_ptr, azimuth_stride,
+                                  tilt_ptr, tilt_stride,
+                                  verbose);
+              }
+              return output;
+          },
+          "Adjust an array of PV estimates in one call. multiplier, azimuth and tilt may be scalars "
+          "or arrays with one value per row. Results are written to out when given (float64, "
+          "C-contiguous, same size as input). The GIL is released while computing.",
+          py::arg("input"), py::arg("multiplier"), py::arg("azimuth"), py::arg("tilt"),
+          py::arg("out") = py::none(), py::arg("verbose") = false);
+}
+
 // Module definition
 PYBIND11_MODULE(adjust_pv_module, m) {
     m.doc() = "Module for adjusting PV estimates with multiplier, azimuth, and tilt";
     bind_adjust_pv_estimate(m);
-}
\ No newline at end of file
+    bind_adjust_pv_batch(m);
+}
@@ -0,0 +1,102 @@
+# adjustment_log.py
+
+import threading
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+
+AdjustmentSummary = namedtuple(
+	'AdjustmentSummary',
+	'timestamp column rows multiplier azimuth tilt min_delta max_delta mean_delta elapsed'
+)
+
+def summarize_adjustment(column, original, adjusted, multiplier, azimuth, tilt, elapsed):
+	"""One summary record for a whole adjustment instead of one log line per row."""
+	delta = np.asarray(adjusted, dtype='float64') - np.asarray(original, dtype='float64')
+	finite = delta[np.isfinite(delta)]
+	if finite.size:
+		min_delta, max_delta, mean_delta = float(finite.min()), float(finite.max()), float(finite.mean())
+	else:
+		min_delta = max_delta = mean_delta = float('nan')
+	return AdjustmentSummary(
+		time.time(), column, int(delta.size), multiplier, azimuth, tilt,
+		min_delta, max_delta, mean_delta, elapsed
+	)
+
+def format_summary(summary):
+	return (
+		f"{time.strftime('%H:%M:%S', time.localtime(summary.timestamp))} "
+		f"'{summary.column}': {summary.rows} rows, multiplier {summary.multiplier:.2f}, "
+		f"azimuth {summary.azimuth:.2f}°, tilt {summary.tilt:.2f}° | "
+		f"delta min {summary.min_delta:.4f}, max {summary.max_delta:.4f}, mean {summary.mean_delta:.4f} | "
+		f"{summary.elapsed * 1000:.1f} ms"
+	)
+
+class AdjustmentLog:
+	"""
+	Fixed-capacity ring buffer of log lines. Producers append from any thread; the UI
+	drains the lines added since its last flush and inserts them in one batch.
+	"""
+
+	def __init__(self, capacity=500):
+		self.capacity = capacity
+		self._lock = threading.Lock()
+		self._lines = deque(maxlen=capacity)
+		self._pending = deque(maxlen=capacity)
+
+	def add_message(self, message):
+		with self._lock:
+			self._lines.append(message)
+			self._pending.append(message)
+
+	def add_summary(self, summary):
+		self.add_message(format_summary(summary))
+
+	def drain(self):
+		"""Lines added since the previous drain (at most capacity of them)."""
+		with self._lock:
+			pending = list(self._pending)
+			self._pending.clear()
+		return pending
+
+	def lines(self):
+		with self._lock:
+			return list(self._lines)
+
+	def clear(self):
+		with self._lock:
+			self._lines.clear()
+			self._pending.clear()
+
+	def __len__(self):
+		with self._lock:
+			return len(self._lines)
+
+class RowDetailView:
+	"""
+	Per-row detail for the latest adjustment, formatted lazily one page at a time so
+	only the rows currently on screen are ever turned into text.
+	"""
+
+	def __init__(self):
+		self.index = np.empty(0)
+		self.original = np.empty(0)
+		self.adjusted = np.empty(0)
+
+	def set(self, index, original, adjusted):
+		self.index = np.asarray(index)
+		self.original = np.asarray(original)
+		self.adjusted = np.asarray(adjusted)
+
+	def __len__(self):
+		return len(self.adjusted)
+
+	def page(self, start, count):
+		"""Formatted lines for rows start..start+count, clamped to the available rows."""
+		start = max(0, min(start, len(self) - count)) if len(self) > count else 0
+		stop = min(start + count, len(self))
+		return [
+			f"Row {self.index[row]}: Original = {self.original[row]}, Adjusted = {self.adjusted[row]}"
+			for row in range(start, stop)
+		]
@@ -0,0 +1,149 @@
+# batch.py
+#
+# Headless batch adjustment: load_data -> adjust_scenarios -> save_adjusted_data for every
+# CSV matching a glob, one file per task on a process pool sized to the usable cores.
+# Progress is logged as files finish; outputs land at fixed paths under the output
+# directory (mirroring the inputs' layout), so re-runs overwrite rather than accumulate.
+#
+#   python app.py batch 'sites/**/*.csv' --scenario base --scenario high:1.2:180:35 --output adjusted/
+
+import glob
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from data_processor import (
+	Scenario, adjust_scenarios, load_data, normalize_scenarios, save_adjusted_data, scenarios_to_wide,
+	source_columns
+)
+
+SUMMARY_FILE = 'batch_summary.csv'
+
+def available_cores():
+	"""Cores this process may run on, which can be fewer than os.cpu_count() in containers."""
+	try:
+		return len(os.sched_getaffinity(0))
+	except AttributeError:
+		return os.cpu_count() or 1
+
+def parse_scenario(spec):
+	"""A Scenario from 'name[:multiplier[:azimuth[:tilt]]]', e.g. 'high:1.2:180:35'."""
+	name, *values = spec.split(':')
+	if not name or len(values) > 3:
+		raise ValueError(f"Scenario spec must be name[:multiplier[:azimuth[:tilt]]], got '{spec}'")
+	try:
+		return Scenario(name, *(float(value) for value in values))
+	except ValueError:
+		raise ValueError(f"Scenario '{name}': multiplier, azimuth and tilt must be numbers, got '{spec}'")
+
+def read_scenarios(specs):
+	"""Scenarios from name:multiplier:azimuth:tilt specs and/or JSON files holding a list of them."""
+	scenarios = []
+	for spec in specs:
+		if spec.endswith('.json'):
+			with open(spec) as f:
+				items = json.load(f)
+			for index, item in enumerate(items):
+				try:
+					scenarios.append(Scenario(**item))
+				except TypeError as e:
+					raise ValueError(f"Scenario {index} in '{spec}': {e}") from None
+		else:
+			scenarios.append(parse_scenario(spec))
+	return normalize_scenarios(scenarios or [Scenario('base')])
+
+def find_inputs(pattern):
+	"""Files matching pattern (** recurses), sorted so runs are reproducible."""
+	return sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+
+def output_paths(inputs, output_dir):
+	"""Deterministic output path per input: adjusted_<name> under output_dir, keeping subdirectories."""
+	if not inputs:
+		return {}
+	inputs = [os.path.abspath(path) for path in inputs]
+	root = os.path.commonpath([os.path.dirname(path) for path in inputs])
+	paths = {}
+	for path in inputs:
+		directory, name = os.path.split(os.path.relpath(path, root))
+		paths[path] = os.path.join(output_dir, directory, f"adjusted_{name}")
+	return paths
+
+def process_file(path, output_path, columns, scenarios):
+	"""Adjust one file under every scenario and save it. Returns a summary row; never raises."""
+	started = time.perf_counter()
+	row = {'input': path, 'output': output_path, 'rows': 0, 'status': 'ok', 'error': '', 'seconds': 0.0}
+	try:
+		df = load_data(path)
+		file_columns = columns or source_columns(df)
+		missing = [column for column in file_columns if column not in df.columns]
+		if not file_columns:
+			raise ValueError("No numeric columns to adjust")
+		if missing:
+			raise ValueError(f"Missing column(s): {', '.join(missing)}")
+		result = adjust_scenarios(df, file_columns, scenarios)
+		wide = scenarios_to_wide(df, file_columns, scenarios, result)
+		df[wide.columns] = wide  # Overwrites columns from an earlier run instead of duplicating them
+		os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+		save_adjusted_data(df, path, output_path)
+		row['rows'] = len(df)
+		for scenario, totals in zip(scenarios, result):
+			row[f"total [{scenario.name}]"] = float(np.nansum(totals))
+	except SystemExit:
+		# load_data and save_adjusted_data log the cause and exit(); keep that from taking the pool down
+		row['status'] = 'error'
+		row['error'] = 'see log'
+	except Exception as e:
+		row['status'] = 'error'
+		row['error'] = str(e) or type(e).__name__
+	row['seconds'] = round(time.perf_counter() - started, 3)
+	return row
+
+def _quiet_worker():
+	# Per-file INFO lines from every worker would drown the progress lines
+	logging.getLogger().setLevel(logging.WARNING)
+
+def run_batch(pattern, scenarios, output_dir, columns=None, workers=None):
+	"""
+	Process every file matching pattern and write the summary table to output_dir.
+	Returns the summary as a DataFrame, one row per input in input order.
+	"""
+	# Outputs from a previous run may match the pattern too
+	output_root = os.path.abspath(output_dir) + os.sep
+	inputs = [path for path in find_inputs(pattern) if not os.path.abspath(path).startswith(output_root)]
+	if not inputs:
+		raise ValueError(f"No files match '{pattern}'")
+	paths = output_paths(inputs, output_dir)
+	workers = min(workers or available_cores(), len(inputs))
+	logging.info(f"Adjusting {len(inputs)} file(s) under {len(scenarios)} scenario(s) with {workers} worker(s).")
+
+	rows = []
+	started = time.perf_counter()
+	with ProcessPoolExecutor(max_workers=workers, initializer=_quiet_worker) as executor:
+		futures = [executor.submit(process_file, path, output, columns, scenarios) for path, output in paths.items()]
+		for done, future in enumerate(as_completed(futures), 1):
+			row = future.result()
+			rows.append(row)
+			detail = f"{row['rows']} rows" if row['status'] == 'ok' else f"FAILED: {row['error']}"
+			logging.info(f"[{done}/{len(inputs)}] {os.path.relpath(row['input'])}: {detail} ({row['seconds']:.2f}s)")
+
+	summary = pd.DataFrame(rows).sort_values('input', kind='stable').reset_index(drop=True)
+	os.makedirs(output_dir, exist_ok=True)
+	summary.to_csv(os.path.join(output_dir, SUMMARY_FILE), index=False)
+	failed = int((summary['status'] != 'ok').sum())
+	logging.info(
+		f"Batch finished in {time.perf_counter() - started:.1f}s: {len(inputs) - failed} ok, {failed} failed. "
+		f"Summary written to {os.path.join(output_dir, SUMMARY_FILE)}"
+	)
+	return summary
+
+def format_summary(summary):
+	"""Summary table for the terminal, with paths relative to the working directory."""
+	table = summary.drop(columns=['error']).copy()
+	table['input'] = table['input'].map(os.path.relpath)
+	table['output'] = table['output'].map(os.path.relpath)
+	return table.to_string(index=False, float_format=lambda value: f"{value:.3f}")
@@ -1,10 +1,14 @@
 # data_processor.py
 
 import os
+import numpy as np
 import pandas as pd
-import adjust_pv_module  # Your compiled C++ module
+from adjust_engine import adjust_pv_batch, orientation_factor  # Compiled C++ module when built, NumPy otherwise
+from poa import DEFAULT_ALBEDO, PlaneOfArrayEngine
+from spans import timed
 import json
 import logging
+from collections import namedtuple
 from datetime import datetime
 
 def load_config(config_path='config.json'):
@@ -27,20 +31,64 @@ def load_config(config_path='config.json'):
 	
 	return config
 
-def load_data(path):
+# Columns parsed as numbers; NA_VALUES and any other non-numeric token become NaN
+NUMERIC_COLUMNS = ['PV Estimate', 'GHI', 'DNI', 'DHI', 'Temperature (C)',
+				   'Humidity (%)', 'Wind Speed (m/s)', 'Wind Direction (deg)', 'Cloud Cover (%)']
+NA_VALUES = ['N/A']
+DEFAULT_CHUNKSIZE = 100_000
+
+ADJUSTED_PREFIX = 'Adjusted_'
+
+# A named set of adjustment settings; missing settings default to the optimal orientation
+Scenario = namedtuple('Scenario', 'name multiplier azimuth tilt', defaults=(1.0, 180.0, 30.0))
+
+def source_column(column):
+	"""The column an adjusted column was derived from ('Adjusted_Adjusted_GHI' -> 'GHI')."""
+	while column.startswith(ADJUSTED_PREFIX):
+		column = column[len(ADJUSTED_PREFIX):]
+	return column
+
+def adjusted_column_name(column, scenario=None):
+	"""
+	Output column for an adjusted column, optionally per scenario. Idempotent: naming an
+	already adjusted column gives the same name again, never 'Adjusted_Adjusted_...'.
+	"""
+	name = ADJUSTED_PREFIX + source_column(column)
+	return f"{name} [{scenario}]" if scenario else name
+
+def source_columns(df):
+	"""Numeric columns that can be adjusted, i.e. excluding earlier adjustment output."""
+	return [
+		col for col in df.columns
+		if not col.startswith(ADJUSTED_PREFIX) and pd.api.types.is_numeric_dtype(df[col])
+	]
+
+def read_csv_options():
+	"""read_csv keyword arguments shared by load_data and iter_data."""
+	return {'na_values': NA_VALUES}
+
+def coerce_numeric(df, float32=False):
+	"""
+	Make the NUMERIC_COLUMNS in df numbers, in place. Clean columns already parse to floats,
+	so only columns holding stray tokens go through to_numeric, which turns those into NaN.
+	"""
+	dtype = 'float32' if float32 else 'float64'
+	for col in NUMERIC_COLUMNS:
+		if col not in df.columns:
+			continue
+		if not pd.api.types.is_numeric_dtype(df[col]):
+			df[col] = pd.to_numeric(df[col], errors='coerce')
+		if df[col].dtype != dtype:
+			df[col] = df[col].astype(dtype)
+	return df
+
+@timed()
+def load_data(path, float32=False):
 	try:
-		df = pd.read_csv(path)
+		df = pd.read_csv(path, **read_csv_options())
 		# Clean column names by stripping leading/trailing spaces
 		df.columns = df.columns.str.strip()
-		# Replace 'N/A' with NaN
-		df.replace('N/A', pd.NA, inplace=True)
-		# Convert relevant columns to numeric
-		numeric_columns = ['PV Estimate', 'GHI', 'DNI', 'DHI', 'Temperature (C)', 
-						   'Humidity (%)', 'Wind Speed (m/s)', 'Wind Direction (deg)', 'Cloud Cover (%)']
-		for col in numeric_columns:
-			if col in df.columns:
-				df[col] = pd.to_numeric(df[col], errors='coerce')
-		return df
+		return coerce_numeric(df, float32)
 	except FileNotFoundError:
 		logging.error(f"The file '{path}' does not exist.")
 		exit(1)
@@ -51,17 +99,117 @@ def load_data(path):
 		logging.error(f"An error occurred while loading the data: {e}")
 		exit(1)
 
-def adjust_pv(df, column, multiplier):
+def iter_data(path, chunksize=DEFAULT_CHUNKSIZE, float32=False):
+	"""Yield the CSV at path as DataFrames of at most chunksize rows, parsed like load_data."""
+	with pd.read_csv(path, chunksize=chunksize, **read_csv_options()) as reader:
+		for chunk in reader:
+			chunk.columns = chunk.columns.str.strip()
+			yield coerce_numeric(chunk, float32)
+
+def stream_adjust(path, output_path, column, multiplier, azimuth=180.0, tilt=30.0,
+				  chunksize=DEFAULT_CHUNKSIZE, float32=False):
+	"""
+	Adjust a CSV chunk by chunk and append each chunk to output_path, so memory use is
+	bounded by chunksize rather than by the size of the file. Returns the number of rows written.
+	"""
+	rows = 0
+	chunks = 0
+	with open(output_path, 'w', newline='') as output:
+		for chunk in iter_data(path, chunksize, float32):
+			adjust_pv(chunk, column, multiplier, azimuth, tilt)
+			chunk.to_csv(output, header=(chunks == 0), index=False)
+			rows += len(chunk)
+			chunks += 1
+		if chunks == 0:
+			# A header-only CSV yields no chunks; keep its columns, plus the adjusted one
+			empty = coerce_numeric(pd.read_csv(path, nrows=0, **read_csv_options()).rename(columns=str.strip), float32)
+			adjust_pv(empty, column, multiplier, azimuth, tilt).to_csv(output, index=False)
+	logging.info(f"Streamed {rows} adjusted rows from '{path}' to '{output_path}'.")
+	return rows
+
+@timed()
+def adjust_pv(df, column, multiplier, azimuth=180.0, tilt=30.0, verbose=False):
 	try:
-		df[f'Adjusted_{column}'] = df.apply(
-			lambda row: adjust_pv_module.adjust_pv_estimate(row[column] * multiplier) if pd.notnull(row[column]) else None,
-			axis=1
-		)
+		# One call into the C++ module for the whole column; missing values stay NaN
+		values = df[source_column(column)].to_numpy(dtype='float64', na_value=np.nan)
+		adjusted = np.empty_like(values)
+		adjust_pv_batch(values, multiplier, azimuth, tilt, out=adjusted, verbose=verbose)
+		df[adjusted_column_name(column)] = adjusted
 		return df
 	except Exception as e:
 		logging.error(f"An error occurred while adjusting PV estimates: {e}")
 		exit(1)
 
+@timed()
+def adjust_pv_poa(df, column, multiplier, azimuth, tilt, latitude, longitude,
+				  reference_azimuth=180.0, reference_tilt=30.0, albedo=DEFAULT_ALBEDO):
+	"""
+	Physics-based alternative to adjust_pv: scales the column by the ratio of plane-of-array
+	irradiance (from GHI/DNI/DHI) at (tilt, azimuth) to that at the reference orientation the
+	forecast was made for, and by multiplier.
+	"""
+	engine = PlaneOfArrayEngine.from_frame(df, latitude, longitude, albedo)
+	values = df[source_column(column)].to_numpy(dtype='float64', na_value=np.nan)
+	ratio = engine.ratio(tilt, azimuth, reference_tilt, reference_azimuth)
+	df[adjusted_column_name(column)] = values * multiplier * ratio
+	return df
+
+def normalize_scenarios(scenarios):
+	"""Scenario tuples from Scenario objects, dicts or (name, multiplier, azimuth, tilt) tuples."""
+	normalized = []
+	for scenario in scenarios:
+		if isinstance(scenario, dict):
+			scenario = Scenario(**scenario)
+		else:
+			scenario = Scenario(*scenario)
+		normalized.append(scenario)
+	names = [scenario.name for scenario in normalized]
+	if len(set(names)) != len(names):
+		raise ValueError(f"Scenario names must be unique, got {names}")
+	return normalized
+
+def adjust_scenarios(df, columns, scenarios):
+	"""
+	Adjust every column under every scenario in one vectorized pass.
+
+	Returns a float64 array of shape (scenarios, columns, rows). Adjusted column names are
+	mapped back to their source column, and the frame itself is never copied or modified.
+	"""
+	scenarios = normalize_scenarios(scenarios)
+	columns = list(dict.fromkeys(source_column(col) for col in columns))
+	values = df[columns].to_numpy(dtype='float64', na_value=np.nan).T  # (columns, rows)
+	multipliers = np.array([scenario.multiplier for scenario in scenarios], dtype='float64')
+	factors = orientation_factor(
+		[scenario.azimuth for scenario in scenarios],
+		[scenario.tilt for scenario in scenarios]
+	)
+	# Same evaluation order as adjust_pv_batch: (value * multiplier) * orientation factor
+	result = np.multiply(values[np.newaxis], multipliers[:, np.newaxis, np.newaxis])
+	result *= factors[:, np.newaxis, np.newaxis]
+	logging.info(f"Adjusted {len(columns)} column(s) under {len(scenarios)} scenario(s), {values.shape[1]} rows each.")
+	return result
+
+def scenarios_to_wide(df, columns, scenarios, result):
+	"""adjust_scenarios output as one 'Adjusted_<column> [<scenario>]' column per combination."""
+	scenarios = normalize_scenarios(scenarios)
+	columns = list(dict.fromkeys(source_column(col) for col in columns))
+	names = [adjusted_column_name(col, scenario.name) for scenario in scenarios for col in columns]
+	return pd.DataFrame(result.reshape(-1, result.shape[-1]).T, index=df.index, columns=names)
+
+def scenarios_to_long(df, columns, scenarios, result, id_column='Period End'):
+	"""adjust_scenarios output as a long frame: id_column, Scenario, Column, Value."""
+	scenarios = normalize_scenarios(scenarios)
+	columns = list(dict.fromkeys(source_column(col) for col in columns))
+	n_scenarios, n_columns, n_rows = result.shape
+	ids = df[id_column].to_numpy() if id_column in df.columns else df.index.to_numpy()
+	return pd.DataFrame({
+		id_column: np.tile(ids, n_scenarios * n_columns),
+		'Scenario': pd.Categorical.from_codes(np.repeat(np.arange(n_scenarios), n_columns * n_rows), [s.name for s in scenarios]),
+		'Column': pd.Categorical.from_codes(np.tile(np.repeat(np.arange(n_columns), n_rows), n_scenarios), columns),
+		'Value': result.ravel()
+	})
+
+@timed()
 def save_adjusted_data(df, original_csv_path, output_path=None):
 	if not output_path:
 		base, ext = os.path.splitext(os.path.basename(original_csv_path))  # Use only the base filename
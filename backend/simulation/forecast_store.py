@@ -0,0 +1,200 @@
+# forecast_store.py
+#
+# Columnar on-disk store for forecast data. Each appended batch is written once as an
+# uncompressed Arrow IPC file, so opening the store memory-maps the files instead of
+# parsing CSV, and new 'Fetched At' batches never rewrite existing ones.
+#
+# Convert the existing files with:
+#   python forecast_store.py convert solar_forecasts.csv --store solar_forecasts_store
+
+import argparse
+import logging
+import os
+import re
+import uuid
+
+import pandas as pd
+
+from data_processor import load_data
+
+DEFAULT_STORE = 'solar_forecasts_store'
+BATCH_SUFFIX = '.arrow'
+DATETIME_COLUMNS = ['Period End', 'Fetched At']
+REQUIRED_COLUMNS = ['PV Estimate', 'Period End']
+BATCH_PATTERN = re.compile(r'^batch-(\d+)')
+
+# Solcast API field names (as in the merged forecast/live pickles) for the store's columns
+SOLCAST_COLUMNS = {
+	'pv_estimate': 'PV Estimate',
+	'pv_estimate_forecast': 'PV Estimate',
+	'period_end': 'Period End',
+	'period': 'Period',
+	'period_x': 'Period',
+}
+
+def _pyarrow():
+	try:
+		import pyarrow
+		import pyarrow.ipc
+	except ImportError as e:
+		raise ImportError("pyarrow is required for the columnar forecast store (pip install pyarrow)") from e
+	return pyarrow
+
+class ForecastStore:
+	"""A directory of immutable Arrow batches that reads back as one table."""
+
+	def __init__(self, path=DEFAULT_STORE):
+		self.path = path
+
+	def exists(self):
+		return bool(self.batch_paths())
+
+	def batch_paths(self):
+		if not os.path.isdir(self.path):
+			return []
+		return sorted(
+			os.path.join(self.path, name) for name in os.listdir(self.path) if name.endswith(BATCH_SUFFIX)
+		)
+
+	def _next_sequence(self):
+		"""One past the highest batch number in the store, so deleted batches are never reused."""
+		numbers = [int(match.group(1)) for match in map(BATCH_PATTERN.match, map(os.path.basename, self.batch_paths())) if match]
+		return max(numbers, default=0) + 1
+
+	def _publish(self, temp_path, label):
+		"""
+		Move a finished batch file to the next free batch name. os.link fails rather than
+		overwrites when the name is taken, e.g. by a concurrent appender, so that is retried.
+		"""
+		label = re.sub(r'[^0-9A-Za-z]+', '', str(label))[:14]
+		sequence = self._next_sequence()
+		while True:
+			path = os.path.join(self.path, f"batch-{sequence:06d}{'-' + label if label else ''}{BATCH_SUFFIX}")
+			try:
+				os.link(temp_path, path)
+			except FileExistsError:
+				sequence = max(sequence + 1, self._next_sequence())
+				continue
+			os.unlink(temp_path)
+			return path
+
+	def append(self, df):
+		"""Write df as new batches, one per distinct 'Fetched At' value. Returns the files written."""
+		pa = _pyarrow()
+		os.makedirs(self.path, exist_ok=True)
+		if 'Fetched At' in df.columns:
+			groups = [group for _, group in df.groupby('Fetched At', sort=True, dropna=False)]
+		else:
+			groups = [df]
+
+		written = []
+		for group in groups:
+			label = group['Fetched At'].iloc[0] if 'Fetched At' in group.columns and len(group) else ''
+			table = pa.Table.from_pandas(group, preserve_index=False)
+			# Write to a private temporary name first so readers never see a half-written batch
+			temp_path = os.path.join(self.path, f".{uuid.uuid4().hex}.tmp")
+			try:
+				with pa.OSFile(temp_path, 'wb') as sink:
+					with pa.ipc.new_file(sink, table.schema) as writer:
+						writer.write_table(table)
+				written.append(self._publish(temp_path, label))
+			finally:
+				if os.path.exists(temp_path):
+					os.unlink(temp_path)
+		logging.info(f"Appended {len(df)} rows in {len(written)} batch(es) to '{self.path}'.")
+		return written
+
+	def read_table(self):
+		"""All batches as one Arrow table, memory-mapped rather than copied into memory."""
+		pa = _pyarrow()
+		tables = []
+		for path in self.batch_paths():
+			# The table's buffers keep the mapping alive, so the file is not closed here
+			tables.append(pa.ipc.open_file(pa.memory_map(path, 'r')).read_all())
+		if not tables:
+			raise FileNotFoundError(f"No forecast batches found in '{self.path}'.")
+		# Batches from different sources may differ in timestamp unit or string width
+		return pa.concat_tables(tables, promote_options='permissive')
+
+	def read_frame(self):
+		"""
+		All batches as a pandas DataFrame. Each column becomes its own block, so pandas does
+		not consolidate them into a second copy, and each Arrow column is released once
+		converted. Columns that need converting (timestamps, strings, columns with nulls) are
+		still materialized; callers that must stay zero-copy should use read_table().
+		"""
+		return self.read_table().to_pandas(split_blocks=True, self_destruct=True)
+
+def _prepare(df):
+	df = df.copy()
+	df.columns = df.columns.str.strip()
+	for column in DATETIME_COLUMNS:
+		if column in df.columns and not pd.api.types.is_datetime64_any_dtype(df[column]):
+			df[column] = pd.to_datetime(df[column], format='ISO8601')
+	return df
+
+def _from_solcast(df, source):
+	"""
+	A pickled Solcast frame in the store's schema: fields renamed per SOLCAST_COLUMNS, rows
+	without a forecast (live-only rows of a forecast/live merge) and other fields dropped.
+	"""
+	if not any(column in SOLCAST_COLUMNS for column in df.columns):
+		return df  # Already in the store's (CSV) schema
+	df = df.rename(columns=SOLCAST_COLUMNS)
+	if 'PV Estimate' in df.columns:
+		df = df[df['PV Estimate'].notna()]
+	dropped = [column for column in df.columns if column not in SOLCAST_COLUMNS.values()]
+	if dropped:
+		logging.info(f"Not converting column(s) of '{source}' outside the store schema: {', '.join(map(str, dropped))}")
+	return df[[column for column in df.columns if column in SOLCAST_COLUMNS.values()]]
+
+def _check_schema(df, source):
+	missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+	if missing:
+		raise ValueError(f"'{source}' does not match the forecast store schema; missing column(s): {', '.join(missing)}")
+
+def convert(sources, store_path=DEFAULT_STORE):
+	"""
+	One-shot conversion of forecast CSV and pickle files into a columnar store. Sources
+	missing REQUIRED_COLUMNS (after mapping Solcast field names) are refused.
+	"""
+	store = ForecastStore(store_path)
+	for source in sources:
+		if source.endswith(('.pkl', '.pickle')):
+			df = _from_solcast(pd.read_pickle(source), source)
+		else:
+			df = load_data(source)
+		df = _prepare(df)
+		_check_schema(df, source)
+		store.append(df)
+		logging.info(f"Converted '{source}' into '{store_path}'.")
+	return store
+
+def load_forecasts(csv_path, store_path=DEFAULT_STORE):
+	"""
+	Forecast data with parsed 'Period End' dates, from the columnar store when it has been
+	created and pyarrow is installed, else from the CSV.
+	"""
+	store = ForecastStore(store_path)
+	if store.exists():
+		try:
+			return store.read_frame()
+		except ImportError as e:
+			logging.warning(f"{e}; falling back to '{csv_path}'.")
+	return pd.read_csv(csv_path, parse_dates=['Period End'])
+
+def main():
+	logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+	parser = argparse.ArgumentParser(description="Columnar forecast store tools")
+	subcommands = parser.add_subparsers(dest='command', required=True)
+	convert_parser = subcommands.add_parser('convert', help="Convert CSV/pickle forecast files into a store")
+	convert_parser.add_argument('sources', nargs='+', help="CSV or .pkl files to convert")
+	convert_parser.add_argument('--store', default=DEFAULT_STORE, help="Store directory to append to")
+	args = parser.parse_args()
+
+	if args.command == 'convert':
+		store = convert(args.sources, args.store)
+		print(f"{store.path}: {len(store.batch_paths())} batches, {store.read_table().num_rows} rows")
+
+if __name__ == '__main__':
+	main()
@@ -2,45 +2,46 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-import matplotlib.dates as mdates
 import tkinter.font as tkFont
-import seaborn as sns
 import logging
+import numpy as np
 import pandas as pd
+import time
 from datetime import datetime
-import adjust_pv_module  # Ensure this is correctly placed in the simulation/ directory
+from adjust_engine import AdjustmentEngine  # Compiled C++ module when built, NumPy otherwise
+from data_processor import ADJUSTED_PREFIX, adjusted_column_name, source_columns
+from forecast_store import load_forecasts  # Memory-mapped store when converted, CSV otherwise
+from recompute_worker import LatestOnlyWorker
+from adjustment_log import AdjustmentLog, RowDetailView, summarize_adjustment
+from plotting import LiveComparisonPlot
+
+# Slider events are coalesced for this long before recomputing; results are polled at ~60 fps
+DEBOUNCE_MS = 30
+POLL_MS = 16
+SAVE_DELAY_MS = 500
+ADJUSTED_CSV = 'adjusted_solar_forecasts.csv'
+
+# The log keeps the last LOG_CAPACITY lines and is flushed to the widget in batches;
+# per-row detail is only formatted for the DETAIL_PAGE_ROWS rows on screen
+LOG_CAPACITY = 500
+LOG_FLUSH_MS = 250
+DETAIL_PAGE_ROWS = 200
 
 # Configure logging
 logging.basicConfig(filename='gui_debug.log',
 					level=logging.DEBUG,
 					format='%(asctime)s:%(levelname)s:%(message)s')
 
-def adjust_pv(df, column, multiplier, azimuth, tilt, log_widget=None):
+def compute_adjustment(column, engine, multiplier, azimuth, tilt):
 	"""
-	Adjusts the PV estimates in the DataFrame based on the multiplier, azimuth, and tilt.
-	Logs each adjustment to the provided log_widget.
+	Worker-thread half of a slider update: adjusted values and their summary, no Tk access.
+	The engine caches the orientation-scaled column, so multiplier-only moves are one scale.
 	"""
-	logging.debug(f"Adjusting PV for column '{column}' with multiplier={multiplier}, azimuth={azimuth}, and tilt={tilt}")
-	try:
-		adjusted_values = []
-		for index, value in df[column].items():
-			adjusted = adjust_pv_module.adjust_pv_estimate(value, multiplier, azimuth, tilt)
-			adjusted_values.append(adjusted)
-			if log_widget:
-				log_widget.config(state='normal')  # Enable the widget to insert text
-				log_widget.insert(tk.END, f"Row {index}: Original = {value}, Adjusted = {adjusted}\n")
-				log_widget.see(tk.END)  # Auto-scroll to the end
-				log_widget.config(state='disabled')  # Disable the widget again
-		df[f'Adjusted_{column}'] = adjusted_values
-		logging.debug("PV adjustment successful.")
-	except Exception as e:
-		logging.error(f"Error adjusting PV: {e}")
-		if log_widget:
-			log_widget.config(state='normal')  # Enable the widget to insert text
-			log_widget.insert(tk.END, f"Error adjusting PV: {e}\n")
-			log_widget.see(tk.END)  # Auto-scroll to the end
-			log_widget.config(state='disabled')  # Disable the widget again
-	return df
+	started = time.perf_counter()
+	adjusted = engine.adjust(multiplier, azimuth, tilt)
+	elapsed = time.perf_counter() - started
+	logging.debug(f"Adjustment cache stats for '{column}': {engine.stats()}")
+	return column, adjusted, summarize_adjustment(column, engine.values, adjusted, multiplier, azimuth, tilt, elapsed)
 
 class PVAdjusterGUI:
 	def __init__(self, root):
@@ -57,9 +58,23 @@ class PVAdjusterGUI:
 		self.tilt = tk.DoubleVar(value=30.0)         # Initial tilt value
 		self.column_to_adjust = tk.StringVar()
 		
+		# Background recompute state: slider events are debounced, only the latest
+		# slider state is computed off the Tk thread, and saves are explicit and coalesced
+		self.worker = LatestOnlyWorker(name='pv-recompute')
+		self._engines = {}
+		self._recompute_job = None
+		self._save_job = None
+		self._dirty = False
+		
+		# Bounded log model and lazily rendered per-row detail (off by default)
+		self.log = AdjustmentLog(LOG_CAPACITY)
+		self.detail = RowDetailView()
+		self.show_detail = tk.BooleanVar(value=False)
+		self._detail_offset = 0
+		
 		# Load data
 		try:
-			self.df_original = pd.read_csv('solar_forecasts.csv', parse_dates=['Period End'])
+			self.df_original = load_forecasts('solar_forecasts.csv')
 			self.df_adjusted = self.df_original.copy()
 			logging.debug("Data loaded successfully.")
 		except Exception as e:
@@ -136,7 +151,7 @@ class PVAdjusterGUI:
 		column_frame.pack(side='left', padx=(10, 0), fill='x', expand=True)
 		
 		ttk.Label(column_frame, text="Select Column to Adjust:", font=self.custom_font).pack(side='left', padx=(10, 10))
-		column_options = [col for col in self.df_original.columns if pd.api.types.is_numeric_dtype(self.df_original[col])]
+		column_options = source_columns(self.df_original)
 		logging.debug(f"Numeric columns available: {column_options}")
 		if 'PV Estimate' in column_options:
 			default_column = 'PV Estimate'
@@ -158,6 +173,7 @@ class PVAdjusterGUI:
 		# Create PanedWindow to separate log and plot
 		paned_window = ttk.PanedWindow(self.root, orient=tk.VERTICAL)
 		paned_window.pack(pady=10, padx=10, fill='both', expand=True)
+		self.paned_window = paned_window
 	
 		# Frame for Real-Time Adjustment Log (Summary)
 		log_frame = ttk.LabelFrame(paned_window, text="Real-Time PV Adjustments Summary")
@@ -173,9 +189,24 @@ class PVAdjusterGUI:
 		clear_log_button = ttk.Button(log_frame, text="Clear Log", command=self.clear_log)
 		clear_log_button.pack(side='right', padx=5, pady=5)
 	
+		# Saving is explicit; repeated clicks within SAVE_DELAY_MS produce one write
+		save_button = ttk.Button(log_frame, text="Save Adjusted CSV", command=self.request_save)
+		save_button.pack(side='right', padx=5, pady=5)
+	
+		# Per-row detail is opt-in; its pane only renders the rows currently visible
+		detail_check = ttk.Checkbutton(log_frame, text="Show Row Detail", variable=self.show_detail, command=self.toggle_detail)
+		detail_check.pack(side='right', padx=5, pady=5)
+	
 		# Add log_frame to PanedWindow
 		paned_window.add(log_frame, weight=1)  # Weight determines the relative size
 	
+		# Row detail pane, added to the PanedWindow when enabled
+		self.detail_frame = ttk.LabelFrame(paned_window, text="Row Detail (latest adjustment)")
+		self.detail_scrollbar = ttk.Scrollbar(self.detail_frame, orient='vertical', command=self._scroll_detail)
+		self.detail_text = tk.Text(self.detail_frame, height=10, wrap='none', font=('Helvetica', 12), state='disabled')
+		self.detail_text.pack(side='left', fill='both', expand=True)
+		self.detail_scrollbar.pack(side='right', fill='y')
+	
 		# Frame for Plotting
 		plot_frame = ttk.LabelFrame(paned_window, text="PV Estimates Comparison")
 		
@@ -188,146 +219,184 @@ class PVAdjusterGUI:
 		toolbar.update()
 		self.canvas._tkcanvas.pack(fill='both', expand=True)
 		
+		# Lines are created once; updates replace their data instead of rebuilding the axes
+		self.plot = LiveComparisonPlot(self.figure, self.ax, self.canvas)
+		
 		# Add plot_frame to PanedWindow
 		paned_window.add(plot_frame, weight=3)  # Adjust weight as needed for initial sizes
 
 		# Initial Plot
 		self.plot_data()
+		self.root.after(POLL_MS, self._poll_results)
+		self.root.after(LOG_FLUSH_MS, self._flush_log)
 		logging.debug("GUI widgets created successfully.")
 
 	def clear_log(self):
 		"""Clear the Real-Time PV Adjustments Summary Text widget."""
 		if messagebox.askyesno("Confirm Clear", "Are you sure you want to clear the log?"):
+			self.log.clear()
 			self.log_text.config(state='normal')  # Make the widget editable
 			self.log_text.delete('1.0', tk.END)  # Delete all content
 			self.log_text.config(state='disabled')  # Make the widget read-only again
 
+	def _flush_log(self):
+		"""Insert the lines logged since the last flush in one batch, keeping at most LOG_CAPACITY lines."""
+		lines = self.log.drain()
+		if lines:
+			self.log_text.config(state='normal')
+			self.log_text.insert(tk.END, "\n".join(lines) + "\n")
+			excess = int(self.log_text.index('end-1c').split('.')[0]) - 1 - LOG_CAPACITY
+			if excess > 0:
+				self.log_text.delete('1.0', f'{excess + 1}.0')
+			self.log_text.see(tk.END)
+			self.log_text.config(state='disabled')
+		self.root.after(LOG_FLUSH_MS, self._flush_log)
+
+	def toggle_detail(self):
+		"""Show or hide the per-row detail pane."""
+		if self.show_detail.get():
+			self.paned_window.insert(1, self.detail_frame, weight=1)
+			self._render_detail()
+		else:
+			self.paned_window.forget(self.detail_frame)
+
+	def _scroll_detail(self, action, amount, unit=None):
+		"""Scrollbar callback for the detail pane: moves the rendered page instead of the widget."""
+		rows = len(self.detail)
+		if action == 'moveto':
+			offset = int(float(amount) * rows)
+		else:
+			step = DETAIL_PAGE_ROWS if unit == 'pages' else 1
+			offset = self._detail_offset + int(amount) * step
+		self._detail_offset = max(0, min(offset, rows - DETAIL_PAGE_ROWS))
+		self._render_detail()
+
+	def _render_detail(self):
+		rows = len(self.detail)
+		self._detail_offset = max(0, min(self._detail_offset, rows - DETAIL_PAGE_ROWS))
+		lines = self.detail.page(self._detail_offset, DETAIL_PAGE_ROWS)
+		self.detail_text.config(state='normal')
+		self.detail_text.delete('1.0', tk.END)
+		self.detail_text.insert(tk.END, "\n".join(lines))
+		self.detail_text.config(state='disabled')
+		if rows:
+			self.detail_scrollbar.set(self._detail_offset / rows, (self._detail_offset + len(lines)) / rows)
+		else:
+			self.detail_scrollbar.set(0.0, 1.0)
+
 	def update_adjustments(self, event):
-		"""Update the multiplier, azimuth, and tilt labels and adjust the PV estimates in real-time."""
-		current_multiplier = self.multiplier.get()
-		current_azimuth = self.azimuth.get()
-		current_tilt = self.tilt.get()
-		self.multiplier_label.config(text=f"{current_multiplier:.2f}")
-		self.azimuth_label.config(text=f"{current_azimuth:.2f}°")
-		self.tilt_label.config(text=f"{current_tilt:.2f}°")
-		
-		# Perform real-time adjustment
+		"""Update the multiplier, azimuth, and tilt labels and schedule a recompute of the adjusted values."""
+		self.multiplier_label.config(text=f"{self.multiplier.get():.2f}")
+		self.azimuth_label.config(text=f"{self.azimuth.get():.2f}°")
+		self.tilt_label.config(text=f"{self.tilt.get():.2f}°")
+		self.schedule_recompute()
+
+	def schedule_recompute(self):
+		"""Debounce slider events: only recompute once they pause for DEBOUNCE_MS."""
+		if self._recompute_job is not None:
+			self.root.after_cancel(self._recompute_job)
+		self._recompute_job = self.root.after(DEBOUNCE_MS, self._start_recompute)
+
+	def _engine(self, column):
+		"""Adjustment engine (with its cache of orientation-scaled arrays) for a source column."""
+		if column not in self._engines:
+			self._engines[column] = AdjustmentEngine(self.df_original[column].to_numpy(dtype='float64', na_value=np.nan))
+		return self._engines[column]
+
+	def _column_array(self, column):
+		"""Float64 values of a source column, converted once per loaded file."""
+		return self._engine(column).values
+
+	def _start_recompute(self):
+		self._recompute_job = None
 		column = self.column_to_adjust.get()
-		if column:
-			logging.debug(f"Real-time adjusting PV estimates for column '{column}' with multiplier {current_multiplier}, azimuth {current_azimuth}, and tilt {current_tilt}")
-			self.df_adjusted = adjust_pv(
-				self.df_original.copy(),
-				column,
-				current_multiplier,
-				current_azimuth,
-				current_tilt,  # Pass tilt
-				log_widget=self.log_text
-			)
-			self.plot_data()  # Update the plot with new adjusted values
-			self.save_adjusted_csv(overwrite=True)  # Automatically save the adjusted data
+		if not column:
+			return
+		settings = (self.multiplier.get(), self.azimuth.get(), self.tilt.get())
+		logging.debug(f"Recomputing column '{column}' with multiplier, azimuth, tilt = {settings}")
+		self.worker.submit(compute_adjustment, column, self._engine(column), *settings)
+
+	def _poll_results(self):
+		"""Apply finished background results on the Tk thread."""
+		try:
+			result = self.worker.poll()
+			if result is not None:
+				self._apply_result(result)
+		except Exception as e:
+			logging.error(f"Error adjusting PV: {e}")
+			self._log(f"Error adjusting PV: {e}")
+		self.root.after(POLL_MS, self._poll_results)
+
+	def _apply_result(self, result):
+		column, adjusted, summary = result
+		# Replace the adjusted column in place instead of copying the whole frame
+		self.df_adjusted[adjusted_column_name(column)] = adjusted
+		self._dirty = True
+		if column == self.column_to_adjust.get():
+			self.plot.update_adjusted(adjusted)
+		self.log.add_summary(summary)
+		# Only keep references here; rows are formatted when the detail pane shows them
+		self.detail.set(self.df_original.index, self._column_array(column), adjusted)
+		if self.show_detail.get():
+			self._render_detail()
+
+	def _log(self, message):
+		"""Queue a message for the next batched flush to the log widget."""
+		self.log.add_message(message)
 
 	def on_column_change(self, event):
 		"""Handle changes in the column selection dropdown."""
 		self.plot_data()
+		self.schedule_recompute()
+
+	def request_save(self):
+		"""Schedule a save; requests made before it runs are coalesced into one write."""
+		if self._save_job is None:
+			self._save_job = self.root.after(SAVE_DELAY_MS, self.save_adjusted_csv)
 
-	def save_adjusted_csv(self, overwrite=False):
-		"""Automatically save the adjusted CSV."""
-		if not any(col.startswith('Adjusted_') for col in self.df_adjusted.columns):
+	def save_adjusted_csv(self):
+		"""Save the adjusted data to ADJUSTED_CSV. The source CSV is never overwritten."""
+		self._save_job = None
+		if not any(col.startswith(ADJUSTED_PREFIX) for col in self.df_adjusted.columns):
 			logging.warning("No adjusted data to save.")
 			return
 		
-		output_path = 'adjusted_solar_forecasts.csv' if not overwrite else 'solar_forecasts.csv'  # Overwrite original
 		try:
-			self.df_adjusted.to_csv(output_path, index=False)
-			logging.debug(f"Adjusted data saved to {output_path if not overwrite else 'solar_forecasts.csv'}")
-			if overwrite:
-				# Reload data to reflect saved changes
-				self.reload_data()
+			self.df_adjusted.to_csv(ADJUSTED_CSV, index=False)
+			self._dirty = False
+			logging.debug(f"Adjusted data saved to {ADJUSTED_CSV}")
+			self._log(f"Adjusted data saved to {ADJUSTED_CSV}")
 		except Exception as e:
 			logging.error(f"Failed to save adjusted data: {e}")
+			messagebox.showerror("Error", f"Failed to save adjusted data: {e}")
 
 	def plot_data(self):
-		"""Plot the original and adjusted PV estimates."""
+		"""Show the original and (when computed) adjusted PV estimates for the selected column."""
 		column = self.column_to_adjust.get()
 		if not column:
 			logging.warning("No column selected for plotting.")
 			return
 		
 		logging.debug(f"Plotting data for column '{column}'")
-		
-		self.ax.clear()
-		
-		# Plot Original Data
-		self.ax.plot(
-			self.df_original['Period End'], 
-			self.df_original[column], 
-			label='Original', 
-			color='blue'
-		)
-		
-		# Plot Adjusted Data if available
-		adjusted_column = f'Adjusted_{column}'
-		if adjusted_column in self.df_adjusted.columns:
-			self.ax.plot(
-				self.df_adjusted['Period End'], 
-				self.df_adjusted[adjusted_column], 
-				label='Adjusted', 
-				color='orange'
-			)
-		
-		# Formatting the x-axis with date formats
-		self.ax.set_xlabel('Period End', fontsize=16, fontweight='bold')  # Increased font size
-		self.ax.set_ylabel(column, fontsize=16, fontweight='bold')  # Increased font size
-		self.ax.set_title(f"{column} Comparison", fontsize=18, fontweight='bold')  # Increased font size
-		self.ax.legend(fontsize=14)  # Increased legend font size
-		
-		date_format = mdates.DateFormatter('%Y-%m-%d\n%H:%M')
-		self.ax.xaxis.set_major_formatter(date_format)
-		
-		locator = mdates.AutoDateLocator()
-		self.ax.xaxis.set_major_locator(locator)
-		
-		self.figure.autofmt_xdate(rotation=45, ha='right')
-		self.figure.tight_layout()
-		
-		self.canvas.draw()
+		adjusted_column = adjusted_column_name(column)
+		adjusted = self.df_adjusted[adjusted_column] if adjusted_column in self.df_adjusted.columns else None
+		self.plot.set_series(column, self.df_original['Period End'], self._column_array(column), adjusted)
 		logging.debug("Data plotted successfully.")
 
-	def reload_data(self):
-		"""Reload the CSV data and update the GUI."""
-		logging.debug("Reloading data from CSV.")
-		try:
-			# Reload the original data
-			self.df_original = pd.read_csv('solar_forecasts.csv', parse_dates=['Period End'])
-			self.df_adjusted = self.df_original.copy()
-			
-			# Re-apply any existing adjustments
-			current_multiplier = self.multiplier.get()
-			current_azimuth = self.azimuth.get()
-			current_tilt = self.tilt.get()
-			column = self.column_to_adjust.get()
-			if column:
-				logging.debug(f"Re-applying multiplier {current_multiplier}, azimuth {current_azimuth}, and tilt {current_tilt} to column '{column}'.")
-				self.df_adjusted = adjust_pv(
-					self.df_original.copy(),
-					column,
-					current_multiplier,
-					current_azimuth,
-					current_tilt,
-					log_widget=self.log_text
-				)
-			
-			# Update the plot with the new data
-			self.plot_data()
-			
-			logging.debug("Data reloaded and GUI updated successfully.")
-		except Exception as e:
-			logging.error(f"Failed to reload data: {e}")
-			messagebox.showerror("Error", f"Failed to reload data: {e}")
-
 	def on_close(self):
-		"""Handle the closing of the application."""
+		"""Handle the closing of the application, offering to save unsaved adjustments first."""
 		logging.debug("Closing application.")
+		if self._save_job is not None:
+			# A save the user already asked for still runs
+			self.root.after_cancel(self._save_job)
+			self.save_adjusted_csv()
+		if self._dirty:
+			answer = messagebox.askyesnocancel("Unsaved adjustments", f"Save the adjusted data to {ADJUSTED_CSV} before closing?")
+			if answer is None:
+				return
+			if answer:
+				self.save_adjusted_csv()
+		self.worker.close()
 		self.root.destroy()
 
 def main():
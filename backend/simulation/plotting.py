@@ -0,0 +1,173 @@
+# plotting.py
+#
+# Incremental original-vs-adjusted plot for the GUI. The two Line2D objects are created
+# once; slider updates only replace the adjusted line's y-data and blit it over a cached
+# background. Both series are downsampled with Largest-Triangle-Three-Buckets to the
+# axes' pixel width, and re-downsampled for the visible range when the toolbar zooms,
+# so redraw cost does not grow with the length of the forecast.
+
+import logging
+
+import matplotlib.dates as mdates
+import numpy as np
+import pandas as pd
+
+MIN_POINTS = 100
+
+def lttb(x, y, n_out):
+	"""
+	Indices of the n_out points of (x, y) kept by Largest-Triangle-Three-Buckets.
+	x must be sorted. The first and last points are always kept; NaN points are only
+	kept when a bucket holds nothing else.
+	"""
+	x = np.asarray(x, dtype='float64')
+	y = np.asarray(y, dtype='float64')
+	n = len(x)
+	if n_out >= n or n_out < 3:
+		return np.arange(n)
+
+	# n_out - 2 buckets between the fixed first and last points, padded into a matrix by
+	# repeating each bucket's last point (a repeat never wins the argmax over the original)
+	edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+	starts, stops = edges[:-1], edges[1:]
+	width = int((stops - starts).max())
+	rows = np.minimum(starts[:, None] + np.arange(width), stops[:, None] - 1)
+	bucket_x, bucket_y = x[rows], y[rows]
+
+	# Average point of each bucket's right-hand neighbour; the last bucket uses the last point
+	valid = np.isfinite(bucket_y)
+	counts = valid.sum(axis=1)
+	sums = np.where(valid, bucket_y, 0.0).sum(axis=1)
+	bucket_mean_y = np.full(len(starts), np.nan)
+	np.divide(sums, counts, out=bucket_mean_y, where=counts > 0)
+	if np.isfinite(bucket_mean_y).any():
+		known = np.flatnonzero(np.isfinite(bucket_mean_y))
+		bucket_mean_y = np.interp(np.arange(len(starts)), known, bucket_mean_y[known])
+	else:
+		bucket_mean_y = np.zeros(len(starts))
+	avg_x = np.append(np.add.reduceat(x[:n - 1], starts)[1:] / np.diff(edges)[1:], x[-1])
+	avg_y = np.append(bucket_mean_y[1:], y[-1])
+
+	# Triangle area for anchor a is |x_a * p + y_a * q + c|, so only the anchor varies per bucket
+	p = np.where(valid, bucket_y - avg_y[:, None], 0.0)
+	q = np.where(valid, avg_x[:, None] - bucket_x, 0.0)
+	c = np.where(valid, bucket_x * avg_y[:, None] - avg_x[:, None] * bucket_y, 0.0)
+	penalty = np.where(valid, 0.0, np.inf)
+
+	selected = np.empty(n_out, dtype=int)
+	selected[0] = 0
+	selected[-1] = n - 1
+	a = 0
+	for bucket in range(n_out - 2):
+		area = np.abs(x[a] * p[bucket] + y[a] * q[bucket] + c[bucket]) - penalty[bucket]
+		a = rows[bucket, int(area.argmax())]
+		selected[bucket + 1] = a
+	return selected
+
+def date_numbers(values):
+	"""Matplotlib date numbers for a datetime-like sequence (timezone-aware values in UTC)."""
+	values = pd.to_datetime(pd.Series(values))
+	if values.dt.tz is not None:
+		values = values.dt.tz_convert('UTC').dt.tz_localize(None)
+	return mdates.date2num(values.to_numpy())
+
+class LiveComparisonPlot:
+	"""Original and adjusted series on one axes, updated in place."""
+
+	def __init__(self, figure, ax, canvas):
+		self.figure = figure
+		self.ax = ax
+		self.canvas = canvas
+		self.x = np.empty(0)
+		self.original = np.empty(0)
+		self.adjusted = None
+		self._order = np.empty(0, dtype=int)
+		self._background = None
+
+		self.original_line, = ax.plot([], [], label='Original', color='blue')
+		# Animated, so full draws leave it out of the cached background and it can be blitted alone
+		self.adjusted_line, = ax.plot([], [], label='Adjusted', color='orange', animated=True)
+
+		# Axis formatting is done once rather than on every update
+		ax.xaxis_date()
+		ax.set_xlabel('Period End', fontsize=16, fontweight='bold')
+		ax.legend(fontsize=14)
+		ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d\n%H:%M'))
+		ax.xaxis.set_major_locator(mdates.AutoDateLocator())
+		figure.autofmt_xdate(rotation=45, ha='right')
+
+		canvas.mpl_connect('draw_event', self._on_draw)
+		ax.callbacks.connect('xlim_changed', self._on_xlim_changed)
+
+	def target_points(self):
+		"""One point per horizontal pixel of the axes."""
+		return max(int(self.ax.bbox.width), MIN_POINTS)
+
+	def set_series(self, column, dates, original, adjusted=None):
+		"""Replace both series (new file or column). Rescales the axes and does a full redraw."""
+		x = date_numbers(dates)
+		order = np.argsort(x, kind='stable')
+		self.x = x[order]
+		self.original = np.asarray(original, dtype='float64')[order]
+		self._order = order
+		self.adjusted = None if adjusted is None else np.asarray(adjusted, dtype='float64')[order]
+
+		self.ax.set_ylabel(column, fontsize=16, fontweight='bold')
+		self.ax.set_title(f"{column} Comparison", fontsize=18, fontweight='bold')
+		self._resample(self.x[0] if len(self.x) else 0, self.x[-1] if len(self.x) else 1)
+		self.ax.relim()
+		self.ax.autoscale_view()
+		self.figure.tight_layout()
+		self.canvas.draw_idle()
+		logging.debug(f"Plot series set for '{column}' ({len(self.x)} points).")
+
+	def update_adjusted(self, adjusted):
+		"""
+		Replace only the adjusted series. Blits the adjusted line over the cached background,
+		falling back to a full redraw when the new values leave the current y-range.
+		"""
+		self.adjusted = np.asarray(adjusted, dtype='float64')[self._order]
+		self._resample(*self.ax.get_xlim(), adjusted_only=True)
+
+		y = self.adjusted_line.get_ydata()
+		finite = y[np.isfinite(y)]
+		y_min, y_max = self.ax.get_ylim()
+		if finite.size and (finite.min() < y_min or finite.max() > y_max):
+			self.ax.relim()
+			self.ax.autoscale_view()
+			self.canvas.draw_idle()
+		elif self._background is None or not self.canvas.supports_blit:
+			self.canvas.draw_idle()
+		else:
+			self.canvas.restore_region(self._background)
+			self.ax.draw_artist(self.adjusted_line)
+			self.canvas.blit(self.ax.bbox)
+
+	def _window(self, x_min, x_max):
+		"""Slice of the sorted data covering [x_min, x_max], plus one point either side."""
+		lo = max(int(np.searchsorted(self.x, x_min, side='left')) - 1, 0)
+		hi = min(int(np.searchsorted(self.x, x_max, side='right')) + 1, len(self.x))
+		return lo, hi
+
+	def _downsampled(self, y, lo, hi):
+		indices = lo + lttb(self.x[lo:hi], y[lo:hi], self.target_points())
+		return self.x[indices], y[indices]
+
+	def _resample(self, x_min, x_max, adjusted_only=False):
+		lo, hi = self._window(x_min, x_max)
+		if not adjusted_only:
+			self.original_line.set_data(*self._downsampled(self.original, lo, hi))
+		if self.adjusted is None:
+			self.adjusted_line.set_data([], [])
+		else:
+			self.adjusted_line.set_data(*self._downsampled(self.adjusted, lo, hi))
+
+	def _on_xlim_changed(self, ax):
+		# Toolbar zoom/pan: pick points for the new range; the pending draw renders them
+		if len(self.x):
+			self._resample(*ax.get_xlim())
+
+	def _on_draw(self, event):
+		# Cache everything except the animated adjusted line, then draw it on top
+		self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+		self.ax.draw_artist(self.adjusted_line)
@@ -0,0 +1,173 @@
+# poa.py
+#
+# Plane-of-array irradiance from the GHI/DNI/DHI columns with the isotropic-sky
+# transposition model. Solar geometry depends only on the site and the timestamps, so it
+# is computed once per (site, time index) and cached; each tilt/azimuth after that is a
+# handful of array operations over the cached arrays. Azimuths are degrees clockwise from
+# north (180 = south), as in PVWatts.
+
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_ALBEDO = 0.2
+# Solar geometries kept per process; each is five float64 arrays the length of the time index
+DEFAULT_MAX_GEOMETRIES = 16
+
+# Sun position as unit-vector components (up, north, east) plus the angles, per timestamp
+SolarGeometry = namedtuple('SolarGeometry', 'zenith azimuth up north east')
+
+def _read_only(array):
+	array.flags.writeable = False
+	return array
+
+def solar_position(times, latitude, longitude):
+	"""
+	Solar zenith and azimuth in degrees for timezone-aware (or UTC) timestamps, using the
+	NOAA fractional-year approximation (about 0.1 degree error in the declination).
+	"""
+	times = pd.DatetimeIndex(times)
+	times = times.tz_convert('UTC') if times.tz is not None else times
+	day_of_year = times.dayofyear.to_numpy()
+	hours = (times.hour + times.minute / 60 + (times.second + times.microsecond / 1e6) / 3600).to_numpy()
+
+	gamma = 2 * np.pi / 365 * (day_of_year - 1 + (hours - 12) / 24)
+	equation_of_time = 229.18 * (
+		0.000075 + 0.001868 * np.cos(gamma) - 0.032077 * np.sin(gamma)
+		- 0.014615 * np.cos(2 * gamma) - 0.040849 * np.sin(2 * gamma)
+	)
+	declination = (
+		0.006918 - 0.399912 * np.cos(gamma) + 0.070257 * np.sin(gamma)
+		- 0.006758 * np.cos(2 * gamma) + 0.000907 * np.sin(2 * gamma)
+		- 0.002697 * np.cos(3 * gamma) + 0.00148 * np.sin(3 * gamma)
+	)
+	true_solar_minutes = hours * 60 + equation_of_time + 4 * longitude
+	hour_angle = np.radians(true_solar_minutes / 4 - 180)
+
+	lat = np.radians(latitude)
+	cos_zenith = np.clip(
+		np.sin(lat) * np.sin(declination) + np.cos(lat) * np.cos(declination) * np.cos(hour_angle), -1.0, 1.0
+	)
+	zenith = np.degrees(np.arccos(cos_zenith))
+	azimuth = np.degrees(np.arctan2(
+		np.sin(hour_angle), np.cos(hour_angle) * np.sin(lat) - np.tan(declination) * np.cos(lat)
+	)) + 180
+	return zenith, azimuth
+
+def period_midpoints(df, time_column='Period End', period_column='Period'):
+	"""Mid-period UTC timestamps for period-averaged rows (Period End minus half the Period)."""
+	times = pd.to_datetime(df[time_column], utc=True)
+	if period_column in df.columns:
+		times = times - pd.to_timedelta(df[period_column]) / 2
+	return pd.DatetimeIndex(times)
+
+class GeometryCache:
+	"""Thread-safe LRU of SolarGeometry keyed by site and a digest of the timestamps."""
+
+	def __init__(self, maxsize=DEFAULT_MAX_GEOMETRIES):
+		self.maxsize = maxsize
+		self.hits = 0
+		self.misses = 0
+		self._entries = OrderedDict()
+		self._lock = threading.Lock()
+
+	@staticmethod
+	def key(times, latitude, longitude):
+		nanoseconds = np.ascontiguousarray(pd.DatetimeIndex(times).as_unit('ns').asi8)
+		digest = hashlib.blake2b(nanoseconds.tobytes(), digest_size=16).hexdigest()
+		return (round(float(latitude), 6), round(float(longitude), 6), len(nanoseconds), digest)
+
+	def get(self, times, latitude, longitude):
+		key = self.key(times, latitude, longitude)
+		with self._lock:
+			if key in self._entries:
+				self._entries.move_to_end(key)
+				self.hits += 1
+				return self._entries[key]
+			self.misses += 1
+		geometry = compute_geometry(times, latitude, longitude)
+		with self._lock:
+			self._entries[key] = geometry
+			while len(self._entries) > self.maxsize:
+				self._entries.popitem(last=False)
+		return geometry
+
+	def stats(self):
+		with self._lock:
+			return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize}
+
+	def clear(self):
+		with self._lock:
+			self._entries.clear()
+			self.hits = 0
+			self.misses = 0
+
+def compute_geometry(times, latitude, longitude):
+	zenith, azimuth = solar_position(times, latitude, longitude)
+	zenith_rad, azimuth_rad = np.radians(zenith), np.radians(azimuth)
+	horizontal = np.sin(zenith_rad)
+	return SolarGeometry(
+		_read_only(zenith), _read_only(azimuth), _read_only(np.cos(zenith_rad)),
+		_read_only(horizontal * np.cos(azimuth_rad)), _read_only(horizontal * np.sin(azimuth_rad))
+	)
+
+_geometry_cache = GeometryCache()
+
+def solar_geometry(times, latitude, longitude):
+	"""SolarGeometry for the timestamps at a site, from the shared cache when present."""
+	return _geometry_cache.get(times, latitude, longitude)
+
+def geometry_cache_stats():
+	return _geometry_cache.stats()
+
+class PlaneOfArrayEngine:
+	"""
+	Isotropic-sky plane-of-array irradiance for one site and time index:
+
+		POA = DNI * max(cos AOI, 0) + DHI * (1 + cos tilt) / 2 + GHI * albedo * (1 - cos tilt) / 2
+
+	The beam term is pre-multiplied into three arrays at construction, so poa() only
+	combines them with the orientation's sines and cosines.
+	"""
+
+	def __init__(self, times, ghi, dni, dhi, latitude, longitude, albedo=DEFAULT_ALBEDO):
+		self.geometry = solar_geometry(times, latitude, longitude)
+		self.ghi = _read_only(np.array(ghi, dtype='float64'))
+		self.dhi = _read_only(np.array(dhi, dtype='float64'))
+		self.albedo = albedo
+		# Beam irradiance only counts while the sun is above the horizon
+		dni = np.where(self.geometry.up > 0, np.asarray(dni, dtype='float64'), 0.0)
+		self._beam_up = _read_only(dni * self.geometry.up)
+		self._beam_north = _read_only(dni * self.geometry.north)
+		self._beam_east = _read_only(dni * self.geometry.east)
+
+	@classmethod
+	def from_frame(cls, df, latitude, longitude, albedo=DEFAULT_ALBEDO):
+		"""Engine over the GHI, DNI and DHI columns of a load_data frame, at mid-period times."""
+		missing = [column for column in ('GHI', 'DNI', 'DHI') if column not in df.columns]
+		if missing:
+			raise KeyError(f"Plane-of-array irradiance needs column(s): {', '.join(missing)}")
+		return cls(period_midpoints(df), df['GHI'], df['DNI'], df['DHI'], latitude, longitude, albedo)
+
+	def __len__(self):
+		return len(self.ghi)
+
+	def poa(self, tilt, azimuth):
+		"""POA irradiance for one orientation, or one row per orientation for arrays of them."""
+		tilt_rad = np.radians(np.asarray(tilt, dtype='float64'))[..., np.newaxis]
+		azimuth_rad = np.radians(np.asarray(azimuth, dtype='float64'))[..., np.newaxis]
+		cos_tilt, sin_tilt = np.cos(tilt_rad), np.sin(tilt_rad)
+		irradiance = self._beam_up * cos_tilt + sin_tilt * (self._beam_north * np.cos(azimuth_rad) + self._beam_east * np.sin(azimuth_rad))
+		np.maximum(irradiance, 0.0, out=irradiance)  # Sun behind the panel
+		irradiance += self.dhi * ((1 + cos_tilt) / 2)
+		irradiance += self.ghi * (self.albedo * (1 - cos_tilt) / 2)
+		return irradiance
+
+	def ratio(self, tilt, azimuth, reference_tilt, reference_azimuth):
+		"""POA at (tilt, azimuth) relative to a reference orientation; 1 where the reference is dark."""
+		target = self.poa(tilt, azimuth)
+		reference = self.poa(reference_tilt, reference_azimuth)
+		return np.divide(target, reference, out=np.ones_like(target), where=reference > 0)
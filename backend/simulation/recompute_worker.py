@@ -0,0 +1,77 @@
+# recompute_worker.py
+
+import queue
+import threading
+
+class LatestOnlyWorker:
+	"""
+	Background worker that only ever runs the most recent job.
+
+	Each submit() supersedes every earlier job: a job still waiting is dropped, and the
+	result of one already running is discarded when it finishes. Results are collected
+	with poll() from the thread that owns the UI, so the worker never touches widgets.
+	"""
+
+	def __init__(self, name='recompute'):
+		self._lock = threading.Lock()
+		self._wake = threading.Event()
+		self._results = queue.SimpleQueue()
+		self._pending = None
+		self._generation = 0
+		self._closed = False
+		self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+		self._thread.start()
+
+	def submit(self, fn, *args):
+		"""Queue fn(*args), replacing any job that has not started yet. Returns its generation."""
+		with self._lock:
+			self._generation += 1
+			self._pending = (self._generation, fn, args)
+			self._wake.set()
+			return self._generation
+
+	def cancel(self):
+		"""Drop the waiting job and ignore the result of the running one."""
+		with self._lock:
+			self._generation += 1
+			self._pending = None
+
+	def _run(self):
+		while True:
+			self._wake.wait()
+			with self._lock:
+				job, self._pending = self._pending, None
+				self._wake.clear()
+				if self._closed:
+					return
+			if job is None:
+				continue
+			generation, fn, args = job
+			try:
+				self._results.put((generation, fn(*args), None))
+			except Exception as e:
+				self._results.put((generation, None, e))
+
+	def poll(self):
+		"""
+		Result of the latest job if it has finished since the last poll, else None.
+		Re-raises the exception if that job failed.
+		"""
+		latest = None
+		while True:
+			try:
+				item = self._results.get_nowait()
+			except queue.Empty:
+				break
+			if item[0] == self._generation:
+				latest = item
+		if latest is None:
+			return None
+		if latest[2] is not None:
+			raise latest[2]
+		return latest[1]
+
+	def close(self):
+		with self._lock:
+			self._closed = True
+			self._wake.set()
@@ -0,0 +1,170 @@
+# rollups.py
+#
+# Daily, weekly and monthly rollups (sum, mean, min, max and percentiles) of time series,
+# so clients can fetch or plot the resolution they display instead of every sample. Used
+# by the backend for PVWatts' 8760-hour outputs and by the simulation for forecast frames.
+# Results are cached by a digest of the input, so each dataset is rolled up once per
+# resolution. NumPy only at import time; pandas is loaded by rollup_frame when it runs.
+
+import hashlib
+import threading
+import warnings
+from collections import OrderedDict
+
+import numpy as np
+
+RESOLUTIONS = ('daily', 'weekly', 'monthly')
+PERCENTILES = (10, 50, 90)
+STATISTICS = ('sum', 'mean', 'min', 'max') + tuple(f"p{q}" for q in PERCENTILES)
+
+# PVWatts hourly arrays cover a typical (non-leap) year starting 1 January 00:00
+HOURS_PER_YEAR = 8760
+DAYS_PER_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+DEFAULT_MAX_ROLLUPS = 256
+
+def group_stats(values, labels):
+	"""
+	STATISTICS of values grouped by integer labels. Returns (groups, {statistic: array}),
+	one entry per distinct label in ascending order. NaN values are ignored, and a group
+	with no finite values gets NaN for every statistic.
+	"""
+	values = np.asarray(values, dtype='float64')
+	labels = np.asarray(labels)
+	order = np.argsort(labels, kind='stable')
+	groups, starts, counts = np.unique(labels[order], return_index=True, return_counts=True)
+
+	# Pad the groups into one (groups, longest group) matrix so every statistic is one call
+	matrix = np.full((len(groups), int(counts.max()) if len(counts) else 0), np.nan)
+	group_of = np.repeat(np.arange(len(groups)), counts)
+	matrix[group_of, np.arange(len(values)) - starts[group_of]] = values[order]
+
+	empty = ~np.isfinite(matrix).any(axis=1)
+	with warnings.catch_warnings():
+		warnings.simplefilter('ignore', RuntimeWarning)  # All-NaN groups, reported as NaN below
+		stats = {
+			'sum': np.nansum(matrix, axis=1),
+			'mean': np.nanmean(matrix, axis=1),
+			'min': np.nanmin(matrix, axis=1),
+			'max': np.nanmax(matrix, axis=1),
+		}
+		for q, row in zip(PERCENTILES, np.nanpercentile(matrix, PERCENTILES, axis=1)):
+			stats[f"p{q}"] = row
+	stats['sum'][empty] = np.nan
+	return groups, stats
+
+def typical_year_labels(resolution, length=HOURS_PER_YEAR):
+	"""Group labels for a PVWatts-style series of length samples evenly covering one typical year."""
+	day = np.arange(length) * 365 // length
+	if resolution == 'daily':
+		return day
+	if resolution == 'weekly':
+		return day // 7  # Week 53 holds the year's last day
+	if resolution == 'monthly':
+		return np.repeat(np.arange(12), DAYS_PER_MONTH)[day]
+	raise ValueError(f"resolution must be one of {', '.join(RESOLUTIONS)}")
+
+class RollupCache:
+	"""Thread-safe LRU of rollups keyed by resolution and a digest of the input series."""
+
+	def __init__(self, maxsize=DEFAULT_MAX_ROLLUPS):
+		self.maxsize = maxsize
+		self.hits = 0
+		self.misses = 0
+		self._entries = OrderedDict()
+		self._lock = threading.Lock()
+
+	@staticmethod
+	def key(resolution, *arrays):
+		digest = hashlib.blake2b(digest_size=16)
+		for array in arrays:
+			digest.update(np.ascontiguousarray(array).tobytes())
+		return (resolution, tuple(len(array) for array in arrays), digest.hexdigest())
+
+	def get(self, key, compute):
+		with self._lock:
+			if key in self._entries:
+				self._entries.move_to_end(key)
+				self.hits += 1
+				return self._entries[key]
+			self.misses += 1
+		value = compute()
+		with self._lock:
+			self._entries[key] = value
+			while len(self._entries) > self.maxsize:
+				self._entries.popitem(last=False)
+		return value
+
+	def stats(self):
+		with self._lock:
+			return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize}
+
+	def clear(self):
+		with self._lock:
+			self._entries.clear()
+			self.hits = 0
+			self.misses = 0
+
+_rollup_cache = RollupCache()
+
+def rollup_cache_stats():
+	return _rollup_cache.stats()
+
+def _json_list(array):
+	return [None if not np.isfinite(value) else float(value) for value in array]
+
+def rollup_hourly(values, resolution):
+	"""
+	JSON-ready rollup of a typical-year series: {"resolution", "periods", statistic: [...]},
+	with missing values as None. Cached per series and resolution.
+	"""
+	values = np.asarray(values, dtype='float64')
+
+	def compute():
+		_, stats = group_stats(values, typical_year_labels(resolution, len(values)))
+		rollup = {"resolution": resolution, "periods": len(stats['sum'])}
+		rollup.update((name, _json_list(stats[name])) for name in STATISTICS)
+		return rollup
+
+	return _rollup_cache.get(RollupCache.key(resolution, values), compute)
+
+def rollup_outputs(data, resolution, min_length=HOURS_PER_YEAR):
+	"""Copy of a PVWatts response whose hourly output arrays are replaced by their rollups."""
+	outputs = {
+		field: rollup_hourly(value, resolution) if isinstance(value, list) and len(value) >= min_length else value
+		for field, value in data.get("outputs", {}).items()
+	}
+	return {**data, "outputs": outputs}
+
+def period_starts(times, resolution):
+	"""Start of the day, week (Monday) or month containing each timestamp."""
+	import pandas as pd
+	times = pd.DatetimeIndex(times)
+	days = times.floor('D')
+	if resolution == 'daily':
+		return days
+	if resolution == 'weekly':
+		return days - pd.to_timedelta(days.dayofweek, unit='D')
+	if resolution == 'monthly':
+		return days - pd.to_timedelta(days.day - 1, unit='D')
+	raise ValueError(f"resolution must be one of {', '.join(RESOLUTIONS)}")
+
+def rollup_frame(df, column, resolution, time_column='Period End'):
+	"""
+	Rollup of one column of a forecast frame, as a DataFrame indexed by period start with
+	one column per statistic. Periods follow the timestamps' own timezone. Cached per
+	column contents, timestamps and resolution, so redraws of the same data are free.
+	"""
+	import pandas as pd
+	times = pd.DatetimeIndex(pd.to_datetime(df[time_column]))
+	values = df[column].to_numpy(dtype='float64', na_value=np.nan)
+
+	def compute():
+		labels, periods = pd.factorize(period_starts(times, resolution), sort=True)
+		dated = labels >= 0  # Rows without a timestamp belong to no period
+		_, stats = group_stats(values[dated], labels[dated])
+		frame = pd.DataFrame(stats, index=pd.DatetimeIndex(periods, name='Period Start'), columns=list(STATISTICS))
+		frame['count'] = np.bincount(labels[dated], weights=np.isfinite(values[dated]), minlength=len(periods)).astype(int)
+		return frame
+
+	nanoseconds = times.as_unit('ns').asi8
+	return _rollup_cache.get(RollupCache.key((resolution, column), values, nanoseconds), compute).copy()
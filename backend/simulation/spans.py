@@ -0,0 +1,88 @@
+# spans.py
+#
+# Named timing spans for the hot paths (load, adjust, save; parse, fetch, serialize in the
+# backend). Off by default, when span() hands back a shared no-op context manager and costs
+# one flag check. Turn them on for the whole process with PV_SPANS=1 (each finished span is
+# logged), or for one unit of work with collect(), which returns the spans it recorded.
+
+import functools
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager, nullcontext
+
+logger = logging.getLogger(__name__)
+
+SpanRecord = namedtuple('SpanRecord', 'name start duration depth fields')
+
+_enabled = os.environ.get('PV_SPANS', '').lower() in ('1', 'true', 'yes')
+_local = threading.local()
+_NOOP = nullcontext()
+
+def enable(on=True):
+	"""Log every span in this process (the PV_SPANS environment variable sets the default)."""
+	global _enabled
+	_enabled = on
+
+def enabled():
+	return _enabled or getattr(_local, 'records', None) is not None
+
+def span(name, **fields):
+	"""Time the enclosed block as name. A no-op unless spans are enabled or being collected."""
+	if not _enabled and getattr(_local, 'records', None) is None:
+		return _NOOP
+	return _timed(name, fields)
+
+@contextmanager
+def _timed(name, fields):
+	depth = getattr(_local, 'depth', 0)
+	_local.depth = depth + 1
+	started = time.perf_counter()
+	try:
+		yield
+	finally:
+		duration = time.perf_counter() - started
+		_local.depth = depth
+		records = getattr(_local, 'records', None)
+		if records is not None:
+			records.append(SpanRecord(name, started - _local.origin, duration, depth, fields))
+		if _enabled:
+			details = ''.join(f" {key}={value}" for key, value in fields.items())
+			logger.info(f"span {'  ' * depth}{name}: {duration * 1000:.2f} ms{details}")
+
+def timed(name=None):
+	"""Decorator form of span(), named after the function unless name is given."""
+	def decorate(fn):
+		label = name or fn.__name__
+		@functools.wraps(fn)
+		def wrapper(*args, **kwargs):
+			if not _enabled and getattr(_local, 'records', None) is None:
+				return fn(*args, **kwargs)
+			with _timed(label, {}):
+				return fn(*args, **kwargs)
+		return wrapper
+	return decorate
+
+@contextmanager
+def collect():
+	"""Record the spans finished on this thread inside the block into the yielded list."""
+	previous = getattr(_local, 'records', None), getattr(_local, 'origin', None)
+	records = []
+	_local.records, _local.origin = records, time.perf_counter()
+	try:
+		yield records
+	finally:
+		_local.records, _local.origin = previous
+
+def format_spans(records):
+	"""Indented, start-ordered text rendering of collected spans."""
+	return '\n'.join(
+		f"{'  ' * record.depth}{record.name}: {record.duration * 1000:.2f} ms (at +{record.start * 1000:.2f} ms)"
+		for record in sorted(records, key=lambda record: record.start)
+	)
+
+def server_timing(records):
+	"""Server-Timing header value for the top-level spans."""
+	return ', '.join(f"{record.name};dur={record.duration * 1000:.2f}" for record in records if record.depth == 0)
@@ -0,0 +1,129 @@
+import sys
+
+import numpy as np
+import pytest
+
+import adjust_engine
+
+def reference_adjust(value, multiplier, azimuth, tilt):
+	"""Line-by-line port of adjust_pv_estimate in adjust_pv.cpp."""
+	adjusted_value = value * multiplier
+	azimuth_factor = 1.0 - (0.005 * abs(azimuth - 180.0))
+	if azimuth_factor < 0.5:
+		azimuth_factor = 0.5
+	tilt_factor = 1.0 - (0.003 * abs(tilt - 30.0))
+	if tilt_factor < 0.6:
+		tilt_factor = 0.6
+	adjusted_value *= azimuth_factor * tilt_factor
+	return adjusted_value
+
+@pytest.fixture
+def sample():
+	rng = np.random.default_rng(42)
+	values = rng.uniform(0.0, 5.0, 500)
+	values[::50] = np.nan
+	values[1] = 0.0
+	return values
+
+@pytest.fixture
+def native():
+	if 'native' not in adjust_engine.available_backends():
+		pytest.skip("adjust_pv_module is not built on this host")
+	return adjust_engine.get_backend('native')
+
+# Covers the optimum, both sides of it and both floors (azimuth 0/360, tilt 180)
+ORIENTATIONS = [(180.0, 30.0), (90.0, 10.0), (270.0, 45.0), (0.0, 90.0), (360.0, 180.0), (181.3, 37.4)]
+
+@pytest.mark.parametrize("azimuth,tilt", ORIENTATIONS)
+def test_numpy_matches_reference_model(sample, azimuth, tilt):
+	result = adjust_engine.adjust_pv_numpy(sample, 1.3, azimuth, tilt)
+	expected = np.array([reference_adjust(v, 1.3, azimuth, tilt) for v in sample])
+	np.testing.assert_array_equal(result, expected)
+
+def test_floors_applied():
+	assert adjust_engine.azimuth_factor(0.0) == 0.5
+	assert adjust_engine.tilt_factor(180.0) == 0.6
+	assert adjust_engine.orientation_factor(180.0, 30.0) == 1.0
+
+def test_numpy_per_row_parameters(sample):
+	n = sample.size
+	multipliers = np.linspace(0.5, 2.0, n)
+	azimuths = np.linspace(0.0, 360.0, n)
+	tilts = np.linspace(0.0, 90.0, n)
+	result = adjust_engine.adjust_pv_numpy(sample, multipliers, azimuths, tilts)
+	expected = np.array([reference_adjust(*row) for row in zip(sample, multipliers, azimuths, tilts)])
+	np.testing.assert_array_equal(result, expected)
+
+def test_numpy_writes_into_out(sample):
+	out = np.empty_like(sample)
+	result = adjust_engine.adjust_pv_numpy(sample, 1.0, 200.0, 20.0, out=out)
+	assert result is out
+
+@pytest.mark.parametrize("azimuth,tilt", ORIENTATIONS)
+def test_native_parity_scalar(sample, native, azimuth, tilt):
+	expected = adjust_engine.adjust_pv_numpy(sample, 0.8, azimuth, tilt)
+	np.testing.assert_array_equal(native(sample, 0.8, azimuth, tilt), expected)
+
+def test_native_parity_per_row(sample, native):
+	n = sample.size
+	multipliers = np.linspace(0.5, 2.0, n)
+	azimuths = np.linspace(0.0, 360.0, n)
+	tilts = np.linspace(0.0, 90.0, n)
+	expected = adjust_engine.adjust_pv_numpy(sample, multipliers, azimuths, tilts)
+	np.testing.assert_array_equal(native(sample, multipliers, azimuths, tilts), expected)
+
+def test_native_parity_single_value(native):
+	import adjust_pv_module
+	for azimuth, tilt in ORIENTATIONS:
+		single = adjust_pv_module.adjust_pv_estimate(2.5, 1.1, azimuth, tilt)
+		assert single == adjust_engine.adjust_pv_numpy(np.array([2.5]), 1.1, azimuth, tilt)[0]
+
+def test_backend_selected_from_environment(monkeypatch):
+	monkeypatch.setenv(adjust_engine.BACKEND_ENV_VAR, 'numpy')
+	assert adjust_engine.get_backend() is adjust_engine.adjust_pv_numpy
+
+def test_unknown_backend_rejected():
+	with pytest.raises(ValueError):
+		adjust_engine.get_backend('fortran')
+
+def test_default_prefers_native_when_built():
+	expected = 'native' if 'native' in adjust_engine.available_backends() else 'numpy'
+	assert adjust_engine.get_backend() is adjust_engine._BACKENDS[expected]
+
+def test_orientation_cache_counts_hits_and_evicts_lru():
+	cache = adjust_engine.OrientationCache(maxsize=2)
+	calls = []
+	compute = lambda azimuth, tilt: calls.append((azimuth, tilt)) or azimuth + tilt
+	assert cache.get(180.0, 30.0, compute) == 210.0
+	assert cache.get(180.001, 30.0, compute) == 210.0  # Same quantized orientation
+	cache.get(90.0, 10.0, compute)
+	cache.get(270.0, 45.0, compute)  # Evicts (180, 30)
+	cache.get(180.0, 30.0, compute)
+	assert cache.stats() == {"hits": 1, "misses": 4, "size": 2, "maxsize": 2}
+	assert len(calls) == 4
+
+def test_engine_matches_batch_adjustment(sample):
+	engine = adjust_engine.AdjustmentEngine(sample)
+	for azimuth, tilt in ORIENTATIONS:
+		expected = adjust_engine.adjust_pv_numpy(sample, 1.3, azimuth, tilt)
+		np.testing.assert_allclose(engine.adjust(1.3, azimuth, tilt), expected, rtol=1e-12)
+
+def test_multiplier_change_reuses_cached_base(sample):
+	engine = adjust_engine.AdjustmentEngine(sample)
+	first = engine.adjust(1.0, 200.0, 20.0)
+	out = np.empty_like(sample)
+	second = engine.adjust(1.5, 200.0, 20.0, out=out)
+	assert second is out
+	np.testing.assert_allclose(second, first * 1.5, rtol=1e-12)
+	assert engine.stats()["bases"]["hits"] == 1
+	assert engine.stats()["bases"]["misses"] == 1
+	# Cached arrays are never handed out writeable
+	assert not engine.base(200.0, 20.0).flags.writeable
+
+def test_stale_native_build_falls_back_to_numpy(monkeypatch):
+	import types
+	monkeypatch.setitem(sys.modules, 'stale_adjust_pv_module', types.SimpleNamespace(adjust_pv_estimate=lambda *args: 0.0))
+	backends = dict(adjust_engine._BACKENDS)
+	assert adjust_engine._register_native('stale_adjust_pv_module') is False
+	assert adjust_engine._register_native('missing_adjust_pv_module') is False
+	assert adjust_engine._BACKENDS == backends
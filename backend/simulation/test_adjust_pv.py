@@ -1,9 +1,28 @@
-import adjust_pv_module
+import numpy as np
+import pytest
+
+adjust_pv_module = pytest.importorskip("adjust_pv_module")
+
+def test_optimal_orientation_only_applies_multiplier():
+	assert adjust_pv_module.adjust_pv_estimate(100.0, 1.0, 180.0, 30.0) == 100.0
+	assert adjust_pv_module.adjust_pv_estimate(100.0, 1.5, 180.0, 30.0) == 150.0
+
+def test_orientation_penalties_and_floors():
+	# 20 degrees off azimuth and 10 degrees off tilt: 0.9 * 0.97
+	assert adjust_pv_module.adjust_pv_estimate(100.0, 1.0, 200.0, 20.0) == pytest.approx(87.3)
+	# Both factors floored: 0.5 * 0.6
+	assert adjust_pv_module.adjust_pv_estimate(100.0, 1.0, 0.0, 180.0) == pytest.approx(30.0)
+
+def test_batch_matches_single_values():
+	values = np.array([0.0, 1.0, 2.5, 100.0])
+	batch = adjust_pv_module.adjust_pv_batch(values, 1.2, 210.0, 35.0)
+	single = [adjust_pv_module.adjust_pv_estimate(value, 1.2, 210.0, 35.0) for value in values]
+	np.testing.assert_array_equal(batch, single)
 
 def main():
 	input_value = 100.0
-	adjusted = adjust_pv_module.adjust_pv_estimate(input_value)
+	adjusted = adjust_pv_module.adjust_pv_estimate(input_value, 1.0, 180.0, 30.0)
 	print(f"Adjusted PV estimate: {input_value} to {adjusted:.2f}")  # Formats to two decimal places
 
 if __name__ == "__main__":
-	main()
\ No newline at end of file
+	main()
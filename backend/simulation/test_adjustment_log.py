@@ -0,0 +1,42 @@
+import math
+
+import numpy as np
+
+from adjustment_log import AdjustmentLog, RowDetailView, format_summary, summarize_adjustment
+
+def test_summary_reports_delta_statistics():
+	original = np.array([1.0, 2.0, np.nan, 4.0])
+	adjusted = np.array([1.5, 2.0, np.nan, 3.0])
+	summary = summarize_adjustment('PV Estimate', original, adjusted, 1.2, 180.0, 30.0, 0.002)
+	assert summary.rows == 4
+	assert summary.min_delta == -1.0
+	assert summary.max_delta == 0.5
+	assert math.isclose(summary.mean_delta, -0.5 / 3)
+	assert "4 rows" in format_summary(summary)
+
+def test_summary_of_all_nan_column():
+	summary = summarize_adjustment('PV Estimate', [np.nan], [np.nan], 1.0, 180.0, 30.0, 0.0)
+	assert math.isnan(summary.mean_delta)
+
+def test_log_is_bounded_and_drains_in_batches():
+	log = AdjustmentLog(capacity=3)
+	for i in range(5):
+		log.add_message(f"line {i}")
+	assert len(log) == 3
+	assert log.lines() == ["line 2", "line 3", "line 4"]
+	assert log.drain() == ["line 2", "line 3", "line 4"]
+	assert log.drain() == []
+	log.add_message("line 5")
+	assert log.drain() == ["line 5"]
+	log.clear()
+	assert len(log) == 0
+
+def test_detail_view_formats_only_the_requested_page():
+	detail = RowDetailView()
+	detail.set(np.arange(1000), np.ones(1000), np.full(1000, 2.0))
+	page = detail.page(10, 5)
+	assert len(page) == 5
+	assert page[0].startswith("Row 10:")
+	# Offsets past the end are clamped to the last full page
+	assert detail.page(999, 5)[-1].startswith("Row 999:")
+	assert RowDetailView().page(0, 5) == []
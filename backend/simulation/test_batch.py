@@ -0,0 +1,63 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import batch
+from data_processor import Scenario, load_data
+
+@pytest.fixture
+def sites(tmp_path):
+	for name in ("north/site1.csv", "south/site1.csv", "south/site2.csv"):
+		path = tmp_path / "sites" / name
+		path.parent.mkdir(parents=True, exist_ok=True)
+		pd.DataFrame({
+			'PV Estimate': np.linspace(0.0, 2.0, 48),
+			'Period End': pd.date_range('2024-11-05', periods=48, freq='30min', tz='UTC'),
+		}).to_csv(path, index=False)
+	return tmp_path
+
+def test_parse_scenario():
+	assert batch.parse_scenario('high:1.2:200:35') == Scenario('high', 1.2, 200.0, 35.0)
+	assert batch.parse_scenario('base') == Scenario('base')
+	with pytest.raises(ValueError):
+		batch.parse_scenario('bad:x')
+	with pytest.raises(ValueError):
+		batch.read_scenarios(['a:1', 'a:2'])
+
+def test_bad_json_scenarios_name_their_index(tmp_path):
+	path = tmp_path / "scenarios.json"
+	for items in ([{"name": "ok"}, {"name": "x", "gain": 2}], [{"name": "ok"}, {"multiplier": 2}], [{"name": "ok"}, "high"]):
+		path.write_text(json.dumps(items))
+		with pytest.raises(ValueError, match="Scenario 1 in"):
+			batch.read_scenarios([str(path)])
+
+def test_output_paths_mirror_input_layout(tmp_path):
+	inputs = [str(tmp_path / "in" / "a" / "x.csv"), str(tmp_path / "in" / "b" / "x.csv")]
+	paths = batch.output_paths(inputs, "out")
+	assert list(paths.values()) == ["out/a/adjusted_x.csv", "out/b/adjusted_x.csv"]
+
+def test_run_batch_is_deterministic(sites):
+	pattern = str(sites / "sites" / "**" / "*.csv")
+	output = str(sites / "out")
+	scenarios = [Scenario('base'), Scenario('high', 1.5)]
+	summary = batch.run_batch(pattern, scenarios, output, workers=2)
+	assert list(summary['status']) == ['ok'] * 3
+	assert summary['total [high]'].iloc[0] == pytest.approx(summary['total [base]'].iloc[0] * 1.5)
+
+	adjusted = load_data(sites / "out" / "south" / "adjusted_site2.csv")
+	assert ['Adjusted_PV Estimate [base]', 'Adjusted_PV Estimate [high]'] == [c for c in adjusted.columns if c.startswith('Adjusted_')]
+	first = (sites / "out" / "north" / "adjusted_site1.csv").read_bytes()
+
+	# Re-running overwrites the same files, and never picks up its own outputs
+	again = batch.run_batch(pattern, scenarios, output, workers=1)
+	assert len(again) == 3
+	assert (sites / "out" / "north" / "adjusted_site1.csv").read_bytes() == first
+	assert (sites / "out" / batch.SUMMARY_FILE).exists()
+
+def test_failed_files_are_reported_not_raised(sites):
+	(sites / "sites" / "broken.csv").write_text("x\n")
+	summary = batch.run_batch(str(sites / "sites" / "*.csv"), [Scenario('base')], str(sites / "out"), workers=1)
+	assert list(summary['status']) == ['error']
+	assert summary['error'].iloc[0] == "No numeric columns to adjust"
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_processor
+
+@pytest.fixture
+def forecast_csv(tmp_path):
+	rows = 1000
+	df = pd.DataFrame({
+		' PV Estimate ': np.linspace(0.0, 4.0, rows).round(4).astype(object),
+		'Period End': pd.date_range('2024-11-05 22:30', periods=rows, freq='30min', tz='UTC'),
+		'Period': 'PT30M',
+		'GHI': np.arange(rows, dtype='float64'),
+	})
+	df.loc[::7, ' PV Estimate '] = 'N/A'
+	path = tmp_path / "forecasts.csv"
+	df.to_csv(path, index=False)
+	return path
+
+def test_load_data_parses_numeric_columns(forecast_csv):
+	df = data_processor.load_data(forecast_csv)
+	assert 'PV Estimate' in df.columns
+	assert df['PV Estimate'].dtype == np.float64
+	assert df['PV Estimate'].isna().sum() == 143
+	assert df['Period'].iloc[0] == 'PT30M'
+
+def test_load_data_coerces_stray_tokens(tmp_path):
+	path = tmp_path / "junk.csv"
+	pd.DataFrame({'PV Estimate': ['1.5', '-', 'N/A', '2'], 'GHI': ['3', '4', 'err', '5']}).to_csv(path, index=False)
+	df = data_processor.load_data(path)
+	assert df['PV Estimate'].tolist()[::3] == [1.5, 2.0]
+	assert df['PV Estimate'].isna().tolist() == [False, True, True, False]
+	assert df['GHI'].dtype == np.float64 and np.isnan(df['GHI'].iloc[2])
+	chunks = list(data_processor.iter_data(path, chunksize=2, float32=True))
+	assert all(chunk['GHI'].dtype == np.float32 for chunk in chunks)
+
+def test_iter_data_chunks_and_downcasts(forecast_csv):
+	chunks = list(data_processor.iter_data(forecast_csv, chunksize=300, float32=True))
+	assert [len(chunk) for chunk in chunks] == [300, 300, 300, 100]
+	assert all(chunk['PV Estimate'].dtype == np.float32 for chunk in chunks)
+	assert all(chunk['GHI'].dtype == np.float32 for chunk in chunks)
+
+def test_stream_adjust_matches_whole_file(forecast_csv, tmp_path):
+	output = tmp_path / "adjusted.csv"
+	rows = data_processor.stream_adjust(forecast_csv, output, 'PV Estimate', 1.5, azimuth=200.0, tilt=20.0, chunksize=128)
+	assert rows == 1000
+
+	expected = data_processor.adjust_pv(data_processor.load_data(forecast_csv), 'PV Estimate', 1.5, azimuth=200.0, tilt=20.0)
+	streamed = data_processor.load_data(output)
+	assert list(streamed.columns) == list(expected.columns)
+	np.testing.assert_allclose(streamed['Adjusted_PV Estimate'], expected['Adjusted_PV Estimate'])
+
+def test_adjusted_column_names_are_idempotent():
+	assert data_processor.adjusted_column_name('PV Estimate') == 'Adjusted_PV Estimate'
+	assert data_processor.adjusted_column_name('Adjusted_Adjusted_PV Estimate') == 'Adjusted_PV Estimate'
+	assert data_processor.adjusted_column_name('Adjusted_GHI', 'east') == 'Adjusted_GHI [east]'
+
+def test_repeated_adjustment_does_not_stack_prefixes(forecast_csv):
+	df = data_processor.load_data(forecast_csv)
+	df = data_processor.adjust_pv(df, 'PV Estimate', 1.5)
+	df = data_processor.adjust_pv(df, 'Adjusted_PV Estimate', 1.5)
+	assert [col for col in df.columns if 'Adjusted_' in col] == ['Adjusted_PV Estimate']
+	assert data_processor.source_columns(df) == ['PV Estimate', 'GHI']
+
+SCENARIOS = [
+	{'name': 'base'},
+	('east', 1.1, 90.0, 20.0),
+	data_processor.Scenario('steep', 0.9, tilt=60.0),
+]
+
+def test_adjust_scenarios_matches_single_adjustments(forecast_csv):
+	df = data_processor.load_data(forecast_csv)
+	result = data_processor.adjust_scenarios(df, ['PV Estimate', 'GHI'], SCENARIOS)
+	assert result.shape == (3, 2, 1000)
+	for s, scenario in enumerate(data_processor.normalize_scenarios(SCENARIOS)):
+		for c, column in enumerate(['PV Estimate', 'GHI']):
+			expected = data_processor.adjust_pv(df.copy(), column, scenario.multiplier, scenario.azimuth, scenario.tilt)
+			np.testing.assert_array_equal(result[s, c], expected[f'Adjusted_{column}'])
+	assert 'Adjusted_PV Estimate' not in df.columns
+
+def test_scenario_frames(forecast_csv):
+	df = data_processor.load_data(forecast_csv)
+	columns = ['PV Estimate', 'Adjusted_GHI']
+	result = data_processor.adjust_scenarios(df, columns, SCENARIOS)
+	wide = data_processor.scenarios_to_wide(df, columns, SCENARIOS, result)
+	assert list(wide.columns)[:2] == ['Adjusted_PV Estimate [base]', 'Adjusted_GHI [base]']
+	np.testing.assert_array_equal(wide['Adjusted_GHI [east]'], result[1, 1])
+
+	long = data_processor.scenarios_to_long(df, columns, SCENARIOS, result)
+	assert len(long) == 3 * 2 * 1000
+	steep_ghi = long[(long['Scenario'] == 'steep') & (long['Column'] == 'GHI')]
+	np.testing.assert_array_equal(steep_ghi['Value'], result[2, 1])
+	assert (steep_ghi['Period End'].to_numpy() == df['Period End'].to_numpy()).all()
+
+def test_duplicate_scenario_names_rejected():
+	with pytest.raises(ValueError):
+		data_processor.normalize_scenarios([{'name': 'a'}, {'name': 'a', 'multiplier': 2.0}])
+
+def test_stream_adjust_keeps_header_of_empty_csv(tmp_path):
+	path = tmp_path / "empty.csv"
+	path.write_text("PV Estimate,Period End\n")
+	output = tmp_path / "adjusted.csv"
+	assert data_processor.stream_adjust(path, output, 'PV Estimate', 1.5) == 0
+	assert output.read_text().splitlines() == ["PV Estimate,Period End,Adjusted_PV Estimate"]
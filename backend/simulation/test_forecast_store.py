@@ -0,0 +1,86 @@
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from forecast_store import ForecastStore, convert, load_forecasts
+
+def forecast_batch(fetched_at, start, rows=48):
+	return pd.DataFrame({
+		'PV Estimate': [float(i % 10) for i in range(rows)],
+		'Period End': pd.date_range(start, periods=rows, freq='30min', tz='UTC'),
+		'Period': 'PT30M',
+		'Fetched At': pd.Timestamp(fetched_at),
+	})
+
+def test_append_adds_batches_without_rewriting(tmp_path):
+	store = ForecastStore(str(tmp_path / "store"))
+	first = store.append(forecast_batch('2024-11-05 22:20:33', '2024-11-05 22:30'))
+	first_mtimes = [os.stat(path).st_mtime_ns for path in first]
+
+	store.append(forecast_batch('2024-11-06 22:20:33', '2024-11-06 22:30'))
+	assert len(store.batch_paths()) == 2
+	assert [os.stat(path).st_mtime_ns for path in first] == first_mtimes
+
+	df = store.read_frame()
+	assert len(df) == 96
+	assert df['Fetched At'].nunique() == 2
+	assert str(df['Period End'].dt.tz) == 'UTC'
+
+def test_append_splits_by_fetched_at(tmp_path):
+	store = ForecastStore(str(tmp_path / "store"))
+	combined = pd.concat([forecast_batch('2024-11-05 10:00', '2024-11-05'), forecast_batch('2024-11-05 11:00', '2024-11-06')])
+	assert len(store.append(combined)) == 2
+
+def test_convert_csv_and_load_forecasts(tmp_path):
+	csv_path = tmp_path / "solar_forecasts.csv"
+	forecast_batch('2024-11-05 22:20:33', '2024-11-05 22:30').to_csv(csv_path, index=False)
+	store_path = str(tmp_path / "store")
+
+	assert load_forecasts(str(csv_path), store_path)['Period End'].dtype.kind == 'M'  # CSV fallback
+	convert([str(csv_path)], store_path)
+	df = load_forecasts(str(csv_path), store_path)
+	assert len(df) == 48
+	assert df['Period End'].dtype.kind == 'M'
+	assert df['Fetched At'].dtype.kind == 'M'
+
+def test_convert_maps_solcast_pickles(tmp_path):
+	merged = pd.DataFrame({
+		'pv_estimate_forecast': [1.5, 2.5, None],
+		'pv_estimate10': [1.0, 2.0, None],
+		'period_end': pd.date_range('2024-11-27 12:00', periods=3, freq='30min', tz='UTC'),
+		'period_x': ['PT30M', 'PT30M', None],
+		'pv_estimate_live': [1.4, None, 3.0],
+	})
+	merged.to_pickle(tmp_path / "combined_data.pkl")
+	df = convert([str(tmp_path / "combined_data.pkl")], str(tmp_path / "store")).read_frame()
+	assert list(df.columns) == ['PV Estimate', 'Period End', 'Period']
+	assert df['PV Estimate'].tolist() == [1.5, 2.5]
+	assert df['Period End'].notna().all()
+
+def test_convert_refuses_other_schemas(tmp_path):
+	pd.DataFrame({'power': [1.0]}).to_pickle(tmp_path / "other.pkl")
+	with pytest.raises(ValueError, match="missing column"):
+		convert([str(tmp_path / "other.pkl")], str(tmp_path / "store"))
+	assert not ForecastStore(str(tmp_path / "store")).exists()
+
+def test_batch_numbers_are_never_reused(tmp_path):
+	store = ForecastStore(str(tmp_path / "store"))
+	first, second = (store.append(forecast_batch(f'2024-11-0{day} 10:00', f'2024-11-0{day}'))[0] for day in (5, 6))
+	os.remove(first)
+	third = store.append(forecast_batch('2024-11-07 10:00', '2024-11-07'))[0]
+	assert os.path.basename(third).startswith('batch-000003')
+	assert len(store.read_frame()) == 96
+
+def test_concurrent_appends_keep_every_batch(tmp_path):
+	import threading
+	store = ForecastStore(str(tmp_path / "store"))
+	threads = [threading.Thread(target=store.append, args=(forecast_batch('2024-11-05 10:00', '2024-11-05'),)) for _ in range(8)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	assert len(store.batch_paths()) == 8
+	assert not [name for name in os.listdir(store.path) if name.endswith('.tmp')]
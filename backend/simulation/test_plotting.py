@@ -0,0 +1,57 @@
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from plotting import LiveComparisonPlot, lttb
+
+def test_lttb_keeps_endpoints_and_peaks():
+	x = np.arange(10_000, dtype='float64')
+	y = np.sin(x / 500.0)
+	y[4321] = 25.0
+	indices = lttb(x, y, 200)
+	assert len(indices) == 200
+	assert indices[0] == 0 and indices[-1] == len(x) - 1
+	assert np.all(np.diff(indices) > 0)
+	assert 4321 in indices
+
+def test_lttb_passes_short_series_through():
+	assert list(lttb([0, 1, 2], [1, 2, 3], 10)) == [0, 1, 2]
+
+def test_lttb_skips_nan_when_bucket_has_values():
+	x = np.arange(1000, dtype='float64')
+	y = np.where(x % 2 == 0, np.nan, x)
+	indices = lttb(x, y, 50)
+	assert np.all(np.isfinite(y[indices[1:-1]]))
+
+def make_plot(n=50_000):
+	figure, ax = plt.subplots(figsize=(8, 4), dpi=100)
+	plot = LiveComparisonPlot(figure, ax, figure.canvas)
+	dates = pd.date_range('2024-06-01', periods=n, freq='min', tz='UTC')
+	values = np.abs(np.sin(np.arange(n) / 300.0))
+	plot.set_series('PV Estimate', dates, values)
+	figure.canvas.draw()
+	return figure, plot, values
+
+def test_updates_reuse_lines_and_downsample_to_axes_width():
+	figure, plot, values = make_plot()
+	lines = list(plot.ax.lines)
+	plot.update_adjusted(values * 0.9)
+	plot.update_adjusted(values * 0.8)
+	assert list(plot.ax.lines) == lines
+	assert len(plot.adjusted_line.get_ydata()) <= plot.target_points()
+	assert len(plot.original_line.get_xdata()) <= plot.target_points()
+	plt.close(figure)
+
+def test_zoom_resamples_visible_range():
+	figure, plot, values = make_plot()
+	plot.update_adjusted(values)
+	x_min, x_max = plot.x[1000], plot.x[1100]
+	plot.ax.set_xlim(x_min, x_max)
+	x = plot.original_line.get_xdata()
+	# Only ~100 points are visible, so they are plotted at full resolution
+	assert len(x) == 103
+	assert x[1] == x_min
+	plt.close(figure)
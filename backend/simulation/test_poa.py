@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_processor
+import poa
+
+LAT, LON = 51.2, 3.48
+
+@pytest.fixture
+def frame():
+	times = pd.date_range('2024-06-20 00:30', periods=96, freq='30min', tz='UTC')
+	zenith, _ = poa.solar_position(times - pd.Timedelta('15min'), LAT, LON)
+	up = np.clip(np.cos(np.radians(zenith)), 0, None)
+	dni = np.where(up > 0, 600.0, 0.0)
+	dhi = np.where(up > 0, 100.0, 0.0)
+	return pd.DataFrame({
+		'PV Estimate': up * 4.0,
+		'Period End': times,
+		'Period': 'PT30M',
+		'GHI': dni * up + dhi,  # Consistent with the closure GHI = DNI cos(zenith) + DHI
+		'DNI': dni,
+		'DHI': dhi,
+	})
+
+def test_solar_position_matches_reference():
+	# Summer solstice near solar noon in Flanders: elevation 90 - 51.2 + 23.44
+	zenith, azimuth = poa.solar_position(pd.DatetimeIndex(['2024-06-21 11:48'], tz='UTC'), LAT, LON)
+	assert zenith[0] == pytest.approx(27.76, abs=0.2)
+	assert azimuth[0] == pytest.approx(180.0, abs=2.0)
+	_, morning = poa.solar_position(pd.DatetimeIndex(['2024-06-21 06:00'], tz='UTC'), LAT, LON)
+	assert 60 < morning[0] < 100
+
+def test_horizontal_plane_equals_ghi(frame):
+	engine = poa.PlaneOfArrayEngine.from_frame(frame, LAT, LON)
+	np.testing.assert_allclose(engine.poa(0.0, 180.0), frame['GHI'], atol=1e-9)
+
+def test_orientations_vectorize_and_reuse_geometry(frame):
+	poa._geometry_cache.clear()
+	engine = poa.PlaneOfArrayEngine.from_frame(frame, LAT, LON)
+	poa.PlaneOfArrayEngine.from_frame(frame.assign(DNI=frame['DNI'] * 2), LAT, LON)
+	assert poa.geometry_cache_stats()["misses"] == 1
+	assert poa.geometry_cache_stats()["hits"] == 1
+
+	grid = engine.poa([10.0, 35.0, 90.0], [180.0, 180.0, 90.0])
+	assert grid.shape == (3, len(frame))
+	np.testing.assert_allclose(grid[1], engine.poa(35.0, 180.0))
+	# A south-facing tilt collects more over the day than a vertical east wall
+	assert grid[1].sum() > grid[2].sum()
+	assert (grid >= 0).all()
+
+def test_adjust_pv_poa_scales_by_irradiance_ratio(frame):
+	df = data_processor.adjust_pv_poa(frame.copy(), 'PV Estimate', 1.0, 180.0, 30.0, LAT, LON)
+	np.testing.assert_allclose(df['Adjusted_PV Estimate'], frame['PV Estimate'])  # Reference orientation
+	east = data_processor.adjust_pv_poa(frame.copy(), 'PV Estimate', 2.0, 90.0, 30.0, LAT, LON)['Adjusted_PV Estimate']
+	ratio = east / (2 * frame['PV Estimate'])
+	hours = frame['Period End'].dt.hour
+	assert (ratio[(hours >= 5) & (hours < 9)] > 1).all()  # East-facing wins in the morning
+	assert (ratio[(hours >= 13) & (hours < 18)] < 1).all()
+
+def test_missing_irradiance_columns(frame):
+	with pytest.raises(KeyError):
+		poa.PlaneOfArrayEngine.from_frame(frame.drop(columns=['DNI']), LAT, LON)
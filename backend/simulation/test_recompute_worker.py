@@ -0,0 +1,59 @@
+import threading
+import time
+
+import pytest
+
+from recompute_worker import LatestOnlyWorker
+
+def wait_for_result(worker, timeout=5):
+	deadline = time.monotonic() + timeout
+	while time.monotonic() < deadline:
+		result = worker.poll()
+		if result is not None:
+			return result
+		time.sleep(0.005)
+	raise AssertionError("worker produced no result")
+
+@pytest.fixture
+def worker():
+	worker = LatestOnlyWorker()
+	yield worker
+	worker.close()
+
+def test_only_latest_job_result_is_delivered(worker):
+	started = threading.Event()
+	release = threading.Event()
+	calls = []
+
+	def job(value):
+		calls.append(value)
+		if value == 0:
+			started.set()
+			release.wait(5)
+		return value
+
+	worker.submit(job, 0)
+	started.wait(5)
+	for value in range(1, 20):  # Queued while job 0 runs; all but the last are dropped
+		worker.submit(job, value)
+	release.set()
+
+	assert wait_for_result(worker) == 19
+	assert calls == [0, 19]
+
+def test_cancel_discards_running_result(worker):
+	release = threading.Event()
+	worker.submit(lambda: release.wait(5) or "stale")
+	worker.cancel()
+	release.set()
+	time.sleep(0.05)
+	assert worker.poll() is None
+
+def test_errors_are_raised_on_poll(worker):
+	def fail():
+		raise ValueError("bad column")
+	worker.submit(fail)
+	with pytest.raises(ValueError):
+		deadline = time.monotonic() + 5
+		while worker.poll() is None and time.monotonic() < deadline:
+			time.sleep(0.005)
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import rollups
+
+def test_group_stats_ignores_nan_and_orders_groups():
+	groups, stats = rollups.group_stats([1.0, 5.0, np.nan, 2.0, 4.0, np.nan], [1, 0, 0, 1, 0, 2])
+	assert list(groups) == [0, 1, 2]
+	np.testing.assert_allclose(stats['sum'], [9.0, 3.0, np.nan])
+	np.testing.assert_allclose(stats['mean'], [4.5, 1.5, np.nan])
+	np.testing.assert_allclose(stats['min'][:2], [4.0, 1.0])
+	np.testing.assert_allclose(stats['p50'][:2], [4.5, 1.5])
+
+def test_typical_year_periods():
+	assert rollups.typical_year_labels('daily').max() == 364
+	assert rollups.typical_year_labels('weekly').max() == 52
+	monthly = rollups.typical_year_labels('monthly')
+	assert np.bincount(monthly).tolist() == [days * 24 for days in rollups.DAYS_PER_MONTH]
+	with pytest.raises(ValueError):
+		rollups.typical_year_labels('hourly')
+
+def test_rollup_outputs_replaces_hourly_arrays_and_caches():
+	rollups._rollup_cache.clear()
+	hourly = list(np.tile(np.r_[np.zeros(6), np.full(12, 2.0), np.zeros(6)], 365))
+	data = {"inputs": {}, "outputs": {"ac": hourly, "ac_monthly": [1.0] * 12}}
+	rolled = rollups.rollup_outputs(data, 'monthly')
+	assert rolled["outputs"]["ac_monthly"] == [1.0] * 12
+	ac = rolled["outputs"]["ac"]
+	assert ac["periods"] == 12
+	assert ac["sum"][0] == pytest.approx(31 * 24.0)
+	assert (ac["min"][0], ac["max"][0], ac["p50"][0]) == (0.0, 2.0, 1.0)
+	assert data["outputs"]["ac"] is hourly  # Input untouched
+	rollups.rollup_outputs(data, 'monthly')
+	assert rollups.rollup_cache_stats()["hits"] == 1
+
+def test_rollup_frame_by_calendar_period():
+	times = pd.date_range('2024-11-04 00:30', periods=48 * 14, freq='30min', tz='UTC')
+	df = pd.DataFrame({'Period End': times.astype(str), 'PV Estimate': np.ones(len(times))})
+	df.loc[5, 'PV Estimate'] = np.nan
+
+	daily = rollups.rollup_frame(df, 'PV Estimate', 'daily')
+	assert len(daily) == 15  # The last half-hour ends at midnight of day 15
+	assert daily['count'].iloc[0] == 46  # 00:30-23:30, one missing
+
+	weekly = rollups.rollup_frame(df, 'PV Estimate', 'weekly')
+	assert [stamp.dayofweek for stamp in weekly.index] == [0, 0, 0]
+	assert weekly['sum'].sum() == len(times) - 1
+	assert rollups.rollup_frame(df, 'PV Estimate', 'weekly').equals(weekly)
@@ -0,0 +1,32 @@
+import logging
+
+import spans
+
+def test_disabled_span_is_shared_noop():
+	assert not spans.enabled()
+	assert spans.span('a') is spans.span('b')
+
+def test_collect_records_nested_spans():
+	@spans.timed()
+	def inner():
+		return 42
+
+	with spans.collect() as records:
+		with spans.span('outer', rows=3):
+			assert inner() == 42
+	assert [(record.name, record.depth) for record in records] == [('inner', 1), ('outer', 0)]
+	assert records[1].fields == {'rows': 3}
+	assert records[1].duration >= records[0].duration
+	assert spans.server_timing(records).startswith('outer;dur=')
+	assert spans.format_spans(records).splitlines()[1].startswith('  inner: ')
+	assert not spans.enabled()
+
+def test_enabled_spans_are_logged(caplog):
+	spans.enable()
+	try:
+		with caplog.at_level(logging.INFO, logger='spans'):
+			with spans.span('load_data'):
+				pass
+	finally:
+		spans.enable(False)
+	assert 'span load_data:' in caplog.text
@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+# Cold-import budgets in seconds, generous enough for a loaded CI machine. Today the data
+# path imports in well under half a second; the GUI's tkinter/matplotlib stack roughly doubles that.
+DATA_PATH_BUDGET = 1.5
+UI_MODULES = ('tkinter', 'matplotlib', 'seaborn')
+
+def cold_import(module, runs=2):
+	"""Fastest of several fresh-interpreter imports of module: (seconds, modules loaded)."""
+	code = (
+		"import os, sys, time\n"
+		"started = time.perf_counter()\n"
+		f"import {module}\n"
+		"print(time.perf_counter() - started)\n"
+		"print(','.join(sys.modules))\n"
+		"sys.stdout.flush()\n"
+		"os._exit(0)\n"
+	)
+	results = []
+	for _ in range(runs):
+		output = subprocess.run(
+			[sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)),
+			capture_output=True, text=True, check=True
+		).stdout.splitlines()
+		results.append((float(output[0]), set(output[1].split(','))))
+	return min(results, key=lambda result: result[0])
+
+def test_data_path_starts_without_ui_stack():
+	for module in ('data_processor', 'batch', 'app'):
+		elapsed, modules = cold_import(module)
+		assert not [name for name in UI_MODULES if name in modules], module
+		assert elapsed < DATA_PATH_BUDGET, f"import {module} took {elapsed:.2f}s"
@@ -0,0 +1,54 @@
+# singleflight.py
+
+import threading
+from concurrent.futures import Future
+
+class SingleFlight:
+	"""
+	Coalesces concurrent calls that share a key: the first caller runs the function,
+	everyone else arriving while it is in flight waits for and shares its result.
+	"""
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._calls = {}
+
+	def _claim(self, key):
+		"""Return (future, is_leader) for key, registering a new call if none is in flight."""
+		with self._lock:
+			future = self._calls.get(key)
+			if future is not None:
+				return future, False
+			future = self._calls[key] = Future()
+			return future, True
+
+	def _run(self, key, future, fn):
+		try:
+			future.set_result(fn())
+		except BaseException as e:
+			future.set_exception(e)
+		finally:
+			with self._lock:
+				self._calls.pop(key, None)
+
+	def do(self, key, fn):
+		"""Run fn for key, or wait for the call already in flight. Exceptions are shared too."""
+		future, leader = self._claim(key)
+		if leader:
+			self._run(key, future, fn)
+		return future.result()
+
+	def submit(self, key, fn, executor):
+		"""Start fn for key on executor unless a call is already in flight; returns its future."""
+		future, leader = self._claim(key)
+		if leader:
+			executor.submit(self._run, key, future, fn)
+		return future
+
+	def in_flight(self, key):
+		with self._lock:
+			return key in self._calls
+
+	def __len__(self):
+		with self._lock:
+			return len(self._calls)
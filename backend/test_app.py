@@ -0,0 +1,242 @@
+import threading
+import time
+
+import pytest
+
+import app as backend
+import rollups  # On sys.path once app is imported
+
+def fake_outputs(params):
+	"""Deterministic PVWatts-like payload whose yield peaks at tilt 35, azimuth 180."""
+	penalty = abs(params["tilt"] - 35) * 2 + abs(params["azimuth"] - 180)
+	monthly = [max(500.0 - penalty, 0.0) / 12] * 12
+	return {"inputs": params, "outputs": {"ac_monthly": monthly, "ac_annual": sum(monthly)}}
+
+@pytest.fixture
+def upstream(monkeypatch):
+	calls = []
+	lock = threading.Lock()
+	def request_upstream(params, wait_for_quota=False):
+		with lock:
+			calls.append(params)
+		return fake_outputs(params)
+	monkeypatch.setattr(backend, "request_upstream", request_upstream)
+	backend.cache.clear()
+	yield calls
+	backend.cache.clear()
+
+@pytest.fixture
+def client():
+	return backend.app.test_client()
+
+def test_pvwatts_uses_cache(client, upstream):
+	first = client.get('/api/pvwatts?tilt=30&azimuth=180')
+	second = client.get('/api/pvwatts?tilt=30.0&azimuth=180.0')
+	assert first.status_code == second.status_code == 200
+	assert first.get_json() == second.get_json()
+	assert len(upstream) == 1
+
+def test_sweep_matrix_and_optimum(client, upstream):
+	response = client.get('/api/pvwatts/sweep?tilt_min=25&tilt_max=45&tilt_step=5&azimuth_min=150&azimuth_max=210&azimuth_step=15&multiplier=2')
+	assert response.status_code == 200
+	body = response.get_json()
+	assert body["tilts"] == [25.0, 30.0, 35.0, 40.0, 45.0]
+	assert body["azimuths"] == [150.0, 165.0, 180.0, 195.0, 210.0]
+	assert len(body["annual_ac"]) == 5 and all(len(row) == 5 for row in body["annual_ac"])
+	assert body["optimum"]["tilt"] == 35.0
+	assert body["optimum"]["azimuth"] == 180.0
+	assert body["optimum"]["ac_annual"] == pytest.approx(1000.0)
+	assert body["upstream_requests"] == 25
+
+def test_sweep_only_fetches_uncached_points(client, upstream):
+	client.get('/api/pvwatts?tilt=30&azimuth=180')
+	response = client.get('/api/pvwatts/sweep?tilt_min=30&tilt_max=40&tilt_step=10&azimuth_min=180&azimuth_max=180&azimuth_step=10')
+	assert response.get_json()["upstream_requests"] == 1
+	assert len(upstream) == 2
+
+def test_sweep_rejects_bad_ranges(client, upstream):
+	assert client.get('/api/pvwatts/sweep?tilt_step=0').status_code == 400
+	assert client.get('/api/pvwatts/sweep?tilt_min=50&tilt_max=10').status_code == 400
+	assert client.get('/api/pvwatts/sweep?tilt_step=0.1&azimuth_step=0.1').status_code == 400
+	assert upstream == []
+
+def test_sweep_rejects_huge_and_non_finite_grids_before_building_them(client, upstream):
+	for query in ('tilt_step=1e-7', 'tilt_max=1e15', 'tilt_step=1e-300', 'tilt_max=inf', 'tilt_min=nan', 'azimuth_step=nan'):
+		response = client.get(f'/api/pvwatts/sweep?{query}')
+		assert response.status_code == 400, query
+		assert "error" in response.get_json()
+	assert upstream == []
+
+def test_sweep_rejects_bad_multipliers_and_orientations(client, upstream):
+	for query in ('multiplier=nan', 'multiplier=inf', 'multiplier=-1', 'multiplier=0', 'tilt_min=-10',
+			'tilt_max=95', 'azimuth_min=-30', 'azimuth_max=360'):
+		response = client.get(f'/api/pvwatts/sweep?{query}')
+		assert response.status_code == 400, query
+		assert "error" in response.get_json()
+	assert upstream == []
+
+def test_orientation_grid_includes_stop():
+	assert backend.grid_size(0, 0.3, 0.1) == 4
+	assert backend.orientation_grid(0, 0.3, 0.1).tolist() == [0.0, 0.1, 0.2, 0.3]
+	assert backend.orientation_grid(0, 95, 10).tolist()[-1] == 90.0
+
+def test_exhausted_quota_returns_retry_after(client, upstream, monkeypatch):
+	limiter = backend.TokenBucket(0.1, 1)
+	limiter.acquire()
+	monkeypatch.setattr(backend, "upstream_limiter", limiter)
+	monkeypatch.setattr(backend, "NREL_QUOTA_WAIT", 0.05)
+	for url in ('/api/pvwatts?tilt=30&azimuth=180', '/api/pvwatts/sweep?tilt_min=30&tilt_max=30&azimuth_min=180&azimuth_max=180'):
+		response = client.get(url)
+		assert response.status_code == 503
+		assert 1 <= int(response.headers['Retry-After']) <= 10
+	assert upstream == []
+
+def test_concurrent_misses_share_one_upstream_call(monkeypatch, upstream):
+	release = threading.Event()
+	def slow_upstream(params, wait_for_quota=False):
+		release.wait(5)
+		upstream.append(params)
+		return fake_outputs(params)
+	monkeypatch.setattr(backend, "request_upstream", slow_upstream)
+
+	results = []
+	threads = [threading.Thread(target=lambda: results.append(backend.fetch_pvwatts(30, 180))) for _ in range(8)]
+	for thread in threads:
+		thread.start()
+	time.sleep(0.1)  # Let every thread reach the cache miss before upstream answers
+	release.set()
+	for thread in threads:
+		thread.join(5)
+	assert len(results) == 8
+	assert all(result == results[0] for result in results)
+	assert len(upstream) == 1
+
+def test_stale_entry_served_while_refreshing(monkeypatch, upstream):
+	params = backend.pvwatts_params(30, 180)
+	key = backend.pvwatts_cache_key(params)
+	stale = {"outputs": {"ac_monthly": [1.0] * 12}}
+	backend.cache.set(key, {"data": stale, "fetched_at": 0})
+
+	assert backend.fetch_pvwatts(30, 180) == stale
+	backend.upstream_flights.submit(key, lambda: None, backend.nrel.executor).result(5)
+	assert len(upstream) == 1
+	assert backend.fetch_pvwatts(30, 180) == fake_outputs(params)
+
+def test_grid_snapping_fetches_corners_and_interpolates(client, upstream):
+	response = client.get('/api/pvwatts?tilt=37.5&azimuth=181.2&grid=5')
+	assert response.status_code == 200
+	body = response.get_json()
+	corners = {(c["tilt"], c["azimuth"]) for c in body["interpolation"]["corners"]}
+	assert corners == {(35.0, 180.0), (35.0, 185.0), (40.0, 180.0), (40.0, 185.0)}
+	assert len(upstream) == 4
+	# The fake model is linear inside this cell, so interpolation is exact
+	expected = fake_outputs({"tilt": 37.5, "azimuth": 181.2})["outputs"]["ac_annual"]
+	assert body["outputs"]["ac_annual"] == pytest.approx(expected)
+	assert body["inputs"]["tilt"] == 37.5
+	assert body["interpolation"]["error_bound"]["ac_annual"] >= 0
+
+	client.get('/api/pvwatts?tilt=38.9&azimuth=183.7&grid=5')
+	assert len(upstream) == 4
+
+def test_grid_point_on_grid_needs_one_fetch(client, upstream):
+	body = client.get('/api/pvwatts?tilt=30&azimuth=355&grid=5').get_json()
+	assert [(c["tilt"], c["azimuth"], c["weight"]) for c in body["interpolation"]["corners"]] == [(30.0, 355.0, 1.0)]
+	assert body["interpolation"]["error_bound"]["ac_annual"] == 0
+	assert len(upstream) == 1
+
+def test_grid_wraps_azimuth_past_north(client, upstream):
+	body = client.get('/api/pvwatts?tilt=30&azimuth=358&grid=5').get_json()
+	assert {c["azimuth"] for c in body["interpolation"]["corners"]} == {355.0, 0.0}
+
+def test_grid_step_validated(client, upstream):
+	assert client.get('/api/pvwatts?grid=-5').status_code == 400
+	assert client.get('/api/pvwatts?grid=nan').status_code == 400
+
+def test_orientation_validated(client, upstream):
+	for query in ('tilt=nan&grid=5', 'tilt=inf&grid=5', 'tilt=nan', 'azimuth=inf', 'tilt=-5', 'tilt=91', 'azimuth=360', 'azimuth=-1'):
+		response = client.get(f'/api/pvwatts?{query}')
+		assert response.status_code == 400, query
+		assert "error" in response.get_json()
+	assert upstream == []
+	with pytest.raises(ValueError):
+		backend.grid_corners(float('nan'), 180.0, 5)
+	assert client.get('/api/pvwatts?grid=inf').status_code == 400
+
+def test_fields_projection(client, upstream):
+	body = client.get('/api/pvwatts?fields=ac_monthly').get_json()
+	assert list(body["outputs"]) == ["ac_monthly"]
+	assert client.get('/api/pvwatts?fields=ac_monthly,nonsense').status_code == 400
+
+def test_etag_conditional_get(client, upstream):
+	first = client.get('/api/pvwatts?tilt=30&azimuth=180')
+	etag = first.headers["ETag"]
+	second = client.get('/api/pvwatts?tilt=30&azimuth=180', headers={"If-None-Match": etag})
+	assert second.status_code == 304
+	assert second.data == b""
+	assert second.headers["ETag"] == etag
+	changed = client.get('/api/pvwatts?tilt=40&azimuth=180', headers={"If-None-Match": etag})
+	assert changed.status_code == 200
+
+def test_gzip_and_float32_hourly(client, monkeypatch, upstream):
+	import base64
+	import gzip
+	import json
+
+	import numpy as np
+
+	def hourly_upstream(params, wait_for_quota=False):
+		data = fake_outputs(params)
+		data["outputs"]["ac"] = [float(hour % 24) for hour in range(8760)]
+		return data
+	monkeypatch.setattr(backend, "request_upstream", hourly_upstream)
+
+	response = client.get('/api/pvwatts?hourly=float32', headers={"Accept-Encoding": "gzip"})
+	assert response.headers["Content-Encoding"] == "gzip"
+	body = json.loads(gzip.decompress(response.data))
+	packed = body["outputs"]["ac"]
+	assert packed["dtype"] == "float32" and packed["length"] == 8760
+	hourly = np.frombuffer(base64.b64decode(packed["data"]), dtype='<f4')
+	assert hourly[:3].tolist() == [0.0, 1.0, 2.0]
+	assert body["outputs"]["ac_monthly"] == hourly_upstream({"tilt": 40.0, "azimuth": 180.0})["outputs"]["ac_monthly"]
+
+	# Any representation's ETag validates the request
+	conditional = client.get('/api/pvwatts?hourly=float32', headers={"If-None-Match": response.headers["ETag"]})
+	assert conditional.status_code == 304
+
+def test_profile_requires_token(client, upstream, monkeypatch):
+	monkeypatch.setattr(backend, "PROFILE_TOKEN", "secret")
+	assert client.get('/api/pvwatts?tilt=30&azimuth=180&profile=wrong').is_json
+
+	response = client.get('/api/pvwatts?tilt=30&azimuth=180', headers={'X-Profile-Token': 'secret'})
+	assert response.status_code == 200
+	assert response.mimetype == 'text/plain'
+	report = response.get_data(as_text=True)
+	assert 'Spans:' in report and 'Profile:' in report
+	assert [part.split(';')[0] for part in response.headers['Server-Timing'].split(', ')] == ['parse', 'fetch', 'serialize']
+	assert not backend.profile_lock.locked()
+
+def test_profile_rejects_bad_input_cleanly(client, upstream, monkeypatch):
+	monkeypatch.setattr(backend, "PROFILE_TOKEN", "secret")
+	assert client.get('/api/pvwatts?tilt=30&azimuth=180&profile=%C3%A9').status_code == 200
+	assert client.get('/api/pvwatts', headers={'X-Profile-Token': 'secret'}, query_string={'profile_sort': 'bogus'}).status_code == 400
+	assert client.get('/api/pvwatts', headers={'X-Profile-Token': 'secret'}, query_string={'profile_sort': 'time'}).mimetype == 'text/plain'
+	assert not backend.profile_lock.locked()
+
+def test_profile_disabled_without_configured_token(client, upstream, monkeypatch):
+	monkeypatch.setattr(backend, "PROFILE_TOKEN", None)
+	assert client.get('/api/pvwatts?tilt=30&azimuth=180&profile=').is_json
+
+def test_pvwatts_resolution_rollups(client, upstream, monkeypatch):
+	def hourly_outputs(params, wait_for_quota=False):
+		data = fake_outputs(params)
+		data["outputs"]["ac"] = [1.0] * 8760
+		return data
+	monkeypatch.setattr(backend, "request_upstream", hourly_outputs)
+	rollups_before = rollups.rollup_cache_stats()
+	client.get('/api/pvwatts?tilt=30&azimuth=180')
+	assert rollups.rollup_cache_stats() == rollups_before  # Fetching alone rolls nothing up
+	body = client.get('/api/pvwatts?tilt=30&azimuth=180&resolution=weekly').get_json()
+	assert body["outputs"]["ac"]["periods"] == 53
+	assert body["outputs"]["ac"]["sum"][0] == 168.0
+	assert len(body["outputs"]["ac_monthly"]) == 12
+	assert client.get('/api/pvwatts?resolution=yearly').status_code == 400
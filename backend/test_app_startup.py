@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+
+# Cold-import budget for the Flask app in seconds, generous enough for a loaded CI machine.
+# The cache warm-up runs in the background, so this does not grow with the cache.
+APP_BUDGET = 1.5
+
+def test_app_imports_within_budget(tmp_path):
+	code = (
+		"import os, sys, time\n"
+		"started = time.perf_counter()\n"
+		"import app\n"
+		"print(time.perf_counter() - started)\n"
+		"print(','.join(sys.modules))\n"
+		"sys.stdout.flush()\n"
+		"os._exit(0)\n"
+	)
+	env = dict(os.environ, PVWATTS_WARMUP="", PVWATTS_CACHE_PATH=str(tmp_path / "cache.sqlite3"))
+	timings = []
+	for _ in range(2):
+		output = subprocess.run(
+			[sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)),
+			env=env, capture_output=True, text=True, check=True
+		).stdout.splitlines()
+		timings.append(float(output[0]))
+		modules = set(output[1].split(','))
+	assert not {'cProfile', 'pstats', 'pandas', 'matplotlib'} & modules
+	assert min(timings) < APP_BUDGET, f"import app took {min(timings):.2f}s"
+
+def test_app_starts_with_malformed_warmup(tmp_path):
+	env = dict(os.environ, PVWATTS_WARMUP="30,a:b", PVWATTS_CACHE_PATH=str(tmp_path / "cache.sqlite3"))
+	result = subprocess.run(
+		[sys.executable, "-c", "import os, app; os._exit(0)"], cwd=os.path.dirname(os.path.abspath(__file__)),
+		env=env, capture_output=True, text=True
+	)
+	assert result.returncode == 0, result.stderr
+	assert "Ignoring malformed PVWATTS_WARMUP" in result.stderr
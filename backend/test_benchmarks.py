@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+import benchmarks
+
+def test_synthetic_forecasts_are_reproducible():
+	first = benchmarks.synthetic_forecasts(500)
+	second = benchmarks.synthetic_forecasts(500)
+	assert first.equals(second)
+	assert first['PV Estimate'].isna().any()
+	assert list(first.columns[:2]) == ['PV Estimate', 'Period End']
+
+def test_legacy_implementations_match_batch_path():
+	df = benchmarks.synthetic_forecasts(200)
+	expected = benchmarks.data_processor.adjust_pv(df.copy(), 'PV Estimate', 1.2, 200.0, 25.0)['Adjusted_PV Estimate']
+	for implementation in (benchmarks.adjust_apply, benchmarks.adjust_row_loop):
+		adjusted = implementation(df.copy(), 'PV Estimate', 1.2, 200.0, 25.0)['Adjusted_PV Estimate']
+		np.testing.assert_allclose(adjusted, expected)
+
+def test_run_produces_machine_readable_report():
+	report = benchmarks.run([1000], suites=('adjust', 'io'), repeat=1)
+	names = {result["name"] for result in report["results"]}
+	assert {"adjust.apply", "adjust.row_loop", "adjust.batch", "ingest.load_data", "save.csv"} <= names
+	assert all(result["median_s"] > 0 for result in report["results"])
+	assert report["environment"]["seed"] == benchmarks.SEED
+
+def test_compare_flags_regressions():
+	baseline = {"results": [{"name": "adjust.batch", "rows": 1000, "min_s": 0.010}]}
+	report = {"results": [{"name": "adjust.batch", "rows": 1000, "min_s": 0.014}]}
+	assert benchmarks.compare(report, baseline, 0.25)[0]["slowdown"] == pytest.approx(1.4)
+	assert benchmarks.compare(report, baseline, 0.5) == []
@@ -0,0 +1,160 @@
+import json
+
+import pytest
+import requests
+
+import app as backend
+from fleet import QuotaExhausted, TokenBucket, fetch_with_retry, fleet_aggregates, parse_sites, retry_after
+from test_app import fake_outputs
+
+class FakeClock:
+	def __init__(self):
+		self.now = 0.0
+		self.sleeps = []
+
+	def __call__(self):
+		return self.now
+
+	def sleep(self, seconds):
+		self.sleeps.append(seconds)
+		self.now += seconds
+
+def http_error(status, headers=None):
+	response = requests.Response()
+	response.status_code = status
+	response.headers.update(headers or {})
+	return requests.exceptions.HTTPError(f"{status} error", response=response)
+
+def test_token_bucket_allows_burst_then_paces_to_quota():
+	clock = FakeClock()
+	bucket = TokenBucket.per_hour(3600, burst=5, clock=clock, sleep=clock.sleep)
+	for _ in range(5):
+		assert bucket.acquire()
+	assert clock.sleeps == []
+	bucket.acquire()
+	assert clock.now == pytest.approx(1.0)  # One request per second at 3600/hour
+	assert not bucket.acquire(timeout=0.5)
+
+def test_token_bucket_pause_blocks_everyone():
+	clock = FakeClock()
+	bucket = TokenBucket(10.0, 10, clock=clock, sleep=clock.sleep)
+	bucket.pause(30)
+	bucket.acquire()
+	assert clock.now == pytest.approx(30.0)
+
+def test_interactive_retry_gives_up_waiting_for_quota():
+	clock = FakeClock()
+	bucket = TokenBucket(0.1, 1, clock=clock, sleep=clock.sleep)
+	assert bucket.wait_time() == 0.0
+	bucket.acquire()
+	assert bucket.wait_time() == pytest.approx(10.0)
+	with pytest.raises(QuotaExhausted) as raised:
+		fetch_with_retry(lambda params: {}, {}, limiter=bucket, acquire_timeout=2.0, sleep=clock.sleep)
+	assert raised.value.retry_after == pytest.approx(10.0)
+	assert clock.now == 0.0  # Gave up without waiting
+	assert fetch_with_retry(lambda params: {}, {}, limiter=bucket, acquire_timeout=2.0, prepaid=True) == {}
+
+def test_retry_honours_retry_after_and_pauses_limiter():
+	clock = FakeClock()
+	bucket = TokenBucket(100.0, 100, clock=clock, sleep=clock.sleep)
+	attempts = []
+	def fetch(params):
+		attempts.append(clock.now)
+		if len(attempts) == 1:
+			raise http_error(429, {"Retry-After": "12"})
+		if len(attempts) == 2:
+			raise http_error(503)
+		return {"outputs": {}}
+	result = fetch_with_retry(fetch, {}, limiter=bucket, backoff=1.0, sleep=clock.sleep)
+	assert result == {"outputs": {}}
+	assert attempts[1] == pytest.approx(12.0)
+	assert 1.0 <= attempts[2] - attempts[1] <= 2.0  # Second retry: 2s backoff with jitter
+
+def test_retry_gives_up_on_client_errors_and_after_max_attempts():
+	calls = []
+	def bad_request(params):
+		calls.append(params)
+		raise http_error(400)
+	with pytest.raises(requests.exceptions.HTTPError):
+		fetch_with_retry(bad_request, {}, sleep=lambda seconds: None)
+	assert len(calls) == 1
+
+	def unavailable(params):
+		calls.append(params)
+		raise requests.exceptions.ConnectionError("refused")
+	with pytest.raises(requests.exceptions.ConnectionError):
+		fetch_with_retry(unavailable, {}, max_attempts=3, sleep=lambda seconds: None)
+	assert len(calls) == 4
+
+def test_retry_after_http_date():
+	response = requests.Response()
+	response.headers["Retry-After"] = "Wed, 21 Oct 2015 07:28:00 GMT"
+	assert retry_after(response) == 0.0
+	assert retry_after(requests.Response()) is None
+
+def test_parse_sites_applies_defaults_and_validates():
+	sites = parse_sites([{"id": "roof-a", "tilt": "25", "system_capacity": 7.5}, {}], backend.site_defaults())
+	assert sites[0].tilt == 25.0 and sites[0].azimuth == backend.DEFAULT_AZIMUTH
+	assert sites[1].id == "site-2" and sites[1].system_capacity == backend.SYSTEM_CAPACITY
+	with pytest.raises(ValueError):
+		parse_sites([{"tilt": 120}], backend.site_defaults())
+	for field in ("system_capacity", "lat", "losses"):
+		with pytest.raises(ValueError, match="finite"):
+			parse_sites([{field: "nan"}], backend.site_defaults())
+	with pytest.raises(ValueError, match="finite"):
+		parse_sites([{"system_capacity": float("inf")}], backend.site_defaults())
+	with pytest.raises(ValueError):
+		parse_sites([{"id": "a"}, {"id": "a"}], backend.site_defaults())
+
+def test_fleet_aggregates_over_sites():
+	results = [
+		{"id": "a", "status": "ok", "system_capacity": 2.0, "ac_monthly": [100.0] * 12},
+		{"id": "b", "status": "ok", "system_capacity": 4.0, "ac_monthly": [300.0] * 12},
+		{"id": "c", "status": "error", "error": "boom"},
+	]
+	aggregates = fleet_aggregates(results)
+	assert aggregates["sites"] == 2
+	assert aggregates["ac_annual_kwh"] == 4800.0
+	assert aggregates["ac_monthly_kwh"] == [400.0] * 12
+	assert aggregates["specific_yield"]["min"] == 600.0
+	assert aggregates["specific_yield"]["max"] == 900.0
+	assert aggregates["best_site"] == "b" and aggregates["worst_site"] == "a"
+
+@pytest.fixture
+def upstream(monkeypatch):
+	calls = []
+	def request_upstream(params, wait_for_quota=False):
+		calls.append(params)
+		if params["lat"] == 0:
+			raise requests.exceptions.ConnectionError("unreachable")
+		return fake_outputs(params)
+	monkeypatch.setattr(backend, "request_upstream", request_upstream)
+	backend.cache.clear()
+	yield calls
+	backend.cache.clear()
+
+def test_fleet_endpoint_streams_sites_then_summary(upstream):
+	sites = [
+		{"id": "north", "tilt": 35, "azimuth": 180, "system_capacity": 5},
+		{"id": "west", "tilt": 20, "azimuth": 270, "losses": 14},
+		{"id": "broken", "lat": 0, "lon": 0},
+	]
+	response = backend.app.test_client().post('/api/pvwatts/fleet', json={"sites": sites})
+	assert response.status_code == 200
+	assert response.mimetype == 'application/x-ndjson'
+	lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+	assert sorted(line["id"] for line in lines[:-1]) == ["broken", "north", "west"]
+	by_id = {line["id"]: line for line in lines[:-1]}
+	assert by_id["broken"]["status"] == "error"
+	assert by_id["north"]["specific_yield"] == pytest.approx(100.0)
+	summary = lines[-1]
+	assert summary["type"] == "summary" and summary["failed"] == 1
+	assert summary["aggregates"]["sites"] == 2
+	assert {call["losses"] for call in upstream} == {10, 14}
+
+def test_fleet_endpoint_rejects_bad_input(upstream):
+	client = backend.app.test_client()
+	assert client.post('/api/pvwatts/fleet', json={}).status_code == 400
+	assert client.post('/api/pvwatts/fleet', json={"sites": [{"azimuth": 400}]}).status_code == 400
+	assert client.post('/api/pvwatts/fleet', json={"sites": ["roof"]}).status_code == 400
+	assert upstream == []
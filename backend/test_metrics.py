@@ -0,0 +1,68 @@
+import pytest
+
+import app as backend
+from metrics import Registry
+from test_app import client, upstream  # noqa: F401 (fixtures)
+
+def test_counter_and_gauge_render():
+	registry = Registry()
+	requests_total = registry.counter("requests_total", "Requests.", ("route",))
+	in_flight = registry.gauge("in_flight", "In flight.")
+	requests_total.inc(route="/a")
+	requests_total.inc(2, route='/b"c')
+	in_flight.inc()
+	in_flight.inc()
+	in_flight.dec()
+	text = registry.render()
+	assert "# TYPE requests_total counter" in text
+	assert 'requests_total{route="/a"} 1' in text
+	assert 'requests_total{route="/b\\"c"} 2' in text
+	assert "in_flight 1" in text.splitlines()
+
+def test_histogram_buckets_are_cumulative():
+	registry = Registry()
+	latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+	for value in (0.05, 0.5, 0.5, 5.0):
+		latency.observe(value)
+	lines = registry.render().splitlines()
+	assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+	assert 'latency_seconds_bucket{le="1.0"} 3' in lines
+	assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+	assert "latency_seconds_sum 6.05" in lines
+	assert "latency_seconds_count 4" in lines
+
+def test_labels_must_match():
+	counter = Registry().counter("c", "C.", ("status",))
+	with pytest.raises(ValueError):
+		counter.inc(route="/")
+
+def test_metrics_endpoint(client, upstream):
+	before = backend.REQUEST_DURATION.count(route="/api/pvwatts", method="GET", status="200")
+	client.get('/api/pvwatts?tilt=30&azimuth=180')
+	client.get('/api/pvwatts?tilt=30&azimuth=180')
+
+	response = client.get('/metrics')
+	assert response.status_code == 200
+	assert response.content_type.startswith("text/plain; version=0.0.4")
+	text = response.get_data(as_text=True)
+	assert backend.REQUEST_DURATION.count(route="/api/pvwatts", method="GET", status="200") == before + 2
+	assert 'pvwatts_http_request_duration_seconds_bucket{route="/api/pvwatts",method="GET",status="200",le="+Inf"}' in text
+	assert 'pvwatts_cache_hits_total{tier="memory"}' in text
+	assert "pvwatts_cache_entries 1" in text.splitlines()
+	assert "pvwatts_http_requests_in_flight 1" in text.splitlines()  # The scrape itself
+
+def test_cache_lookups_count_once_per_request(client, upstream):
+	before = backend.cache.stats()
+	client.get('/api/pvwatts?tilt=31&azimuth=180')  # One upstream miss, re-checked inside the flight
+	client.get('/api/pvwatts?tilt=31&azimuth=180')
+	after = backend.cache.stats()
+	assert len(upstream) == 1
+	assert after["misses"] - before["misses"] == 1
+	assert sum(after["hits"].values()) - sum(before["hits"].values()) == 1
+
+def test_upstream_calls_are_timed_by_status(monkeypatch):
+	monkeypatch.setattr(backend.nrel, "fetch", lambda params: {"outputs": {}})
+	before = backend.UPSTREAM_REQUESTS.value(status="200")
+	backend.timed_fetch({})
+	assert backend.UPSTREAM_REQUESTS.value(status="200") == before + 1
+	assert backend.UPSTREAM_DURATION.count(status="200") >= 1
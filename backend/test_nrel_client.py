@@ -0,0 +1,48 @@
+import pytest
+
+import app as backend
+from nrel_client import NRELClient
+from nrel_stub import start_stub
+
+@pytest.fixture
+def stub():
+	server = start_stub()
+	yield server
+	server.shutdown()
+	server.server_close()
+
+def test_fetch_returns_pvwatts_payload(stub):
+	client = NRELClient(stub.url, "test-key")
+	data = client.fetch({"tilt": 30, "azimuth": 180})
+	assert len(data["outputs"]["ac_monthly"]) == 12
+	assert len(data["outputs"]["ac"]) == 8760
+	assert stub.requests[0]["api_key"] == "test-key"
+	client.close()
+
+def test_connections_are_pooled_and_concurrency_bounded(stub):
+	client = NRELClient(stub.url, "test-key", max_concurrency=3)
+	futures = [client.submit({"tilt": tilt, "azimuth": 180}) for tilt in range(0, 60, 2)]
+	assert all("outputs" in future.result(10) for future in futures)
+	assert stub.request_count == 30
+	assert stub.max_in_flight <= 3
+	assert stub.connections <= 3  # Keep-alive: connections are reused, not opened per request
+	client.close()
+
+def test_startup_warm_up_fills_cache(stub, monkeypatch):
+	client = NRELClient(stub.url, "test-key")
+	monkeypatch.setattr(backend, "nrel", client)
+	backend.cache.clear()
+
+	orientations = backend.parse_orientations(f"{backend.DEFAULT_TILT}:{backend.DEFAULT_AZIMUTH}, 30:200")
+	assert orientations == [(40.0, 180.0), (30.0, 200.0)]
+	for future in backend.warm_cache(orientations):
+		future.result(10)
+	assert stub.request_count == 2
+
+	# Warmed orientations are served without going upstream, and are not prefetched twice
+	response = backend.app.test_client().get('/api/pvwatts')
+	assert response.status_code == 200
+	assert backend.warm_cache(orientations) == []
+	assert stub.request_count == 2
+	backend.cache.clear()
+	client.close()
@@ -0,0 +1,110 @@
+import json
+import os
+
+import numpy as np
+import pytest
+import requests
+
+from nrel_stub import FixtureStore, Faults, start_stub, synthesize_response
+
+PARAMS = {"lat": "51.20578", "lon": "3.47789", "system_capacity": "4", "azimuth": "180", "tilt": "40", "losses": "10"}
+
+@pytest.fixture
+def servers():
+	started = []
+	def start(**kwargs):
+		server = start_stub(**kwargs)
+		started.append(server)
+		return server
+	yield start
+	for server in started:
+		server.shutdown()
+		server.server_close()
+
+def test_record_then_replay_without_upstream(servers, tmp_path):
+	upstream = servers()
+	recorder = servers(fixtures=FixtureStore(str(tmp_path)), record=True, upstream_url=upstream.url, api_key="real-key")
+	recorded = requests.get(recorder.url, params={**PARAMS, "api_key": "test"})
+	assert recorded.status_code == 200
+	assert upstream.requests[0]["api_key"] == "real-key"
+	assert len(os.listdir(tmp_path)) == 1
+
+	replay = servers(fixtures=FixtureStore(str(tmp_path)))
+	# Equivalent parameters ('40' vs '40.0') and a different key replay the same bytes
+	replayed = requests.get(replay.url, params={**PARAMS, "tilt": "40.0", "api_key": "other"})
+	assert replayed.content == recorded.content
+	assert replay.stats()["sources"] == {"replay": 1}
+	assert upstream.request_count == 1
+
+def test_unseen_orientation_is_derived_from_nearest_recording(tmp_path, servers):
+	fixtures = FixtureStore(str(tmp_path))
+	fixtures.put(PARAMS, synthesize_response(PARAMS))
+	fixtures.put({**PARAMS, "tilt": "10"}, synthesize_response({**PARAMS, "tilt": "10"}))
+	server = servers(fixtures=fixtures)
+
+	wanted = {**PARAMS, "tilt": "35", "azimuth": "200"}
+	body = requests.get(server.url, params=wanted).json()
+	assert server.stats()["sources"] == {"derived": 1}
+	assert "tilt=40" in body["warnings"][-1]
+	# The recordings are synthetic here, so re-orienting one must reproduce the model
+	expected = synthesize_response(wanted)["outputs"]
+	np.testing.assert_allclose(body["outputs"]["ac_monthly"], expected["ac_monthly"])
+	assert body["outputs"]["ac_annual"] == pytest.approx(expected["ac_annual"])
+	assert len(body["outputs"]["ac"]) == 8760
+
+	# A site with no recordings at all falls back to the synthetic model
+	requests.get(server.url, params={**PARAMS, "lat": "40.0"})
+	assert server.stats()["sources"]["synthetic"] == 1
+
+def test_injected_throttling_and_errors(servers):
+	server = servers(faults=Faults(throttle_rate=1.0, retry_after=7))
+	throttled = requests.get(server.url, params=PARAMS)
+	assert throttled.status_code == 429
+	assert throttled.headers["Retry-After"] == "7"
+	assert throttled.json()["error"]["code"] == "OVER_RATE_LIMIT"
+
+	changed = requests.post(server.url.replace("/api/pvwatts/v6.json", "/_stub/faults"),
+		data=json.dumps({"throttle_rate": 0, "error_rate": 0.5}))
+	assert changed.json()["error_rate"] == 0.5
+	statuses = [requests.get(server.url, params=PARAMS).status_code for _ in range(200)]
+	assert set(statuses) == {200, 500}
+	assert 60 < statuses.count(500) < 140
+	assert server.stats()["status_counts"]["429"] == 1
+
+def test_latency_is_added(servers):
+	server = servers(faults=Faults(latency_ms=50))
+	response = requests.get(server.url, params=PARAMS)
+	assert response.elapsed.total_seconds() >= 0.05
+
+def test_unknown_fault_setting_rejected(servers):
+	server = servers()
+	response = requests.post(server.url.replace("/api/pvwatts/v6.json", "/_stub/faults"), data=json.dumps({"bogus": 1}))
+	assert response.status_code == 400
+
+def test_invalid_fault_settings_change_nothing(servers):
+	server = servers()
+	faults_url = server.url.replace("/api/pvwatts/v6.json", "/_stub/faults")
+	for settings in ({"latency_ms": 500, "bogus": 1}, {"error_rate": "nan"}, {"throttle_rate": 1.5},
+			{"latency_ms": -1}, {"error_rate": 0.6, "throttle_rate": 0.6}):
+		assert requests.post(faults_url, data=json.dumps(settings)).status_code == 400
+	assert requests.get(faults_url).json() == Faults().as_dict()
+
+def test_non_numeric_params_get_400(servers):
+	server = servers()
+	response = requests.get(server.url, params={**PARAMS, "lat": "abc"})
+	assert response.status_code == 400
+	assert "lat" in response.json()["errors"][0]
+
+def test_non_finite_params_get_400(servers):
+	server = servers()
+	for value in ("nan", "inf", "-Infinity"):
+		response = requests.get(server.url, params={**PARAMS, "tilt": value})
+		assert response.status_code == 400
+		assert "tilt" in response.json()["errors"][0]
+
+def test_request_log_is_bounded(servers):
+	server = servers(recent_requests=2)
+	for tilt in ("10", "20", "30"):
+		requests.get(server.url, params={**PARAMS, "tilt": tilt})
+	assert [params["tilt"] for params in server.requests] == ["20", "30"]
+	assert server.request_count == server.stats()["requests"] == 3
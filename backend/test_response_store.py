@@ -0,0 +1,107 @@
+import time
+
+from response_store import ResponseStore
+
+def test_persists_across_instances(tmp_path):
+	path = str(tmp_path / "responses.sqlite3")
+	store = ResponseStore(path)
+	store.set("pvwatts:tilt=30", {"outputs": {"ac_annual": 4100.5}})
+	store.close()
+
+	reopened = ResponseStore(path)
+	assert "pvwatts:tilt=30" in reopened._memory  # Warm-loaded at startup
+	assert reopened.get("pvwatts:tilt=30") == {"outputs": {"ac_annual": 4100.5}}
+
+def test_expired_entries_are_dropped(tmp_path, monkeypatch):
+	store = ResponseStore(str(tmp_path / "responses.sqlite3"), ttl=10)
+	store.set("key", {"value": 1})
+	later = time.time() + 11
+	monkeypatch.setattr(time, "time", lambda: later)
+	assert store.get("key") is None
+	assert len(store) == 0
+
+def test_least_recently_used_evicted_over_budget(tmp_path):
+	payload = {"values": [1.0] * 100}
+	entry_size = len(str(payload).replace(" ", ""))
+	store = ResponseStore(str(tmp_path / "responses.sqlite3"), max_bytes=entry_size * 3)
+	store.TOUCH_INTERVAL = 0
+	for key in ("a", "b", "c"):
+		store.set(key, payload)
+		time.sleep(0.01)
+	store.get("a")  # "b" is now the least recently used
+	store.set("d", payload)
+	assert store.get("b") is None
+	assert all(store.get(key) == payload for key in ("a", "c", "d"))
+	assert store.size_bytes() <= store.max_bytes
+
+def test_memory_front_is_bounded(tmp_path):
+	store = ResponseStore(str(tmp_path / "responses.sqlite3"), memory_items=2)
+	for key in ("a", "b", "c"):
+		store.set(key, {"key": key})
+	assert list(store._memory) == ["b", "c"]
+	assert store.get("a") == {"key": "a"}  # Still on disk
+
+def test_stats_count_hits_by_tier(tmp_path):
+	path = str(tmp_path / "responses.sqlite3")
+	store = ResponseStore(path, memory_items=1)
+	store.set("a", {"value": 1})
+	store.set("b", {"value": 2})  # Pushes "a" out of memory, but not off disk
+	assert store.get("b") == {"value": 2}
+	assert store.get("a") == {"value": 1}
+	assert store.get("missing") is None
+	stats = store.stats()
+	assert stats["hits"] == {"memory": 1, "disk": 1}
+	assert stats["misses"] == 1
+
+def test_late_warm_keeps_entries_used_since_opening(tmp_path):
+	path = str(tmp_path / "responses.sqlite3")
+	store = ResponseStore(path)
+	for key in ("a", "b", "c"):
+		store.set(key, {"key": key})
+		time.sleep(0.01)
+	store.close()
+
+	reopened = ResponseStore(path, memory_items=2, preload=False)
+	assert len(reopened._memory) == 0
+	reopened.set("d", {"key": "d"})
+	assert reopened.warm() == 1
+	assert list(reopened._memory) == ["c", "d"]  # "c" fills the free slot, behind "d"
+
+def test_memory_front_is_bounded_by_bytes(tmp_path):
+	payload = {"values": [1.0] * 100}
+	size = len('{"values":[' + ','.join(['1.0'] * 100) + ']}')
+	store = ResponseStore(str(tmp_path / "responses.sqlite3"), memory_bytes=size * 2)
+	for key in ("a", "b", "c"):
+		store.set(key, payload)
+	assert list(store._memory) == ["b", "c"]
+	assert store.stats()["memory_bytes"] == size * 2
+	store.set("big", {"values": [1.0] * 1000})  # Larger than the whole tier: disk only
+	assert list(store._memory) == ["b", "c"]
+	assert store.get("big") == {"values": [1.0] * 1000}
+
+def test_totals_track_every_write(tmp_path):
+	path = str(tmp_path / "responses.sqlite3")
+	store, other = ResponseStore(path), ResponseStore(path)
+	store.set("a", {"v": 1})
+	store.set("a", {"v": 100})  # Replacing updates the size, not the count
+	other.set("b", {"v": 2})
+	assert len(store) == 2
+	assert store.size_bytes() == len('{"v":100}') + len('{"v":2}')
+	other.delete("a")
+	assert (len(store), store.size_bytes()) == (1, len('{"v":2}'))
+	store.clear()
+	assert (len(other), other.size_bytes()) == (0, 0)
+
+def test_totals_are_backfilled_for_existing_files(tmp_path):
+	import sqlite3
+	path = str(tmp_path / "responses.sqlite3")
+	store = ResponseStore(path)
+	store.set("a", {"v": 1})
+	store.close()
+	db = sqlite3.connect(path)
+	for name in ("responses_insert", "responses_update", "responses_delete"):
+		db.execute(f"DROP TRIGGER {name}")
+	db.execute("DROP TABLE totals")
+	db.commit()
+	db.close()
+	assert ResponseStore(path).size_bytes() == len('{"v":1}')
@@ -0,0 +1,112 @@
+import threading
+import time
+
+import pytest
+
+from resp_stub import start_stub
+from response_store import ResponseStore
+from shared_cache import RedisResponseStore, RespClient, RespError, open_store, run_once
+
+@pytest.fixture
+def redis_stub():
+	server = start_stub()
+	yield server
+	server.shutdown()
+	server.server_close()
+
+def test_client_round_trips(redis_stub):
+	client = RespClient.from_url(redis_stub.url)
+	assert client.execute("PING") == "PONG"
+	assert client.execute("SET", "k", "v", "NX") == "OK"
+	assert client.execute("SET", "k", "w", "NX") is None
+	assert client.pipeline([("GET", "k"), ("STRLEN", "k"), ("KEYS", "*")]) == [b"v", 1, [b"k"]]
+	assert client.execute("SCAN", 0, "MATCH", "*") == [b"0", [b"k"]]
+	with pytest.raises(RespError):
+		client.execute("NOPE")
+	assert client.execute("GET", "k") == b"v"  # The connection survives an error reply
+
+def test_redis_store_interface(redis_stub):
+	store = RedisResponseStore(RespClient.from_url(redis_stub.url), ttl=0.05)
+	store.set("pvwatts:tilt=30", {"outputs": {"ac_annual": 4100.5}})
+	assert store.get("pvwatts:tilt=30") == {"outputs": {"ac_annual": 4100.5}}
+	assert len(store) == 1
+	assert store.size_bytes() > 0
+	time.sleep(0.06)
+	assert store.get("pvwatts:tilt=30") is None
+	assert store.stats()["hits"] == {"shared": 1}
+	assert store.stats()["misses"] == 1
+
+def test_redis_store_sizes_and_clears_with_scan(redis_stub):
+	store = RedisResponseStore(RespClient.from_url(redis_stub.url))
+	store.SCAN_COUNT = 3
+	for index in range(10):
+		store.set(f"key{index}", {"value": index})
+	token = store.acquire_lock("key0", 10)
+	assert len(store) == 10
+	assert store.size_bytes() == 10 * len('{"value":0}')
+	store.clear()
+	assert len(store) == 0
+	assert store.acquire_lock("key0", 10) is None  # Locks are not cache entries
+	store.release_lock("key0", token)
+
+def test_redis_store_degrades_to_misses_when_down():
+	store = RedisResponseStore(RespClient("127.0.0.1", 1, timeout=0.2))
+	assert store.get("key") is None
+	store.set("key", {"value": 1})
+	assert store.acquire_lock("key", 1) is not None
+	assert store.stats()["errors"] == 3
+
+def test_open_store_selects_backend(tmp_path, redis_stub):
+	assert isinstance(open_store(None, str(tmp_path / "cache.sqlite3"), 60, 1024), ResponseStore)
+	assert isinstance(open_store(redis_stub.url, None, 60, 1024), RedisResponseStore)
+
+def stores(kind, tmp_path, server):
+	"""Two stores over the same backing cache, standing in for two worker processes."""
+	if kind == "sqlite":
+		path = str(tmp_path / "cache.sqlite3")
+		return ResponseStore(path), ResponseStore(path)
+	return RedisResponseStore(RespClient.from_url(server.url)), RedisResponseStore(RespClient.from_url(server.url))
+
+@pytest.mark.parametrize("kind", ["sqlite", "redis"])
+def test_locks_are_exclusive_until_released_or_expired(kind, tmp_path, redis_stub):
+	first, second = stores(kind, tmp_path, redis_stub)
+	token = first.acquire_lock("key", 10)
+	assert token is not None
+	assert second.acquire_lock("key", 10) is None
+	second.release_lock("key", "not-the-token")
+	assert second.acquire_lock("key", 10) is None
+	first.release_lock("key", token)
+	assert second.acquire_lock("key", 0.05) is not None
+	time.sleep(0.1)
+	assert first.acquire_lock("key", 10) is not None
+
+@pytest.mark.parametrize("kind", ["sqlite", "redis"])
+def test_run_once_computes_once_across_workers(kind, tmp_path, redis_stub):
+	workers = stores(kind, tmp_path, redis_stub)
+	computed = []
+	results = []
+
+	def worker(store):
+		def compute():
+			computed.append(store)
+			time.sleep(0.1)
+			store.set("key", {"data": 42})
+			return 42
+		def check():
+			entry = store.get("key", local=False)
+			return entry["data"] if entry else None
+		results.append(run_once(store, "key", compute, check, lock_ttl=5, poll=0.01))
+
+	threads = [threading.Thread(target=worker, args=(store,)) for store in workers * 3]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	assert results == [42] * 6
+	assert len(computed) == 1
+
+def test_run_once_takes_over_when_holder_fails(tmp_path):
+	store = ResponseStore(str(tmp_path / "cache.sqlite3"))
+	with pytest.raises(RuntimeError):
+		run_once(store, "key", lambda: (_ for _ in ()).throw(RuntimeError("upstream down")), lambda: None)
+	assert run_once(store, "key", lambda: 7, lambda: None) == 7
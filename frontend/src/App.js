@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useMemo } from 'react';
 import SolarDataGraph from './SolarDataGraph';
 import SolarDataTable from './SolarDataTable';
 import MultiplierSlider from './MultiplierSlider';
@@ -8,7 +8,7 @@ import AzimuthSlider from './AzimuthSlider';
 import './App.css';
 
 function App() {
-  const [forecastData, setForecastData] = useState([]);
+  const [monthlyOutputs, setMonthlyOutputs] = useState(null);
   const [errorMessage, setErrorMessage] = useState('');
   const [lastUpdateTime, setLastUpdateTime] = useState('');
   const [showTable, setShowTable] = useState(true);
@@ -20,9 +20,12 @@ function App() {
   // Replace this with your actual aws apprunner
   const baseURL = 'https://aq8fwnu9jp.eu-west-1.awsapprunner.com';
   
-  // Fetch data from the NREL PVWatts API via your deployed backend
+  // Fetch data from the NREL PVWatts API via your deployed backend.
+  // Only the monthly fields are requested, and the multiplier is applied locally,
+  // so moving the multiplier slider never goes back to the server.
   const fetchPVWattsData = useCallback(() => {
-    const apiUrl = `${baseURL}/api/pvwatts?tilt=${tilt}&azimuth=${azimuth}`;
+    const fields = 'ac_monthly,poa_monthly,solrad_monthly';
+    const apiUrl = `${baseURL}/api/pvwatts?tilt=${tilt}&azimuth=${azimuth}&fields=${fields}`;
 
     fetch(apiUrl)
       .then((response) => {
@@ -38,30 +41,32 @@ function App() {
           throw new Error('Invalid data format received from server.');
         }
 
-        const { ac_monthly, poa_monthly, solrad_monthly } = data.outputs;
-        const transformedData = ac_monthly.map((acVal, index) => {
-          const dateStr = `2024-${(index + 1).toString().padStart(2, '0')}-01T00:00:00Z`;
-          return {
-            period_end: dateStr,
-            ac_value: acVal * multiplier,
-            poa_value: poa_monthly[index] * multiplier,
-            solrad_value: solrad_monthly[index] * multiplier,
-          };
-        });
-
-        setForecastData(transformedData);
+        setMonthlyOutputs(data.outputs);
         setErrorMessage('');
-
-        if (transformedData.length > 0) {
-          setLastUpdateTime(new Date().toISOString());
-        }
+        setLastUpdateTime(new Date().toISOString());
       })
       .catch((error) => {
         console.error('Error fetching data:', error);
         setErrorMessage(error.message || 'Failed to fetch data from the server.');
-        setForecastData([]);
+        setMonthlyOutputs(null);
       });
-  }, [multiplier, tilt, azimuth, baseURL]);
+  }, [tilt, azimuth, baseURL]);
+
+  const forecastData = useMemo(() => {
+    if (!monthlyOutputs) {
+      return [];
+    }
+    const { ac_monthly, poa_monthly, solrad_monthly } = monthlyOutputs;
+    return ac_monthly.map((acVal, index) => {
+      const dateStr = `2024-${(index + 1).toString().padStart(2, '0')}-01T00:00:00Z`;
+      return {
+        period_end: dateStr,
+        ac_value: acVal * multiplier,
+        poa_value: poa_monthly[index] * multiplier,
+        solrad_value: solrad_monthly[index] * multiplier,
+      };
+    });
+  }, [monthlyOutputs, multiplier]);
 
   useEffect(() => {
     fetchPVWattsData();